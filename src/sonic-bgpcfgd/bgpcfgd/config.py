@@ -1,11 +1,21 @@
+import time
+
+from .log import log_warn
+from .running_config import RunningConfig
+
+
 class ConfigMgr(object):
     """ The class represents frr configuration """
+    RUNNING_CONFIG_CHECK_INTERVAL = 300  # seconds between checks of the running config model against FRR
+
     def __init__(self, frr):
         self.frr = frr
         self.current_config = None
         self.current_config_raw = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.running_config = None
+        self.running_config_check_time = 0
 
     def reset(self):
         """ Reset stored config """
@@ -27,6 +37,33 @@ class ConfigMgr(object):
         text += ["     "]  # Add empty line to have something to work on, if there is no text
         self.current_config_raw = text
         self.current_config = self.to_canonical(out)  # FIXME: use text as an input
+        self.running_config = RunningConfig(out)
+        self.running_config.stale = out == ""  # read it again on the next use
+        self.running_config_check_time = time.monotonic()
+
+    def get_running_config(self):
+        """
+        Get the model of the running config. The model is read from FRR on the first use, or when
+        it can't follow a change. Otherwise it's updated with the committed changes, and compared
+        with FRR every RUNNING_CONFIG_CHECK_INTERVAL seconds.
+        :return: RunningConfig object
+        """
+        if self.running_config is None or self.running_config.stale:
+            self.update()
+        elif time.monotonic() - self.running_config_check_time >= self.RUNNING_CONFIG_CHECK_INTERVAL:
+            self.check_running_config()
+        return self.running_config
+
+    def check_running_config(self):
+        """ Compare the model of the running config with FRR, and replace it if they differ """
+        out = self.frr.get_config()
+        if out == "":
+            return
+        self.running_config_check_time = time.monotonic()
+        running_config = RunningConfig(out)
+        if running_config.checksum() != self.running_config.checksum():
+            log_warn("ConfigMgr::The running config model is different from FRR. Replace it")
+            self.running_config = running_config
 
     def push_list(self, cmdlist):
         """
@@ -58,6 +95,11 @@ class ConfigMgr(object):
         if self.changes.strip() == "":
             return True
         rc_write = self.frr.write(self.changes)
+        if self.running_config is not None:
+            if rc_write:
+                self.running_config.apply(self.changes)
+            else:
+                self.running_config.stale = True  # a part of the changes could be applied
         rc_restart = self.frr.restart_peer_groups(self.peer_groups_to_restart)
         self.reset()
         return rc_write and rc_restart
@@ -9,6 +9,9 @@ class Directory(object):
     def __init__(self):
         self.data = defaultdict(dict)  # storage. A key is a slot name, a value is a dictionary with data
         self.notify = defaultdict(lambda: defaultdict(list))  # registered callbacks: slot -> path -> handlers[]
+        self.notify_index = defaultdict(lambda: defaultdict(set))  # registered paths: slot -> key -> paths
+        self.notify_slot = defaultdict(list)  # registered callbacks: slot -> handlers[]
+        self.versions = defaultdict(int)  # slot -> number of changes of the slot
 
     @staticmethod
     def get_slot_name(db, table):
@@ -60,9 +63,15 @@ class Directory(object):
         slot = self.get_slot_name(db, table)
         return self.path_traverse(slot, path)[1]
 
+    @staticmethod
+    def get_path_key(path):
+        """ Return the key of the slot a path starts with. An empty string for the slot itself """
+        return path.split("/", 1)[0]
+
     def put(self, db, table, key, value):
         """
-        Put information into the storage. Notify handlers which are dependant to the information
+        Put information into the storage. Notify handlers which are dependant to the information:
+        the handlers of the paths which appeared or changed their value, and the handlers of the slot
         :param db: db name
         :param table: table name
         :param key: key to change
@@ -70,12 +79,22 @@ class Directory(object):
         :return:
         """
         slot = self.get_slot_name(db, table)
+        paths = []
+        if slot in self.notify_index:
+            # Only the paths of the key can change. The slot itself, updated in place, can only appear
+            index = self.notify_index[slot]
+            paths = [(path, self.path_traverse(slot, path)) for path in index.get(key, set()) | index.get("", set())]
         self.data[slot][key] = value
-        if slot in self.notify:
-            for path in self.notify[slot].keys():
-                if self.path_exist(db, table, path):
-                    for handler in self.notify[slot][path]:
-                        handler()
+        self.versions[slot] += 1
+        handlers = []
+        for path, old in paths:
+            new = self.path_traverse(slot, path)
+            if new[0] and new != old:
+                handlers.extend(handler for handler in self.notify[slot][path] if handler not in handlers)
+        for handler in handlers:
+            handler()
+        for handler in self.notify_slot.get(slot, []):
+            handler()
 
     def get(self, db, table, key):
         """
@@ -109,6 +128,7 @@ class Directory(object):
         if slot in self.data:
             if key in self.data[slot]:
                 del self.data[slot][key]
+                self.versions[slot] += 1
             else:
                 log_err("Directory: Can't remove key '%s' from slot '%s'. The key doesn't exist" % (key, slot))
         else:
@@ -123,9 +143,20 @@ class Directory(object):
         slot = self.get_slot_name(db, table)
         if slot in self.data:
             del self.data[slot]
+            self.versions[slot] += 1
         else:
             log_err("Directory: Can't remove slot '%s'. The slot doesn't exist" % slot)
 
+    def get_version(self, db, table):
+        """
+        Get the version of a slot, which changes on every change of the slot
+        :param db: db name
+        :param table: table name
+        :return: version number
+        """
+        slot = self.get_slot_name(db, table)
+        return self.versions[slot]
+
     def available(self, db, table):
         """
         Check if the table is available
@@ -149,11 +180,23 @@ class Directory(object):
 
     def subscribe(self, deps, handler):
         """
-        Subscribe the handler to be run as soon as all dependencies are presented
-        :param deps:
-        :param handler:
+        Subscribe the handler to be run as soon as a dependency is presented, when a put makes
+        its path appear in the storage
+        :param deps: list of dependencies
+        :param handler: callable without arguments
         :return:
         """
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
-            self.notify[slot][path].append(handler)
\ No newline at end of file
+            self.notify[slot][path].append(handler)
+            self.notify_index[slot][self.get_path_key(path)].add(path)
+
+    def subscribe_slot(self, db, table, handler):
+        """
+        Subscribe the handler to be run on every put into the slot
+        :param db: db name
+        :param table: table name
+        :param handler: callable without arguments
+        """
+        slot = self.get_slot_name(db, table)
+        self.notify_slot[slot].append(handler)
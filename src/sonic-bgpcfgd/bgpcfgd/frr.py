@@ -1,17 +1,112 @@
 import os
 import datetime
+import re
+import socket
 import time
 import tempfile
 
-from bgpcfgd.log import log_err, log_info, log_warn, log_crit
+from bgpcfgd.log import log_err, log_info, log_warn, log_crit, log_debug
 from .vars import g_debug
 from .utils import run_command
 
 
+class VtyError(Exception):
+    """ The VTY socket of a FRR daemon can't be used """
+    pass
+
+
+class VtyClient(object):
+    """
+    Persistent connections to the VTY sockets of the FRR daemons, the channel vtysh uses.
+    A command is sent NUL terminated. The daemon replies with the output of the command,
+    followed by three NUL bytes and the return code of the command.
+    """
+    TIMEOUT = 60  # seconds to wait for the reply of a command
+
+    def __init__(self, vty_dir):
+        self.vty_dir = vty_dir
+        self.socks = {}
+
+    def path(self, daemon):
+        return os.path.join(self.vty_dir, "%s.vty" % daemon)
+
+    def is_available(self, daemon):
+        """ Return True if the daemon is connected, or its VTY socket exists """
+        return daemon in self.socks or os.path.exists(self.path(daemon))
+
+    def connect(self, daemon):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.TIMEOUT)
+        try:
+            sock.connect(self.path(daemon))
+        except socket.error as e:
+            sock.close()
+            raise VtyError("can't connect to %s: %s" % (daemon, str(e)))
+        self.socks[daemon] = sock
+        rc, out = self.execute(daemon, "enable")
+        if rc != 0:
+            self.close(daemon)
+            raise VtyError("command 'enable' failed on %s: rc=%d out='%s'" % (daemon, rc, out))
+        log_info("Connected to the VTY of FRR daemon '%s'" % daemon)
+
+    def close(self, daemon=None):
+        """ Close the connection to the daemon, or to all daemons if daemon is None """
+        daemons = list(self.socks.keys()) if daemon is None else [daemon]
+        for name in daemons:
+            sock = self.socks.pop(name, None)
+            if sock is not None:
+                sock.close()
+
+    def execute(self, daemon, command):
+        """
+        Execute a command on a FRR daemon. The daemon is connected on the first use, and
+        reconnected on the use after an error.
+        :param daemon: name of the FRR daemon
+        :param command: command to execute
+        :return: Tuple: return code of the command, output of the command
+        """
+        if daemon not in self.socks:
+            self.connect(daemon)
+        sock = self.socks[daemon]
+        reply = b""
+        try:
+            sock.sendall(command.encode('utf-8') + b"\0")
+            while len(reply) < 4 or reply[-4:-1] != b"\0\0\0":
+                chunk = sock.recv(65536)
+                if not chunk:
+                    raise socket.error("connection closed")
+                reply += chunk
+        except socket.error as e:
+            self.close(daemon)
+            raise VtyError("command '%s' failed on %s: %s" % (command, daemon, str(e)))
+        return reply[-1], reply[:-4].decode('utf-8', 'replace')
+
+
 class FRR(object):
     """Proxy object with FRR"""
-    def __init__(self, daemons):
+    # Daemons which get the configuration blocks starting with a command, the way vtysh
+    # dispatches them. Blocks which start with any other command are written by vtysh.
+    BLOCK_DAEMONS = [
+        (re.compile(r"(no )?router bgp\b"), ["bgpd"]),
+        (re.compile(r"(no )?bgp (as-path|community-list|extcommunity-list|large-community-list)\b"), ["bgpd"]),
+        (re.compile(r"(no )?route-map\b"), ["bgpd", "zebra"]),
+        (re.compile(r"(no )?(ip|ipv6) prefix-list\b"), ["bgpd", "zebra"]),
+        (re.compile(r"(no )?(ip|ipv6) (protocol|nht)\b"), ["zebra"]),
+        (re.compile(r"(no )?(ip|ipv6) route\b"), ["staticd"]),
+    ]
+
+    def __init__(self, daemons, vty_dir="/run/frr"):
         self.daemons = daemons
+        self.vty = VtyClient(vty_dir)
+        # latency of the configuration commits
+        self.commit_stats = {
+            'commits': 0,
+            'failed': 0,
+            'vtysh_commits': 0,
+            'last_ms': 0.0,
+            'max_ms': 0.0,
+            'total_ms': 0.0,
+        }
 
     def wait_for_daemons(self, seconds):
         """
@@ -30,21 +125,106 @@ class FRR(object):
             time.sleep(0.1)  # sleep 100 ms
         raise RuntimeError("FRR daemons hasn't been started in %d seconds" % seconds)
 
-    @staticmethod
-    def get_config():
-        ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
+    def vty_daemon_available(self, daemon):
+        return daemon in self.daemons and self.vty.is_available(daemon)
+
+    def get_config(self):
+        """
+        Read the running configuration. Through the VTY it is the configuration of bgpd, which
+        holds everything bgpcfgd configures and reads back.
+        """
+        if self.vty_daemon_available("bgpd"):
+            try:
+                ret_code, out = self.vty.execute("bgpd", "show running-config")
+                err = ""
+            except VtyError as e:
+                log_warn("Can't read running config through the VTY, use vtysh: %s" % str(e))
+                ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
+        else:
+            ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
         if ret_code != 0:
             log_crit("can't update running config: rc=%d out='%s' err='%s'" % (ret_code, out, err))
             return ""
         return out
 
+    def split_blocks(self, config_text):
+        """
+        Split configuration into blocks of a top-level command and its indented sub-commands
+        :param config_text: configuration text
+        :return: list of Tuples: daemons the block is written to, lines of the block.
+                 None if a block can't be written through the VTY
+        """
+        blocks = []
+        for line in config_text.split("\n"):
+            s_line = line.strip()
+            if s_line == "" or s_line.startswith("!"):
+                continue
+            if line[0].isspace() or s_line.startswith("exit") or s_line == "end":
+                if not blocks:
+                    return None
+                blocks[-1][1].append(s_line)
+                continue
+            for pattern, daemons in self.BLOCK_DAEMONS:
+                if pattern.match(s_line):
+                    daemons = [daemon for daemon in daemons if daemon in self.daemons]
+                    break
+            else:
+                return None
+            if not daemons or not all(self.vty.is_available(daemon) for daemon in daemons):
+                return None
+            blocks.append((daemons, [s_line]))
+        return blocks
+
+    def write_vty(self, blocks):
+        """
+        Write configuration blocks through the VTY of the daemons
+        :param blocks: blocks returned by split_blocks()
+        :return: Tuple: True if all the written commands succeeded, False otherwise,
+                 and where a VTY error stopped the write: a Tuple of the index of the block,
+                 the index of the daemon in the daemons of the block and the index of the
+                 first line of the block the daemon didn't get. None if all the blocks were
+                 written
+        """
+        res = True
+        for index, (daemons, lines) in enumerate(blocks):
+            for daemon_index, daemon in enumerate(daemons):
+                # Start each block from the configuration node
+                for line_index, line in enumerate(["configure terminal"] + lines + ["end"]):
+                    try:
+                        ret_code, out = self.vty.execute(daemon, line)
+                    except VtyError as e:
+                        log_warn("Can't write configuration through the VTY: %s" % str(e))
+                        return res, (index, daemon_index, max(line_index - 1, 0))
+                    if ret_code != 0:
+                        err_tuple = line, daemon, ret_code, out
+                        log_err("ConfigMgr::commit(): can't push configuration line '%s' to %s, rc='%d', output='%s'" % err_tuple)
+                        res = False
+                        if line == "configure terminal":
+                            break
+        return res, None
+
     @staticmethod
-    def write(config_text):
+    def join_blocks(blocks):
+        """
+        Join configuration blocks back into configuration text
+        :param blocks: blocks returned by split_blocks()
+        :return: configuration text
+        """
+        return "\n".join(lines[0] + "".join("\n " + line for line in lines[1:]) for _, lines in blocks)
+
+    def write_vtysh(self, config_text, daemon=None):
+        """
+        Write configuration through vtysh
+        :param config_text: configuration text
+        :param daemon: the only daemon the configuration is written to, or None to let vtysh
+                       dispatch it to all the daemons
+        :return: True if the configuration was applied successfully, False otherwise
+        """
         fd, tmp_filename = tempfile.mkstemp(dir='/tmp')
         os.close(fd)
         with open(tmp_filename, 'w') as fp:
             fp.write("%s\n" % config_text)
-        command = ["vtysh", "-f", tmp_filename]
+        command = ["vtysh", "-f", tmp_filename] if daemon is None else ["vtysh", "-d", daemon, "-f", tmp_filename]
         ret_code, out, err = run_command(command)
         if ret_code != 0:
             err_tuple = tmp_filename, ret_code, out, err
@@ -54,15 +234,84 @@ class FRR(object):
                 os.remove(tmp_filename)
         return ret_code == 0
 
-    @staticmethod
-    def restart_peer_groups(peer_groups):
+    def write_unsent(self, blocks, failed):
+        """
+        Write by vtysh what a VTY error stopped write_vty() from writing. The lines a daemon
+        got already are not replayed, as many commands, like 'no neighbor', can't be applied
+        twice: the rest of the failed block is written to each of its daemons on its own,
+        re-entering the node of the block, and the blocks after it are dispatched by vtysh.
+        The line the VTY error happened at is taken as not applied, as the daemon didn't reply.
+        :param blocks: blocks returned by split_blocks()
+        :param failed: where write_vty() stopped
+        :return: True if the configuration was applied successfully, False otherwise
+        """
+        index, daemon_index, line_index = failed
+        if daemon_index == 0 and line_index == 0:
+            # No daemon got the failed block
+            return self.write_vtysh(self.join_blocks(blocks[index:]))
+        res = True
+        daemons, lines = blocks[index]
+        for daemon in daemons[daemon_index:]:
+            if line_index < len(lines):
+                unsent = ([lines[0]] if line_index > 0 else []) + lines[line_index:]
+                res = self.write_vtysh(self.join_blocks([(daemons, unsent)]), daemon) and res
+            line_index = 0
+        if index + 1 < len(blocks):
+            res = self.write_vtysh(self.join_blocks(blocks[index + 1:])) and res
+        return res
+
+    def write(self, config_text):
+        """
+        Write configuration to FRR. It goes through the VTY of the daemons when all its blocks
+        can, otherwise through vtysh. On a VTY error the lines which were not written yet are
+        written by vtysh, see write_unsent().
+        :param config_text: configuration text
+        :return: True if the configuration was applied successfully, False otherwise
+        """
+        start = time.time()
+        res = True
+        failed = (0, 0, 0)  # where the VTY write stopped, None if vtysh isn't needed
+        blocks = self.split_blocks(config_text)
+        if blocks is not None:
+            res, failed = self.write_vty(blocks)
+            if failed is not None:
+                self.vty.close()
+        if failed is not None:
+            if failed == (0, 0, 0):
+                res = self.write_vtysh(config_text) and res
+            else:
+                res = self.write_unsent(blocks, failed) and res
+            self.commit_stats['vtysh_commits'] += 1
+        self.update_commit_stats(res, (time.time() - start) * 1000.0)
+        return res
+
+    def update_commit_stats(self, res, elapsed_ms):
+        stats = self.commit_stats
+        stats['commits'] += 1
+        if not res:
+            stats['failed'] += 1
+        stats['last_ms'] = elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['total_ms'] += elapsed_ms
+        log_debug("FRR commit %d took %.1f ms, %.1f ms in average" % (stats['commits'], elapsed_ms, stats['total_ms'] / stats['commits']))
+
+    def restart_peer_groups(self, peer_groups):
         """ Restart peer-groups which support BBR
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
         res = True
         for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
+            command = "clear bgp peer-group %s soft in" % peer_group
+            rc = None
+            if self.vty_daemon_available("bgpd"):
+                try:
+                    rc, out = self.vty.execute("bgpd", command)
+                    err = ""
+                except VtyError as e:
+                    log_warn("Can't restart bgp peer-group through the VTY, use vtysh: %s" % str(e))
+            if rc is None:
+                rc, out, err = run_command(["vtysh", "-c", command])
             if rc != 0:
                 log_value = peer_group, rc, out, err
                 log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
@@ -68,7 +68,11 @@ def do_work():
         # Device Global Manager
         DeviceGlobalCfgMgr(common_objs, "CONFIG_DB", swsscommon.CFG_BGP_DEVICE_GLOBAL_TABLE_NAME),
     ]
-    runner = Runner(common_objs['cfg_mgr'])
+    runner_opts = common_objs['constants'].get('bgp', {}).get('runner', {})
+    runner = Runner(common_objs['cfg_mgr'],
+                    coalesce_window_ms=runner_opts.get('coalesce_window_ms', 0),
+                    max_latency_ms=runner_opts.get('max_latency_ms', 1000),
+                    max_batch_size=runner_opts.get('max_batch_size', 10000))
     for mgr in managers:
         runner.add_manager(mgr)
     runner.run()
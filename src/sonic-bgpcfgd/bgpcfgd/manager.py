@@ -1,3 +1,6 @@
+from collections import defaultdict, OrderedDict
+from functools import partial
+
 from swsscommon import swsscommon
 
 from .log import log_debug, log_err
@@ -19,8 +22,15 @@ class Manager(object):
         self.deps = deps
         self.db_name = database
         self.table_name = table_name
-        self.set_queue = []
-        self.directory.subscribe(deps, self.on_deps_change)  # subscribe this class method on directory changes
+        self.set_queue = OrderedDict()  # deferred 'SET' commands: key -> data
+        self.set_queue_deps = {}  # key -> dependencies the deferred key waits for. None if they are unknown
+        self.waiting = defaultdict(OrderedDict)  # dependency -> keys which wait for it
+        self.waiting_slots = defaultdict(OrderedDict)  # (db, table) -> keys which wait for any change of the table
+        self.dep_handlers = {}  # dependency -> handler subscribed on the directory
+        self.slot_handlers = {}  # (db, table) -> handler subscribed on the directory
+        for db, table in set((db, table) for db, table, _ in deps):
+            # keys which wait for unknown dependencies are retried on every change of the dependency tables
+            self.subscribe_slot(db, table)
 
     def get_database(self):
         """ Return associated database """
@@ -38,29 +48,130 @@ class Manager(object):
         :param data: associated data of the event. Empty for 'DEL' operation.
         """
         if op == swsscommon.SET_COMMAND:
-            if self.directory.available_deps(self.deps):  # all required dependencies are set in the Directory?
-                res = self.set_handler(key, data)
-                if not res:  # set handler returned False, which means it is not ready to process is. Save it for later.
-                    log_debug("'SET' handler returned NOT_READY for the Manager: %s" % self.__class__)
-                    self.set_queue.append((key, data))
-            else:
-                log_debug("Not all dependencies are met for the Manager: %s" % self.__class__)
-                self.set_queue.append((key, data))
+            self.undefer(key)  # the new data replaces the deferred one
+            self.process_set(key, data)
         elif op == swsscommon.DEL_COMMAND:
+            self.undefer(key)
             self.del_handler(key)
         else:
             log_err("Invalid operation '%s' for key '%s'" % (op, key))
 
-    def on_deps_change(self):
-        """ This method is being executed on every dependency change """
+    def batch_handler(self, events):
+        """
+        This method is executed on a batch of add/remove events on the table.
+        A Manager could override it to process the events together.
+        :param events: list of (key, op, data)
+        """
+        for key, op, data in events:
+            self.handler(key, op, data)
+
+    def process_set(self, key, data):
+        """
+        Run the 'SET' handler, or defer the command until its dependencies are presented
+        :param key: key of the table entry
+        :param data: associated data of the event
+        """
+        if not self.directory.available_deps(self.deps):  # all required dependencies are set in the Directory?
+            log_debug("Not all dependencies are met for the Manager: %s" % self.__class__)
+            self.defer(key, data, self.deps)
+        elif not self.set_handler(key, data):
+            # set handler returned False, which means it is not ready to process is. Save it for later.
+            log_debug("'SET' handler returned NOT_READY for the Manager: %s" % self.__class__)
+            self.defer(key, data, self.get_set_deps(key, data))
+
+    def defer(self, key, data, deps):
+        """
+        Save a 'SET' command for later
+        :param key: key of the table entry
+        :param data: associated data of the event
+        :param deps: list of dependencies the command waits for. None if they are unknown
+        """
+        self.set_queue[key] = data
+        self.set_queue_deps[key] = deps
+        for dep in deps or []:
+            db, table, path = dep
+            if path is None:
+                self.subscribe_slot(db, table)
+                self.waiting_slots[(db, table)][key] = None
+                continue
+            if dep not in self.dep_handlers:
+                self.dep_handlers[dep] = partial(self.on_dep_change, dep)
+                self.directory.subscribe([dep], self.dep_handlers[dep])
+            self.waiting[dep][key] = None
+
+    def undefer(self, key):
+        """
+        Remove a 'SET' command from the deferred ones
+        :param key: key of the table entry
+        :return: data of the command, None if the command wasn't deferred
+        """
+        if key not in self.set_queue:
+            return None
+        for db, table, path in self.set_queue_deps.pop(key) or []:
+            if path is None:
+                self.waiting_slots[(db, table)].pop(key, None)
+            else:
+                self.waiting[(db, table, path)].pop(key, None)
+        return self.set_queue.pop(key)
+
+    def subscribe_slot(self, db, table):
+        """
+        Subscribe on every change of a table, to retry the deferred 'SET' commands which wait for it
+        :param db: db name
+        :param table: table name
+        """
+        if (db, table) not in self.slot_handlers:
+            self.slot_handlers[(db, table)] = partial(self.on_deps_change, db, table)
+            self.directory.subscribe_slot(db, table, self.slot_handlers[(db, table)])
+
+    def retry(self, keys):
+        """
+        Run again the deferred 'SET' commands of keys, which dependencies are presented
+        :param keys: list of keys
+        """
+        for key in keys:
+            if key not in self.set_queue:
+                continue
+            deps = self.set_queue_deps[key]
+            if deps is not None and not self.directory.available_deps([dep for dep in deps if dep[2] is not None]):
+                continue
+            self.process_set(key, self.undefer(key))
+
+    def on_dep_change(self, dep):
+        """ This method is being executed when the dependency dep is presented """
+        self.retry(list(self.waiting[dep]))
+
+    def on_deps_change(self, db, table):
+        """
+        This method is being executed on every change of a table which the Manager depends on, or
+        which a deferred 'SET' command waits for. The commands waiting for the table are retried,
+        and those with unknown dependencies when the table is one of the Manager's dependency tables
+        """
         if not self.directory.available_deps(self.deps):
             return
-        new_queue = []
-        for key, data in self.set_queue:
-            res = self.set_handler(key, data)
-            if not res:
-                new_queue.append((key, data))
-        self.set_queue = new_queue
+        keys = list(self.waiting_slots[(db, table)])
+        if any(db == dep_db and table == dep_table for dep_db, dep_table, _ in self.deps):
+            keys.extend(key for key, deps in self.set_queue_deps.items() if deps is None)
+        self.retry(keys)
+
+    def get_set_deps(self, key, data):
+        """
+        Get the dependencies a 'SET' command waits for, after the 'SET' handler returned False.
+        The command is retried as soon as they are all presented.
+        :param key: key of the table entry
+        :param data: associated data of the event
+        :return: list of dependencies, or None if they are unknown. Then the command is retried on
+                 every change of the dependency tables of the Manager. A dependency with None as
+                 the path waits for the next change of its table
+        """
+        return None
+
+    def get_queue_stats(self):
+        """ Return the number of the deferred 'SET' commands, and of those waiting for known dependencies """
+        return {
+            'deferred': len(self.set_queue),
+            'waiting_deps': sum(1 for deps in self.set_queue_deps.values() if deps is not None),
+        }
 
     def set_handler(self, key, data):
         """ Placeholder for 'SET' command """
@@ -1,4 +1,5 @@
 import json
+from collections import OrderedDict
 from swsscommon import swsscommon
 
 import jinja2
@@ -11,8 +12,24 @@ from .utils import run_command
 from .managers_device_global import DeviceGlobalCfgMgr
 
 
+def freeze(value):
+    """
+    Convert a rendering parameter into a hashable value
+    :param value: value built of dictionaries, lists, sets and scalars
+    :return: hashable value, equal for equal parameters
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((repr(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(v) for v in value))
+    return value
+
+
 class BGPPeerGroupMgr(object):
     """ This class represents peer-group and routing policy for the peer_type """
+    RENDER_CACHE_SIZE = 64  # rendered templates to keep. The rendering parameters rarely change
     def __init__(self, common_objs, base_template):
         """
         Construct the object
@@ -25,6 +42,35 @@ class BGPPeerGroupMgr(object):
         self.policy_template = tf.from_file(base_template + "policies.conf.j2")
         self.peergroup_template = tf.from_file(base_template + "peer-group.conf.j2")
         self.device_global_cfgmgr = DeviceGlobalCfgMgr(common_objs, "CONFIG_DB", swsscommon.CFG_BGP_DEVICE_GLOBAL_TABLE_NAME)
+        # The templates don't depend on the peer. They are rendered once for each set of the parameters they read
+        self.template_variables = {
+            template.name: sorted(tf.get_variables(template)) for template in [self.policy_template, self.peergroup_template]
+        }
+        self.render_cache = {}
+        self.scheduled = None  # commands scheduled for the current batch of peers, None outside of a batch
+
+    def render(self, template, **kwargs):
+        """
+        Render a template, or return it from the cache if it was rendered with the same parameters
+        :param template: Jinja2 template object
+        :param kwargs: dictionary with parameters for rendering
+        :return: rendered template
+        """
+        params = tuple(freeze(kwargs.get(name)) for name in self.template_variables[template.name])
+        cache_key = template.name, params
+        if cache_key not in self.render_cache:
+            if len(self.render_cache) >= self.RENDER_CACHE_SIZE:
+                self.render_cache.clear()
+            self.render_cache[cache_key] = template.render(**kwargs)
+        return self.render_cache[cache_key]
+
+    def start_batch(self):
+        """ Start a batch of peers. A command is scheduled once per batch """
+        self.scheduled = set()
+
+    def end_batch(self):
+        """ End the batch of peers """
+        self.scheduled = None
 
     def update(self, name, **kwargs):
         """
@@ -43,7 +89,7 @@ class BGPPeerGroupMgr(object):
         :param kwargs: dictionary with parameters for rendering
         """
         try:
-            policy = self.policy_template.render(**kwargs)
+            policy = self.render(self.policy_template, **kwargs)
         except jinja2.TemplateError as e:
             log_err("Can't render policy template name: '%s': %s" % (name, str(e)))
             return False
@@ -57,7 +103,7 @@ class BGPPeerGroupMgr(object):
         :param kwargs: dictionary with parameters for rendering
         """
         try:
-            pg = self.peergroup_template.render(**kwargs)
+            pg = self.render(self.peergroup_template, **kwargs)
             tsa_rm = self.device_global_cfgmgr.check_state_and_get_tsa_routemaps(pg)
         except jinja2.TemplateError as e:
             log_err("Can't render peer-group template: '%s': %s" % (name, str(e)))
@@ -77,6 +123,11 @@ class BGPPeerGroupMgr(object):
         :param txt: text for the syslog output
         :return:
         """
+        if self.scheduled is not None:
+            if cmd in self.scheduled:
+                log_debug("%s is already scheduled to be updated" % txt)
+                return True
+            self.scheduled.add(cmd)
         self.cfg_mgr.push(cmd)
         log_info("%s has been scheduled to be updated" % txt)
         return True
@@ -140,8 +191,26 @@ class BGPPeerMgrBase(Manager):
 
         self.peers = self.load_peers()
         self.peer_group_mgr = BGPPeerGroupMgr(self.common_objs, base_template)
+        self.loopback_interfaces = None  # (version of the LOOPBACK_INTERFACE table, its keys for the templates)
+        self.bulk_add = None  # vrf -> 'add' commands of the current batch of peers, None outside of a batch
         return
 
+    def batch_handler(self, events):
+        """
+        Handle a batch of events. The policy and the peer-group are scheduled once for the batch,
+        and the new peers are scheduled in one block for each vrf
+        :param events: list of (key, op, data)
+        """
+        self.bulk_add = OrderedDict()
+        self.peer_group_mgr.start_batch()
+        try:
+            super(BGPPeerMgrBase, self).batch_handler(events)
+        finally:
+            bulk_add, self.bulk_add = self.bulk_add, None
+            self.peer_group_mgr.end_batch()
+            for vrf, cmds in bulk_add.items():
+                self.apply_op("\n".join(cmds), vrf)
+
     def set_handler(self, key, data):
         """
          It runs on 'SET' command
@@ -155,6 +224,38 @@ class BGPPeerMgrBase(Manager):
         else:
             return self.update_peer(vrf, nbr, data)
 
+    def get_set_deps(self, key, data):
+        """
+        Get the dependencies of a peer which couldn't be added: the loopback addresses, its local
+        address, the interface of the address, and its neighbor metadata
+        :param key: key of the neighbor
+        :param data: associated data
+        :return: list of the missing dependencies, None if they are all presented
+        """
+        # The loopback addresses are in the keys of the LOOPBACK_INTERFACE table
+        if self.get_lo_ipv4("Loopback0|") is None or \
+                (self.peer_type == 'internal' and self.get_lo_ipv4("Loopback4096|") is None):
+            return [("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME, None)]
+        deps = []
+        if "local_addr" in data:
+            local_addr = str(netaddr.IPNetwork(str(data["local_addr"])).ip)
+            local_address = self.directory.get_path("LOCAL", "local_addresses", local_addr)
+            if local_address is None:
+                deps.append(("LOCAL", "local_addresses", local_addr))
+            elif "interface" in local_address:
+                interface = local_address["interface"]
+                if "/" in interface:
+                    # the interface name can't be a Directory path
+                    if interface not in self.directory.get_slot("LOCAL", "interfaces"):
+                        deps.append(("LOCAL", "interfaces", None))
+                elif not self.directory.path_exist("LOCAL", "interfaces", interface):
+                    deps.append(("LOCAL", "interfaces", interface))
+        if self.check_neig_meta and 'name' in data:
+            neigmeta_dep = ("CONFIG_DB", swsscommon.CFG_DEVICE_NEIGHBOR_METADATA_TABLE_NAME, data['name'])
+            if not self.directory.path_exist(*neigmeta_dep):
+                deps.append(neigmeta_dep)
+        return deps or None
+
     def add_peer(self, vrf, nbr, data):
         """
         Add a peer into FRR. This is used if the peer is not existed in FRR yet
@@ -203,8 +304,7 @@ class BGPPeerMgrBase(Manager):
             'neighbor_addr': nbr,
             'bgp_session': data,
             'loopback0_ipv4': lo0_ipv4,
-            'CONFIG_DB__LOOPBACK_INTERFACE':{ tuple(key.split('|')) : {} for key in self.directory.get_slot("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME)
-                                                                         if '|' in key }
+            'CONFIG_DB__LOOPBACK_INTERFACE': self.get_loopback_interfaces(),
         }
         if self.check_neig_meta:
             neigmeta = self.directory.get_slot("CONFIG_DB", swsscommon.CFG_DEVICE_NEIGHBOR_METADATA_TABLE_NAME)
@@ -223,7 +323,10 @@ class BGPPeerMgrBase(Manager):
             log_err("%s: %s" % (msg, str(e)))
             return True
         if cmd is not None:
-            self.apply_op(cmd, vrf)
+            if self.bulk_add is not None:
+                self.bulk_add.setdefault(vrf, []).append(cmd)
+            else:
+                self.apply_op(cmd, vrf)
             key = (vrf, nbr)
             self.peers.add(key)
             log_info("Peer '(%s|%s)' has been scheduled to be added with attributes '%s'" % print_data)
@@ -311,6 +414,18 @@ class BGPPeerMgrBase(Manager):
         self.cfg_mgr.push(cmd)
         return True
 
+    def get_loopback_interfaces(self):
+        """
+        Get the keys of the LOOPBACK_INTERFACE table with an ip prefix, as the templates expect them.
+        They are rebuilt when the table changed only
+        :return: dictionary: (interface name, ip prefix) -> {}
+        """
+        version = self.directory.get_version("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME)
+        if self.loopback_interfaces is None or self.loopback_interfaces[0] != version:
+            slot = self.directory.get_slot("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME)
+            self.loopback_interfaces = version, {tuple(key.split('|')): {} for key in slot if '|' in key}
+        return self.loopback_interfaces[1]
+
     def get_lo_ipv4(self, loopback_str):
         """
         Extract Loopback0 ipv4 address from the Directory
@@ -1,7 +1,8 @@
-from collections import defaultdict
+import time
+from collections import defaultdict, deque, OrderedDict
 from swsscommon import swsscommon
 
-from .log import log_debug, log_crit
+from .log import log_debug, log_crit, log_info
 
 
 g_run = True
@@ -13,20 +14,55 @@ def signal_handler(_, __):  # signal_handler(signum, frame)
     g_run = False
 
 
+def percentile(samples, pct):
+    """
+    Return the pct percentile of samples, by the nearest rank method
+    :param samples: sorted list of numbers
+    :param pct: percentile, from 0 to 100
+    """
+    if not samples:
+        return 0
+    rank = max(int(round(pct / 100.0 * len(samples))), 1)
+    return samples[rank - 1]
+
+
 class Runner(object):
     """ Implements main io-loop of the application
         It will run event handlers inside of Manager objects
         when corresponding db/table is updated
+
+        Events are coalesced before the handlers see them. A batch of events is dispatched
+        and committed to FRR once no event came for coalesce_window_ms, the first event of
+        the batch is max_latency_ms old, or max_batch_size events were received. With the
+        default window of 0, the events of each select() wakeup are committed at once.
     """
     SELECT_TIMEOUT = 1000
+    STATS_SAMPLES = 1000       # number of the latest commits the percentiles are computed on
+    STATS_LOG_INTERVAL = 100   # log the statistics every STATS_LOG_INTERVAL commits
 
-    def __init__(self, cfg_manager):
+    def __init__(self, cfg_manager, coalesce_window_ms=0, max_latency_ms=1000, max_batch_size=10000):
         """ Constructor """
         self.cfg_manager = cfg_manager
+        self.coalesce_window = coalesce_window_ms / 1000.0
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_batch_size = max_batch_size
         self.db_connectors = {}
         self.selector = swsscommon.Select()
-        self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
+        self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> batch handlers[]
         self.subscribers = set()
+        self.managers = []
+        # batch of events: (subscriber, key) -> list of (op, data)
+        self.pending = OrderedDict()
+        self.pending_events = 0
+        self.first_event_time = None
+        self.last_event_time = None
+        self.stats = {
+            'commits': 0,
+            'events': 0,
+            'coalesced_events': 0,
+        }
+        self.events_per_commit = deque(maxlen=self.STATS_SAMPLES)
+        self.commit_latency_ms = deque(maxlen=self.STATS_SAMPLES)
 
     def add_manager(self, manager):
         """
@@ -46,25 +82,117 @@ class Runner(object):
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
             self.subscribers.add(subscriber)
             self.selector.addSelectable(subscriber)
-        self.callbacks[db][table_name].append(manager.handler)
+        self.callbacks[db][table_name].append(manager.batch_handler)
+        self.managers.append(manager)
 
     def run(self):
         """ Main loop """
         while g_run:
-            state, _ = self.selector.select(Runner.SELECT_TIMEOUT)
-            if state == self.selector.TIMEOUT:
-                continue
-            elif state == self.selector.ERROR:
+            state, _ = self.selector.select(self.get_select_timeout())
+            if state == self.selector.ERROR:
                 raise Exception("Received error from select")
+            elif state != self.selector.TIMEOUT:
+                self.collect_events()
+            if self.is_batch_ready():
+                self.process_batch()
+
+    def get_select_timeout(self):
+        """ Return the time in ms select() can wait before the pending batch is due """
+        if not self.pending:
+            return Runner.SELECT_TIMEOUT
+        due = min(self.last_event_time + self.coalesce_window, self.first_event_time + self.max_latency)
+        return max(int((due - time.monotonic()) * 1000), 0)
+
+    def collect_events(self):
+        """
+        Read the events of all subscribers into the pending batch. The events of a key are
+        merged, the last one wins: a 'SET' replaces a pending 'SET', a 'DEL' replaces all the
+        pending events. A 'SET' after a 'DEL' is kept after it, so that the handlers still
+        see the key removed and created again.
+        Only the order of the events of a key is kept. A key is moved to the end of the batch
+        on each of its events, so the keys are dispatched in the order of their last events:
+        A:SET, B:SET, A:DEL is dispatched as B:SET, A:DEL.
+        """
+        now = time.monotonic()
+        for subscriber in self.subscribers:
+            while True:
+                key, op, fvs = subscriber.pop()
+                if not key:
+                    break
+                log_debug("Received message : '%s'" % str((key, op, fvs)))
+                if self.first_event_time is None:
+                    self.first_event_time = now
+                self.last_event_time = now
+                self.pending_events += 1
+                events = self.pending.setdefault((subscriber, key), [])
+                self.pending.move_to_end((subscriber, key))
+                if op == swsscommon.DEL_COMMAND:
+                    del events[:]
+                elif events and events[-1][0] == op:
+                    events.pop()
+                events.append((op, dict(fvs)))
+
+    def is_batch_ready(self):
+        """ Return True if the pending batch must be dispatched now """
+        if not self.pending:
+            return False
+        if self.pending_events >= self.max_batch_size:
+            return True
+        now = time.monotonic()
+        return now >= self.last_event_time + self.coalesce_window or now >= self.first_event_time + self.max_latency
+
+    def process_batch(self):
+        """ Run the handlers on the pending batch of events and commit the changes to FRR """
+        # The consecutive events of a table are handled together, in the order they came
+        runs = []
+        for (subscriber, key), events in self.pending.items():
+            if not runs or runs[-1][0] is not subscriber:
+                runs.append((subscriber, []))
+            runs[-1][1].extend((key, op, data) for op, data in events)
+        dispatched = 0
+        for subscriber, events in runs:
+            callbacks = self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]
+            dispatched += len(events)
+            for callback in callbacks:
+                callback(events)
+        rc = self.cfg_manager.commit()
+        if not rc:
+            log_crit("Runner::commit was unsuccessful")
+        self.update_stats(dispatched, (time.monotonic() - self.first_event_time) * 1000.0)
+        self.pending = OrderedDict()
+        self.pending_events = 0
+        self.first_event_time = None
+        self.last_event_time = None
+
+    def update_stats(self, dispatched, latency_ms):
+        """
+        Account a commit
+        :param dispatched: number of events the handlers ran on
+        :param latency_ms: time from the first event of the batch to the end of the commit
+        """
+        self.stats['commits'] += 1
+        self.stats['events'] += self.pending_events
+        self.stats['coalesced_events'] += self.pending_events - dispatched
+        self.events_per_commit.append(dispatched)
+        self.commit_latency_ms.append(latency_ms)
+        log_debug("Runner: committed %d events (%d received) in %.1f ms" % (dispatched, self.pending_events, latency_ms))
+        if self.stats['commits'] % Runner.STATS_LOG_INTERVAL == 0:
+            log_info("Runner statistics: %s" % str(self.get_stats()))
 
-            for subscriber in self.subscribers:
-                while True:
-                    key, op, fvs = subscriber.pop()
-                    if not key:
-                        break
-                    log_debug("Received message : '%s'" % str((key, op, fvs)))
-                    for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
-                        callback(key, op, dict(fvs))
-            rc = self.cfg_manager.commit()
-            if not rc:
-                log_crit("Runner::commit was unsuccessful")
+    def get_stats(self):
+        """
+        Return the event and commit counters, with percentiles over the latest commits,
+        and the number of deferred 'SET' commands of the managers which have some
+        """
+        stats = dict(self.stats)
+        stats['deferred'] = {}
+        for manager in self.managers:
+            queue_stats = manager.get_queue_stats()
+            if queue_stats['deferred']:
+                stats['deferred']["%s:%s" % (manager.get_database(), manager.get_table_name())] = queue_stats
+        events = sorted(self.events_per_commit)
+        latency = sorted(self.commit_latency_ms)
+        for pct in (50, 90, 99):
+            stats['events_per_commit_p%d' % pct] = percentile(events, pct)
+            stats['commit_latency_ms_p%d' % pct] = round(percentile(latency, pct), 1)
+        return stats
@@ -0,0 +1,208 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+from .log import log_debug
+
+
+class RunningConfig(object):
+    """
+    Model of the FRR running configuration, indexed by the objects bgpcfgd looks up:
+    prefix-lists, standard community-lists, route-maps and the peer-groups of the bgp instances.
+    The model is loaded from the 'show running-config' output and updated with the commands
+    bgpcfgd pushes to FRR. A command the model can't follow marks it stale, a stale model must be
+    loaded again from FRR.
+    """
+    RE_PREFIX_LIST = re.compile(r'^(no )?(ip|ipv6) prefix-list (\S+)(?: seq (\d+) (.+))?$')
+    RE_COMMUNITY_LIST = re.compile(r'^bgp community-list standard (\S+)(?: seq \d+)? (permit|deny) (.+)$')
+    RE_NO_COMMUNITY_LIST = re.compile(r'^no bgp community-list (?:standard )?(\S+)$')
+    RE_ROUTE_MAP = re.compile(r'^route-map (\S+) (permit|deny) (\d+)$')
+    RE_NO_ROUTE_MAP = re.compile(r'^no route-map (\S+)(?: (permit|deny) (\d+))?$')
+    RE_PEER_GROUP = re.compile(r'^neighbor (\S+) peer-group$')
+    RE_NEIGHBOR_ROUTE_MAP = re.compile(r'^neighbor (\S+) route-map (\S+) (in|out)$')
+
+    def __init__(self, text=""):
+        """
+        Constructor
+        :param text: FRR running configuration
+        """
+        self.prefix_lists = {}  # (family, name) -> OrderedDict: seq -> rule
+        self.community_lists = {}  # name -> list of (action, value)
+        self.route_maps = {}  # name -> OrderedDict: seq -> { 'action': action, 'lines': [sub-commands] }
+        self.peer_groups = OrderedDict()  # peer-group name -> None
+        self.neighbor_route_maps = {}  # (neighbor or peer-group, direction) -> route-map name
+        self.stale = False
+        self.load(text)
+
+    def load(self, text):
+        """
+        Load the model from the FRR running configuration
+        :param text: FRR running configuration
+        """
+        route_map_entry = None
+        for line in text.split("\n"):
+            s_line = line.strip()
+            if s_line == "" or s_line.startswith("!"):
+                continue
+            if line[0].isspace():
+                if route_map_entry is not None:
+                    route_map_entry['lines'].append(s_line)
+                else:
+                    self.__load_bgp_line(s_line)
+                continue
+            route_map_entry = None
+            m = self.RE_ROUTE_MAP.match(s_line)
+            if m:
+                route_map_entry = self.__add_route_map_entry(*m.groups())
+            elif self.RE_PREFIX_LIST.match(s_line) or self.RE_COMMUNITY_LIST.match(s_line):
+                self.__apply_command(s_line)
+
+    def __load_bgp_line(self, s_line):
+        """ Index the neighbor commands of the bgp instances """
+        m = self.RE_PEER_GROUP.match(s_line)
+        if m:
+            self.peer_groups[m.group(1)] = None
+            return
+        m = self.RE_NEIGHBOR_ROUTE_MAP.match(s_line)
+        if m:
+            neighbor, route_map, direction = m.groups()
+            self.neighbor_route_maps.setdefault((neighbor, direction), route_map)
+
+    def apply(self, text):
+        """
+        Update the model with commands which were successfully written to FRR
+        :param text: configuration commands
+        """
+        if self.stale:
+            return
+        blocks = []
+        for line in text.split("\n"):
+            s_line = line.strip()
+            if s_line == "" or s_line.startswith("!") or s_line in ("exit", "end"):
+                continue
+            if line[0].isspace() and blocks:
+                blocks[-1][1].append(s_line)
+            else:
+                blocks.append((s_line, []))
+        for command, sub_commands in blocks:
+            if not self.__apply_command(command, sub_commands):
+                log_debug("RunningConfig: can't follow the command '%s'. The model is stale" % command)
+                self.stale = True
+                return
+
+    def __apply_command(self, command, sub_commands=None):
+        """
+        Apply a top-level command to the model
+        :param command: the command
+        :param sub_commands: commands of the command node
+        :return: True if the model was updated, False if the model can't follow the command
+        """
+        m = self.RE_ROUTE_MAP.match(command)
+        if m:
+            name, action, seq = m.groups()
+            entry = self.route_maps.get(name, {}).get(int(seq))
+            if entry is None:
+                entry = self.__add_route_map_entry(name, action, seq)
+            elif entry['action'] != action or sub_commands:
+                return False  # FRR merges the sub-commands into the entry
+            entry['lines'].extend(sub_commands or [])
+            return True
+        if sub_commands:
+            return False
+        m = self.RE_PREFIX_LIST.match(command)
+        if m:
+            no, family, name, seq, rule = m.groups()
+            if no and seq is None:
+                self.prefix_lists.pop((family, name), None)
+            elif seq is None:
+                return False
+            elif no:
+                self.__remove_entry(self.prefix_lists, (family, name), int(seq))
+            else:
+                self.prefix_lists.setdefault((family, name), OrderedDict())[int(seq)] = rule
+            return True
+        m = self.RE_COMMUNITY_LIST.match(command)
+        if m:
+            name, action, value = m.groups()
+            entries = self.community_lists.setdefault(name, [])
+            if (action, value) not in entries:
+                entries.append((action, value))
+            return True
+        m = self.RE_NO_COMMUNITY_LIST.match(command)
+        if m:
+            self.community_lists.pop(m.group(1), None)
+            return True
+        m = self.RE_NO_ROUTE_MAP.match(command)
+        if m:
+            name, _, seq = m.groups()
+            if seq is None:
+                self.route_maps.pop(name, None)
+            else:
+                self.__remove_entry(self.route_maps, name, int(seq))
+            return True
+        return False
+
+    @staticmethod
+    def __remove_entry(index, name, seq):
+        """ Remove an entry of a prefix-list or a route-map, and the object when it has no entry left """
+        entries = index.get(name)
+        if entries is None:
+            return
+        entries.pop(seq, None)
+        if not entries:
+            del index[name]
+
+    def __add_route_map_entry(self, name, action, seq):
+        entry = {'action': action, 'lines': []}
+        self.route_maps.setdefault(name, OrderedDict())[int(seq)] = entry
+        return entry
+
+    def get_prefix_list(self, family, name):
+        """
+        Get entries of a prefix-list
+        :param family: 'ip' or 'ipv6'
+        :param name: name of the prefix-list
+        :return: OrderedDict: sequence number -> rule. Empty if the prefix-list doesn't exist
+        """
+        return self.prefix_lists.get((family, name), OrderedDict())
+
+    def get_community_list(self, name):
+        """
+        Get entries of a standard community-list
+        :param name: name of the community-list
+        :return: list of (action, community value). Empty if the community-list doesn't exist
+        """
+        return self.community_lists.get(name, [])
+
+    def get_route_map(self, name):
+        """
+        Get entries of a route-map
+        :param name: name of the route-map
+        :return: OrderedDict: sequence number -> { 'action': 'permit' or 'deny', 'lines': sub-commands }
+        """
+        return self.route_maps.get(name, OrderedDict())
+
+    def get_peer_groups(self):
+        """ Return names of the peer-groups in the configuration order """
+        return list(self.peer_groups.keys())
+
+    def get_neighbor_route_map(self, neighbor, direction):
+        """
+        Get the route-map applied to a neighbor or a peer-group
+        :param neighbor: neighbor address or peer-group name
+        :param direction: 'in' or 'out'
+        :return: name of the route-map, None if no route-map is applied
+        """
+        return self.neighbor_route_maps.get((neighbor, direction))
+
+    def checksum(self):
+        """ Return a checksum of the indexed objects, independent of their order in the configuration """
+        content = [
+            sorted((key, sorted(entries.items())) for key, entries in self.prefix_lists.items()),
+            sorted((name, sorted(entries)) for name, entries in self.community_lists.items()),
+            sorted((name, sorted((seq, entry['action'], entry['lines']) for seq, entry in entries.items()))
+                   for name, entries in self.route_maps.items()),
+            sorted(self.peer_groups.keys()),
+            sorted(self.neighbor_route_maps.items()),
+        ]
+        return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
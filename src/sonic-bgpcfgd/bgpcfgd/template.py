@@ -1,8 +1,8 @@
-from collections import OrderedDict
 from functools import partial
 
+import ip_filters
 import jinja2
-import netaddr
+import jinja2.meta
 
 from .log import log_err
 
@@ -15,6 +15,7 @@ class TemplateFabric(object):
         j2_env.filters['ipv4'] = self.is_ipv4
         j2_env.filters['ipv6'] = self.is_ipv6
         j2_env.filters['pfx_filter'] = self.pfx_filter
+        j2_env.filters['split_prefixes'] = self.split_prefixes
         for attr in ['ip', 'network', 'prefixlen', 'netmask']:
             j2_env.filters[attr] = partial(self.prefix_attr, attr)
         self.env = j2_env
@@ -35,33 +36,24 @@ class TemplateFabric(object):
         """
         return self.env.from_string(tmpl)
 
+    def get_variables(self, template):
+        """
+        Get the names of the variables a template reads from its rendering context
+        :param template: Jinja2 template object, read from a file
+        :return: set of the variable names
+        """
+        source, _, _ = self.env.loader.get_source(self.env, template.name)
+        return jinja2.meta.find_undeclared_variables(self.env.parse(source))
+
     @staticmethod
     def is_ipv4(value):
         """ Return True if the value is an ipv4 address """
-        if not value:
-            return False
-        if isinstance(value, netaddr.IPNetwork):
-            addr = value
-        else:
-            try:
-                addr = netaddr.IPNetwork(str(value))
-            except (netaddr.NotRegisteredError, netaddr.AddrFormatError, netaddr.AddrConversionError):
-                return False
-        return addr.version == 4
+        return ip_filters.is_ipv4(value)
 
     @staticmethod
     def is_ipv6(value):
         """ Return True if the value is an ipv6 address """
-        if not value:
-            return False
-        if isinstance(value, netaddr.IPNetwork):
-            addr = value
-        else:
-            try:
-                addr = netaddr.IPNetwork(str(value))
-            except (netaddr.NotRegisteredError, netaddr.AddrFormatError, netaddr.AddrConversionError):
-                return False
-        return addr.version == 6
+        return ip_filters.is_ipv6(value)
 
     @staticmethod
     def prefix_attr(attr, value):
@@ -73,12 +65,11 @@ class TemplateFabric(object):
         """
         if not value:
             return None
-        else:
-            try:
-                prefix = netaddr.IPNetwork(str(value).strip())
-            except (netaddr.NotRegisteredError, netaddr.AddrFormatError, netaddr.AddrConversionError):
-                return None
-        return str(getattr(prefix, attr))
+        return ip_filters.prefix_attr(attr, str(value).strip())
+
+    @staticmethod
+    def log_invalid_ip(ip_address):
+        log_err("'%s' is invalid ip address" % ip_address)
 
     @staticmethod
     def pfx_filter(value):
@@ -87,22 +78,9 @@ class TemplateFabric(object):
            take into account the tuple.
            For eg - VLAN_INTERFACE|Vlan1000 vs VLAN_INTERFACE|Vlan1000|192.168.0.1/21
         """
-        table = OrderedDict()
+        return ip_filters.pfx_filter(value, TemplateFabric.log_invalid_ip)
 
-        if not value:
-            return table
-
-        for key, val in value.items():
-            if not isinstance(key, tuple):
-                continue
-            intf, ip_address = key
-            if '/' not in ip_address:
-                if TemplateFabric.is_ipv4(ip_address):
-                    table[(intf, "%s/32" % ip_address)] = val
-                elif TemplateFabric.is_ipv6(ip_address):
-                    table[(intf, "%s/128" % ip_address)] = val
-                else:
-                    log_err("'%s' is invalid ip address" % ip_address)
-            else:
-                table[key] = val
-        return table
+    @staticmethod
+    def split_prefixes(value):
+        """ Split the (interface, prefix) keys of an INTERFACE table into ipv4 and ipv6 entries in one pass """
+        return ip_filters.split_prefixes(value, TemplateFabric.log_invalid_ip)
@@ -186,6 +186,25 @@ def test_set_del_bgp_asn_change():
 
     assert test_set_del_bgp_asn_change.push_list_called
 
+def test_bgp_asn_value_change():
+    mgr = constructor()
+    mgr.cfg_mgr.push_list = MagicMock(return_value=True)
+    assert mgr.set_handler("10.1.0.0/24", {"": ""})
+    mgr.cfg_mgr.push_list.reset_mock()
+
+    # Other attributes of the device don't change the bgp asn
+    mgr.directory.put("CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME, "localhost", {"bgp_asn": "65100", "hostname": "switch"})
+    assert not mgr.cfg_mgr.push_list.called
+
+    mgr.directory.put("CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME, "localhost", {"bgp_asn": "65200"})
+    assert [call[0][0] for call in mgr.cfg_mgr.push_list.call_args_list] == [
+        ["router bgp 65200",
+         " no bgp network import-check"],
+        ["router bgp 65200",
+         " address-family ipv4 unicast",
+         "  network 10.1.0.0/24"]
+    ]
+
 def test_set_del_with_community():
     mgr = constructor()
     set_del_test(
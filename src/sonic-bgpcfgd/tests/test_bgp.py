@@ -122,6 +122,54 @@ def test_add_peer_invalid_local_addr(mocked_log_debug):
         assert not res, "Expect False return value"
         mocked_log_debug.assert_called_with("Peer '30.30.30.1' with local address '40.40.40.40' wait for the corresponding interface to be set")
 
+def test_get_set_deps():
+    for constant in load_constant_files():
+        m = constructor(constant)
+        assert m.get_set_deps("30.30.30.1", {"local_addr": "40.40.40.40"}) == [("LOCAL", "local_addresses", "40.40.40.40")]
+        m.directory.put("LOCAL", "local_addresses", "40.40.40.40", {"interface": "Ethernet12"})
+        assert m.get_set_deps("30.30.30.1", {"local_addr": "40.40.40.40"}) == [("LOCAL", "interfaces", "Ethernet12")]
+        m.directory.put("LOCAL", "interfaces", "Ethernet12", {})
+        assert m.get_set_deps("30.30.30.1", {"local_addr": "40.40.40.40"}) is None
+        # interface names with an address wait for any change of the interfaces
+        m.directory.put("LOCAL", "local_addresses", "50.50.50.50", {"interface": "Ethernet16|50.50.50.50/24"})
+        assert m.get_set_deps("30.30.30.1", {"local_addr": "50.50.50.50"}) == [("LOCAL", "interfaces", None)]
+        m.directory.put("LOCAL", "interfaces", "Ethernet16|50.50.50.50/24", {})
+        assert m.get_set_deps("30.30.30.1", {"local_addr": "50.50.50.50"}) is None
+        # the loopback address waits for any change of the loopback interfaces
+        m.directory.remove("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME, "Loopback0|11.11.11.11/32")
+        assert m.get_set_deps("30.30.30.1", {"local_addr": "40.40.40.40"}) == [("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME, None)]
+
+@patch('bgpcfgd.manager.swsscommon', MagicMock(SET_COMMAND="SET", DEL_COMMAND="DEL"))
+def test_add_peer_batch():
+    for constant in load_constant_files():
+        m = constructor(constant)
+        m.directory.put("CONFIG_DB", swsscommon.CFG_LOOPBACK_INTERFACE_TABLE_NAME, "Loopback0", {})
+        m.directory.put("CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME, "localhost", {"bgp_asn": "65100", "deployment_id": "1"})
+        data = {'asn': '65200', 'holdtime': '180', 'keepalive': '60', 'local_addr': '30.30.30.30', 'name': 'TOR', 'nhopself': '0', 'rrclient': '0'}
+        m.batch_handler([("30.30.30.1", "SET", data), ("30.30.30.2", "SET", data)])
+        assert ("default", "30.30.30.1") in m.peers and ("default", "30.30.30.2") in m.peers
+        cmds = [call[0][0] for call in m.cfg_mgr.push.call_args_list]
+        assert len([cmd for cmd in cmds if "peer-group.conf.j2" in cmd]) == 1
+        peers_cmds = [cmd for cmd in cmds if "instance.conf.j2" in cmd]
+        assert len(peers_cmds) == 1
+        assert "neighbor 30.30.30.1 " in peers_cmds[0] and "neighbor 30.30.30.2 " in peers_cmds[0]
+        assert m.bulk_add is None and m.peer_group_mgr.scheduled is None
+
+def test_render_cache():
+    for constant in load_constant_files():
+        m = constructor(constant)
+        pg_mgr = m.peer_group_mgr
+        kwargs = {'constants': {'bgp': {'allow_list': {'enabled': True}}}, 'neighbor_addr': '10.0.0.1'}
+        template = pg_mgr.policy_template
+        template.render = MagicMock(return_value="policy")
+        assert pg_mgr.render(template, **kwargs) == "policy"
+        kwargs['neighbor_addr'] = '10.0.0.2'
+        assert pg_mgr.render(template, **kwargs) == "policy"
+        assert template.render.call_count == 1
+        kwargs['constants'] = {'bgp': {'allow_list': {'enabled': False}}}
+        assert pg_mgr.render(template, **kwargs) == "policy"
+        assert template.render.call_count == 2
+
 @patch('bgpcfgd.managers_bgp.log_info')
 def test_del_handler(mocked_log_info):
     for constant in load_constant_files():
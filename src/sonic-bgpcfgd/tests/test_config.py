@@ -115,6 +115,53 @@ def test_restart_get_text():
     c.update()
     assert c.get_text() == [' text1', ' text2', ' text3', ' text4', '    ', '     ']
 
+def test_get_running_config():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value = "route-map A10 permit 10\n set tag 100\n")
+    frr.write = MagicMock(return_value = True)
+    c = ConfigMgr(frr)
+    assert c.running_config is None
+    rc = c.get_running_config()
+    assert frr.get_config.call_count == 1
+    assert rc.get_route_map("A10")[10]['lines'] == ['set tag 100']
+    # committed changes are applied to the model without reading FRR
+    c.push_list(["route-map A20 permit 10", " set tag 200", "ip prefix-list PL seq 10 permit 10.0.0.0/8"])
+    assert c.commit()
+    rc = c.get_running_config()
+    assert frr.get_config.call_count == 1
+    assert rc.get_route_map("A20")[10]['lines'] == ['set tag 200']
+    assert rc.get_prefix_list("ip", "PL")[10] == "permit 10.0.0.0/8"
+    # a change the model can't follow makes it read again
+    c.push("router bgp 65100\n neighbor PEER_V4 peer-group")
+    assert c.commit()
+    c.get_running_config()
+    assert frr.get_config.call_count == 2
+
+def test_get_running_config_write_error():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value = "route-map A10 permit 10\n")
+    frr.write = MagicMock(return_value = False)
+    c = ConfigMgr(frr)
+    c.get_running_config()
+    c.push("ip prefix-list PL seq 10 permit 10.0.0.0/8")
+    assert not c.commit()
+    assert c.running_config.stale
+    c.get_running_config()
+    assert frr.get_config.call_count == 2
+
+def test_check_running_config():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value = "route-map A10 permit 10\n")
+    c = ConfigMgr(frr)
+    rc = c.get_running_config()
+    c.running_config_check_time -= ConfigMgr.RUNNING_CONFIG_CHECK_INTERVAL
+    assert c.get_running_config() is rc
+    assert frr.get_config.call_count == 2
+    frr.get_config = MagicMock(return_value = "route-map A20 permit 10\n")
+    c.running_config_check_time -= ConfigMgr.RUNNING_CONFIG_CHECK_INTERVAL
+    rc = c.get_running_config()
+    assert list(rc.route_maps.keys()) == ["A20"]
+
 def to_canonical_common(raw_text, expected_canonical):
     frr = MagicMock()
     c = ConfigMgr(frr)
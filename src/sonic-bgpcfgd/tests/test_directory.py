@@ -55,3 +55,54 @@ def test_directory(mocked_log_err):
     # Test remove_slot() with nonexist table
     directory.remove_slot("db_name", "table_nonexist")
     mocked_log_err.assert_called_with("Directory: Can't remove slot 'db_name__table_nonexist'. The slot doesn't exist")
+
+def test_directory_notify():
+    directory = Directory()
+    handler_key = MagicMock()
+    handler_slot_path = MagicMock()
+    handler_slot = MagicMock()
+    directory.subscribe([("db_name", "table", "key1/key1_1")], handler_key)
+    directory.subscribe([("db_name", "table", "")], handler_slot_path)
+    directory.subscribe_slot("db_name", "table", handler_slot)
+
+    # the path isn't presented
+    directory.put("db_name", "table", "key1", {"key1_2": "value"})
+    assert not handler_key.called
+    assert handler_slot_path.call_count == 1
+    assert handler_slot.call_count == 1
+
+    # the path appears
+    directory.put("db_name", "table", "key1", {"key1_1": "value"})
+    assert handler_key.call_count == 1
+
+    # the value of the path changes
+    directory.put("db_name", "table", "key1", {"key1_1": "value2"})
+    assert handler_key.call_count == 2
+
+    # the value of the path is the same
+    directory.put("db_name", "table", "key1", {"key1_1": "value2", "key1_2": "value"})
+    directory.put("db_name", "table", "key2", {"key1_1": "value"})
+    assert handler_key.call_count == 2
+    assert handler_slot_path.call_count == 1
+    assert handler_slot.call_count == 5
+
+    # the path appears again after it was removed
+    directory.remove("db_name", "table", "key1")
+    directory.put("db_name", "table", "key1", {"key1_1": "value"})
+    assert handler_key.call_count == 3
+
+    # other slots don't notify
+    directory.put("db_name", "table2", "key1", {"key1_1": "value"})
+    assert handler_key.call_count == 3
+    assert handler_slot.call_count == 6
+
+def test_directory_version():
+    directory = Directory()
+    assert directory.get_version("db_name", "table") == 0
+    directory.put("db_name", "table", "key1", {"key1_1": "value"})
+    assert directory.get_version("db_name", "table") == 1
+    directory.remove("db_name", "table", "key2")
+    assert directory.get_version("db_name", "table") == 1
+    directory.remove("db_name", "table", "key1")
+    assert directory.get_version("db_name", "table") == 2
+    assert directory.get_version("db_name", "table2") == 0
@@ -1,4 +1,9 @@
 from unittest.mock import patch
+import os
+import shutil
+import socket
+import tempfile
+import threading
 import bgpcfgd.frr
 import pytest
 
@@ -66,3 +71,173 @@ def test_restart_peer_groups_fail(mocked_log_crit):
     res = f.restart_peer_groups(["pg_1", "pg_2"])
     assert not res, "Expect False return value"
     mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='some output', err='some error'")
+
+class FakeVty(object):
+    """ VTY socket of a FRR daemon. Commands containing 'fail' return 1 """
+    def __init__(self, vty_dir, daemon):
+        self.commands = []
+        self.drop = False
+        self.drop_on = None  # command the connection is closed at
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(os.path.join(vty_dir, "%s.vty" % daemon))
+        self.sock.listen(1)
+        thread = threading.Thread(target=self.serve)
+        thread.daemon = True
+        thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            buf = b""
+            while conn is not None:
+                data = conn.recv(4096)
+                if not data:
+                    break
+                buf += data
+                while b"\0" in buf:
+                    command, buf = buf.split(b"\0", 1)
+                    self.commands.append(command.decode())
+                    if self.drop or command.decode() == self.drop_on:
+                        # Close the connection without a reply
+                        self.drop = False
+                        conn.close()
+                        conn = None
+                        break
+                    rc = 1 if "fail" in command.decode() else 0
+                    conn.sendall(b"output of " + command + b"\0\0\0" + bytes([rc]))
+            if conn is not None:
+                conn.close()
+
+@pytest.fixture
+def vty_dir():
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+def no_vtysh(cmd, **kwargs):
+    assert False, "Unexpected vtysh command %s" % str(cmd)
+
+def test_write_vty(vty_dir):
+    bgpcfgd.frr.run_command = no_vtysh
+    bgpd, zebra = FakeVty(vty_dir, "bgpd"), FakeVty(vty_dir, "zebra")
+    f = bgpcfgd.frr.FRR(["bgpd", "zebra", "staticd"], vty_dir)
+    res = f.write("route-map RM_SET_SRC permit 10\n set src 10.1.0.32\n!\nip protocol bgp route-map RM_SET_SRC\n"
+                  "router bgp 65100\n neighbor 10.0.0.1 remote-as 65200\n address-family ipv4\n  neighbor 10.0.0.1 activate\n exit-address-family\n")
+    assert res, "Expect True return value"
+    assert bgpd.commands == ["enable",
+                             "configure terminal", "route-map RM_SET_SRC permit 10", "set src 10.1.0.32", "end",
+                             "configure terminal", "router bgp 65100", "neighbor 10.0.0.1 remote-as 65200", "address-family ipv4",
+                             "neighbor 10.0.0.1 activate", "exit-address-family", "end"]
+    assert zebra.commands == ["enable",
+                              "configure terminal", "route-map RM_SET_SRC permit 10", "set src 10.1.0.32", "end",
+                              "configure terminal", "ip protocol bgp route-map RM_SET_SRC", "end"]
+    assert f.commit_stats["commits"] == 1
+    assert f.commit_stats["vtysh_commits"] == 0
+    assert f.commit_stats["last_ms"] > 0.0
+
+@patch('bgpcfgd.frr.log_err')
+def test_write_vty_fail(mocked_log_err, vty_dir):
+    bgpcfgd.frr.run_command = no_vtysh
+    bgpd = FakeVty(vty_dir, "bgpd")
+    f = bgpcfgd.frr.FRR(["bgpd"], vty_dir)
+    res = f.write("router bgp 65100\n neighbor fail\n neighbor 10.0.0.1 remote-as 65200")
+    assert not res, "Expect False return value"
+    assert bgpd.commands[-2:] == ["neighbor 10.0.0.1 remote-as 65200", "end"]
+    mocked_log_err.assert_called_with("ConfigMgr::commit(): can't push configuration line 'neighbor fail' to bgpd, rc='1', output='output of neighbor fail'")
+    assert f.commit_stats["failed"] == 1
+
+def test_write_vtysh_fallback(vty_dir):
+    commands = []
+    bgpcfgd.frr.run_command = lambda cmd: commands.append(cmd) or (0, "", "")
+    bgpd = FakeVty(vty_dir, "bgpd")
+    f = bgpcfgd.frr.FRR(["bgpd", "staticd"], vty_dir)
+    # staticd has no VTY socket, and vrf blocks are not dispatched
+    for config in ["router bgp 65100\nip route 10.0.0.0/24 10.0.0.1 tag 1", "vrf Vrf1\n ip route 10.0.0.0/24 10.0.0.1"]:
+        assert f.write(config)
+    assert [cmd[:2] for cmd in commands] == [["vtysh", "-f"], ["vtysh", "-f"]]
+    assert bgpd.commands == []
+    assert f.commit_stats["vtysh_commits"] == 2
+
+def test_write_vty_drop(vty_dir):
+    configs = []
+    def vtysh(cmd):
+        with open(cmd[-1]) as fp:
+            configs.append(fp.read())
+        return 0, "", ""
+    bgpcfgd.frr.run_command = vtysh
+    bgpd = FakeVty(vty_dir, "bgpd")
+    bgpd.drop_on = "router bgp 65100"
+    f = bgpcfgd.frr.FRR(["bgpd"], vty_dir)
+    config = "no bgp community-list standard CL_1\nno route-map RM_1\nrouter bgp 65100\n no neighbor 10.0.0.1\nip prefix-list PL_1 seq 5 permit 10.0.0.0/8"
+    assert f.write(config)
+    # The blocks written through the VTY are not replayed
+    assert bgpd.commands == ["enable",
+                             "configure terminal", "no bgp community-list standard CL_1", "end",
+                             "configure terminal", "no route-map RM_1", "end",
+                             "configure terminal", "router bgp 65100"]
+    assert configs == ["router bgp 65100\n no neighbor 10.0.0.1\nip prefix-list PL_1 seq 5 permit 10.0.0.0/8\n"]
+    # Nothing was written through the VTY
+    bgpd.drop = True
+    assert f.write(config)
+    assert configs[-1] == config + "\n"
+    assert f.commit_stats["commits"] == 2
+    assert f.commit_stats["vtysh_commits"] == 2
+    assert f.commit_stats["failed"] == 0
+
+def test_write_vty_drop_daemon(vty_dir):
+    configs = []
+    def vtysh(cmd):
+        with open(cmd[-1]) as fp:
+            configs.append((cmd[:-1], fp.read()))
+        return 0, "", ""
+    bgpcfgd.frr.run_command = vtysh
+    bgpd, zebra = FakeVty(vty_dir, "bgpd"), FakeVty(vty_dir, "zebra")
+    f = bgpcfgd.frr.FRR(["bgpd", "zebra"], vty_dir)
+    config = "route-map RM_1 permit 10\n no match ip address prefix-list PL_0\n match ip address prefix-list PL_1\n" \
+             "ip protocol bgp route-map RM_1\nrouter bgp 65100\n neighbor 10.0.0.1 remote-as 65200"
+
+    # The second daemon of a block fails: only the lines it didn't get are written to it
+    zebra.drop_on = "match ip address prefix-list PL_1"
+    assert f.write(config)
+    assert bgpd.commands == ["enable",
+                             "configure terminal", "route-map RM_1 permit 10", "no match ip address prefix-list PL_0",
+                             "match ip address prefix-list PL_1", "end"]
+    assert zebra.commands == ["enable",
+                              "configure terminal", "route-map RM_1 permit 10", "no match ip address prefix-list PL_0",
+                              "match ip address prefix-list PL_1"]
+    assert configs == [
+        (["vtysh", "-d", "zebra", "-f"], "route-map RM_1 permit 10\n match ip address prefix-list PL_1\n"),
+        (["vtysh", "-f"], "ip protocol bgp route-map RM_1\nrouter bgp 65100\n neighbor 10.0.0.1 remote-as 65200\n"),
+    ]
+
+    # The first daemon of a block fails: the second one gets the whole block
+    del configs[:]
+    bgpd.drop_on = "no match ip address prefix-list PL_0"
+    zebra.drop_on = None
+    assert f.write(config)
+    assert configs == [
+        (["vtysh", "-d", "bgpd", "-f"], "route-map RM_1 permit 10\n no match ip address prefix-list PL_0\n match ip address prefix-list PL_1\n"),
+        (["vtysh", "-d", "zebra", "-f"], "route-map RM_1 permit 10\n no match ip address prefix-list PL_0\n match ip address prefix-list PL_1\n"),
+        (["vtysh", "-f"], "ip protocol bgp route-map RM_1\nrouter bgp 65100\n neighbor 10.0.0.1 remote-as 65200\n"),
+    ]
+    assert f.commit_stats["vtysh_commits"] == 2
+
+def test_vty_reconnect(vty_dir):
+    bgpcfgd.frr.run_command = lambda cmd: (0, "vtysh config", "")
+    bgpd = FakeVty(vty_dir, "bgpd")
+    f = bgpcfgd.frr.FRR(["bgpd"], vty_dir)
+    assert f.get_config() == "output of show running-config"
+    bgpd.drop = True
+    assert f.get_config() == "vtysh config"
+    assert f.get_config() == "output of show running-config"
+    assert bgpd.commands == ["enable", "show running-config", "show running-config", "enable", "show running-config"]
+
+def test_restart_peer_groups_vty(vty_dir):
+    bgpcfgd.frr.run_command = no_vtysh
+    bgpd = FakeVty(vty_dir, "bgpd")
+    f = bgpcfgd.frr.FRR(["bgpd"], vty_dir)
+    assert f.restart_peer_groups(["pg_2", "pg_1"])
+    assert bgpd.commands == ["enable", "clear bgp peer-group pg_1 soft in", "clear bgp peer-group pg_2 soft in"]
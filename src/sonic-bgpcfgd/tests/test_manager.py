@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock, patch
+
+from bgpcfgd.directory import Directory
+from bgpcfgd.manager import Manager
+
+
+swsscommon_manager = MagicMock(SET_COMMAND="SET", DEL_COMMAND="DEL")
+
+
+class WaitingManager(Manager):
+    """ Manager which sets a key as soon as the LOCAL|addresses entry named in its data exists """
+    def __init__(self, common_objs, deps):
+        super(WaitingManager, self).__init__(common_objs, deps, "CONFIG_DB", "TABLE")
+        self.set_calls = []
+        self.known_deps = True
+
+    def set_handler(self, key, data):
+        self.set_calls.append(key)
+        return self.directory.path_exist("LOCAL", "addresses", data["addr"])
+
+    def get_set_deps(self, key, data):
+        return [("LOCAL", "addresses", data["addr"])] if self.known_deps else None
+
+
+def constructor(deps):
+    common_objs = {
+        'directory': Directory(),
+        'cfg_mgr':   MagicMock(),
+        'constants': {},
+    }
+    return WaitingManager(common_objs, deps)
+
+@patch('bgpcfgd.manager.swsscommon', swsscommon_manager)
+def test_wait_for_deps():
+    m = constructor([("LOCAL", "metadata", "localhost")])
+    m.directory.put("LOCAL", "addresses", "10.0.0.1", {})
+    m.handler("key1", "SET", {"addr": "10.0.0.1"})
+    m.handler("key2", "SET", {"addr": "10.0.0.2"})
+    assert m.set_calls == []
+    assert m.get_queue_stats() == {'deferred': 2, 'waiting_deps': 2}
+    m.directory.put("LOCAL", "metadata", "localhost", {})
+    assert m.set_calls == ["key1", "key2"]
+    assert list(m.set_queue.keys()) == ["key2"]
+
+@patch('bgpcfgd.manager.swsscommon', swsscommon_manager)
+def test_wait_for_key_deps():
+    m = constructor([])
+    for index in range(1, 4):
+        m.handler("key%d" % index, "SET", {"addr": "10.0.0.%d" % index})
+    assert m.get_queue_stats() == {'deferred': 3, 'waiting_deps': 3}
+    m.set_calls = []
+    # only the key which waits for the address is retried
+    m.directory.put("LOCAL", "addresses", "10.0.0.2", {})
+    assert m.set_calls == ["key2"]
+    m.directory.put("LOCAL", "addresses", "10.0.0.4", {})
+    assert m.set_calls == ["key2"]
+    assert list(m.set_queue.keys()) == ["key1", "key3"]
+
+@patch('bgpcfgd.manager.swsscommon', swsscommon_manager)
+def test_wait_for_unknown_deps():
+    m = constructor([("LOCAL", "addresses", "")])
+    m.known_deps = False
+    m.directory.put("LOCAL", "addresses", "10.0.0.0", {})
+    m.handler("key1", "SET", {"addr": "10.0.0.1"})
+    assert m.get_queue_stats() == {'deferred': 1, 'waiting_deps': 0}
+    # retried on every change of the dependency tables
+    m.directory.put("LOCAL", "addresses", "10.0.0.2", {})
+    assert m.set_calls == ["key1", "key1"]
+    m.directory.put("LOCAL", "addresses", "10.0.0.1", {})
+    assert m.set_calls == ["key1", "key1", "key1"]
+    assert not m.set_queue
+
+@patch('bgpcfgd.manager.swsscommon', swsscommon_manager)
+def test_wait_for_slot():
+    m = constructor([("LOCAL", "metadata", ""), ("LOCAL", "addresses", "")])
+    m.get_set_deps = lambda key, data: [("LOCAL", "addresses", None)]
+    m.directory.put("LOCAL", "metadata", "localhost", {})
+    m.directory.put("LOCAL", "addresses", "10.0.0.0", {})
+    m.handler("key1", "SET", {"addr": "10.0.0.1"})
+    assert m.get_queue_stats() == {'deferred': 1, 'waiting_deps': 1}
+    # only retried on the changes of the table it waits for
+    m.directory.put("LOCAL", "metadata", "localhost", {"anything": "anything"})
+    assert m.set_calls == ["key1"]
+    m.directory.put("LOCAL", "addresses", "10.0.0.2", {})
+    assert m.set_calls == ["key1", "key1"]
+    m.directory.put("LOCAL", "addresses", "10.0.0.1", {})
+    assert m.set_calls == ["key1", "key1", "key1"]
+    assert not m.set_queue
+    assert not m.waiting_slots[("LOCAL", "addresses")]
+
+@patch('bgpcfgd.manager.swsscommon', swsscommon_manager)
+def test_wait_for_other_slot():
+    m = constructor([])
+    m.get_set_deps = lambda key, data: [("LOCAL", "addresses", None)]
+    m.handler("key1", "SET", {"addr": "10.0.0.1"})
+    # the table is subscribed to when a key waits for it
+    m.directory.put("LOCAL", "addresses", "10.0.0.1", {})
+    assert m.set_calls == ["key1", "key1"]
+    assert not m.set_queue
+
+@patch('bgpcfgd.manager.swsscommon', swsscommon_manager)
+def test_replace_deferred():
+    m = constructor([])
+    m.del_handler = MagicMock()
+    m.handler("key1", "SET", {"addr": "10.0.0.1"})
+    m.handler("key1", "SET", {"addr": "10.0.0.2"})
+    assert m.set_queue == {"key1": {"addr": "10.0.0.2"}}
+    m.directory.put("LOCAL", "addresses", "10.0.0.1", {})
+    assert m.set_calls == ["key1", "key1"]
+    m.handler("key1", "DEL", {})
+    assert not m.set_queue
+    m.del_handler.assert_called_with("key1")
+    m.directory.put("LOCAL", "addresses", "10.0.0.2", {})
+    assert m.set_calls == ["key1", "key1"]
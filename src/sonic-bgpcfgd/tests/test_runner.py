@@ -0,0 +1,169 @@
+from unittest.mock import MagicMock, patch
+
+from bgpcfgd.runner import Runner, percentile
+
+
+swsscommon_runner = MagicMock(SET_COMMAND="SET", DEL_COMMAND="DEL")
+
+
+class FakeSubscriber(object):
+    def __init__(self, db_id, table_name):
+        self.db_id = db_id
+        self.table_name = table_name
+        self.events = []
+
+    def pop(self):
+        if not self.events:
+            return "", "", ()
+        return self.events.pop(0)
+
+    def getDbConnector(self):
+        return MagicMock(getDbId=MagicMock(return_value=self.db_id))
+
+    def getTableName(self):
+        return self.table_name
+
+
+@patch('bgpcfgd.runner.swsscommon', swsscommon_runner)
+def constructor(**kwargs):
+    cfg_mgr = MagicMock()
+    cfg_mgr.commit.return_value = True
+    runner = Runner(cfg_mgr, **kwargs)
+    received = []
+    subscriber = FakeSubscriber(4, "BGP_NEIGHBOR")
+    runner.subscribers.add(subscriber)
+    runner.callbacks[4]["BGP_NEIGHBOR"].append(received.extend)
+    return runner, subscriber, received
+
+@patch('bgpcfgd.runner.swsscommon', swsscommon_runner)
+def collect(runner, subscriber, events):
+    subscriber.events.extend(events)
+    runner.collect_events()
+
+def test_set_set():
+    runner, subscriber, received = constructor()
+    collect(runner, subscriber, [
+        ("10.0.0.1", "SET", (("asn", "65001"),)),
+        ("10.0.0.1", "SET", (("asn", "65002"),)),
+        ("10.0.0.2", "SET", (("asn", "65003"),)),
+    ])
+    assert runner.is_batch_ready()
+    runner.process_batch()
+    assert received == [
+        ("10.0.0.1", "SET", {"asn": "65002"}),
+        ("10.0.0.2", "SET", {"asn": "65003"}),
+    ]
+    assert runner.cfg_manager.commit.call_count == 1
+    assert runner.stats == {'commits': 1, 'events': 3, 'coalesced_events': 1}
+
+def test_set_del():
+    runner, subscriber, received = constructor()
+    collect(runner, subscriber, [
+        ("10.0.0.1", "SET", (("asn", "65001"),)),
+        ("10.0.0.1", "DEL", ()),
+    ])
+    runner.process_batch()
+    assert received == [("10.0.0.1", "DEL", {})]
+
+def test_del_set():
+    runner, subscriber, received = constructor()
+    collect(runner, subscriber, [
+        ("10.0.0.1", "SET", (("asn", "65001"),)),
+        ("10.0.0.1", "DEL", ()),
+        ("10.0.0.1", "SET", (("asn", "65002"),)),
+        ("10.0.0.1", "SET", (("asn", "65003"),)),
+    ])
+    runner.process_batch()
+    assert received == [
+        ("10.0.0.1", "DEL", {}),
+        ("10.0.0.1", "SET", {"asn": "65003"}),
+    ]
+    assert runner.stats['coalesced_events'] == 2
+
+def test_keys_order():
+    runner, subscriber, received = constructor()
+    collect(runner, subscriber, [
+        ("10.0.0.1", "SET", (("asn", "65001"),)),
+        ("10.0.0.2", "SET", (("asn", "65002"),)),
+        ("10.0.0.1", "DEL", ()),
+        ("10.0.0.3", "DEL", ()),
+        ("10.0.0.2", "SET", (("asn", "65003"),)),
+    ])
+    runner.process_batch()
+    assert received == [
+        ("10.0.0.1", "DEL", {}),
+        ("10.0.0.3", "DEL", {}),
+        ("10.0.0.2", "SET", {"asn": "65003"}),
+    ]
+
+def test_batch_empty():
+    runner, _, _ = constructor()
+    assert not runner.is_batch_ready()
+    assert runner.get_select_timeout() == Runner.SELECT_TIMEOUT
+
+def test_batch_window():
+    runner, subscriber, received = constructor(coalesce_window_ms=60000, max_latency_ms=120000, max_batch_size=3)
+    collect(runner, subscriber, [("10.0.0.1", "SET", ()), ("10.0.0.1", "SET", ())])
+    assert not runner.is_batch_ready()
+    assert 0 < runner.get_select_timeout() <= 60000
+    collect(runner, subscriber, [("10.0.0.2", "SET", ())])
+    assert runner.is_batch_ready()
+    runner.process_batch()
+    assert len(received) == 2
+    assert not runner.pending
+    assert runner.pending_events == 0
+
+def test_batch_max_latency():
+    runner, subscriber, _ = constructor(coalesce_window_ms=60000, max_latency_ms=0)
+    collect(runner, subscriber, [("10.0.0.1", "SET", ())])
+    assert runner.is_batch_ready()
+    assert runner.get_select_timeout() == 0
+
+def test_commit_failed():
+    runner, subscriber, _ = constructor()
+    runner.cfg_manager.commit.return_value = False
+    collect(runner, subscriber, [("10.0.0.1", "SET", ())])
+    runner.process_batch()
+    assert runner.stats['commits'] == 1
+
+def test_percentile():
+    assert percentile([], 50) == 0
+    assert percentile([5], 99) == 5
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 90) == 90
+    assert percentile(samples, 99) == 99
+    assert percentile(samples, 100) == 100
+
+def test_get_stats():
+    runner, subscriber, _ = constructor()
+    for count in range(1, 11):
+        collect(runner, subscriber, [("10.0.0.%d" % index, "SET", ()) for index in range(count)])
+        runner.process_batch()
+    stats = runner.get_stats()
+    assert stats['commits'] == 10
+    assert stats['events'] == 55
+    assert stats['events_per_commit_p50'] == 5
+    assert stats['events_per_commit_p90'] == 9
+    assert stats['events_per_commit_p99'] == 10
+    assert stats['commit_latency_ms_p99'] >= 0
+
+def test_batch_runs():
+    runner, subscriber, received = constructor()
+    other = FakeSubscriber(4, "BGP_PEER_RANGE")
+    runner.subscribers.add(other)
+    batches = []
+    runner.callbacks[4]["BGP_NEIGHBOR"] = [batches.append]
+    runner.callbacks[4]["BGP_PEER_RANGE"] = [batches.append]
+    runner.pending[(subscriber, "10.0.0.1")] = [("SET", {})]
+    runner.pending[(subscriber, "10.0.0.2")] = [("SET", {})]
+    runner.pending[(other, "range")] = [("SET", {})]
+    runner.pending[(subscriber, "10.0.0.3")] = [("DEL", {})]
+    runner.pending_events = 4
+    runner.first_event_time = runner.last_event_time = 0
+    runner.process_batch()
+    assert batches == [
+        [("10.0.0.1", "SET", {}), ("10.0.0.2", "SET", {})],
+        [("range", "SET", {})],
+        [("10.0.0.3", "DEL", {})],
+    ]
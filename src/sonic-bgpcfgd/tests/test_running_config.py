@@ -0,0 +1,103 @@
+from bgpcfgd.running_config import RunningConfig
+
+
+config = """!
+frr version 8.2.2
+!
+ip prefix-list PL_1 seq 10 permit 10.0.0.0/8 le 32
+ip prefix-list PL_1 seq 20 deny 0.0.0.0/0
+ipv6 prefix-list PL_1 seq 10 permit fc00::/64 le 128
+!
+bgp community-list standard CL_1 seq 5 permit 1010:2020
+!
+router bgp 65100
+ neighbor PEER_V4 peer-group
+ neighbor PEER_V6 peer-group
+ neighbor 10.0.0.1 peer-group PEER_V4
+ !
+ address-family ipv4 unicast
+  neighbor PEER_V4 route-map FROM_PEER in
+  neighbor PEER_V4 route-map TO_PEER out
+ exit-address-family
+ !
+ address-family ipv6 unicast
+  neighbor PEER_V6 route-map FROM_PEER_V6 in
+ exit-address-family
+exit
+!
+route-map FROM_PEER permit 100
+exit
+!
+route-map FROM_PEER permit 2
+ call ALLOW_LIST
+ on-match next
+exit
+!
+route-map TO_PEER deny 1
+exit
+!
+"""
+
+def test_load():
+    c = RunningConfig(config)
+    assert list(c.get_prefix_list("ip", "PL_1").items()) == [(10, "permit 10.0.0.0/8 le 32"), (20, "deny 0.0.0.0/0")]
+    assert list(c.get_prefix_list("ipv6", "PL_1").items()) == [(10, "permit fc00::/64 le 128")]
+    assert not c.get_prefix_list("ip", "PL_2")
+    assert c.get_community_list("CL_1") == [("permit", "1010:2020")]
+    assert list(c.get_route_map("FROM_PEER").keys()) == [100, 2]
+    assert c.get_route_map("FROM_PEER")[2] == {'action': 'permit', 'lines': ['call ALLOW_LIST', 'on-match next']}
+    assert c.get_route_map("TO_PEER")[1] == {'action': 'deny', 'lines': []}
+    assert c.get_peer_groups() == ["PEER_V4", "PEER_V6"]
+    assert c.get_neighbor_route_map("PEER_V4", "in") == "FROM_PEER"
+    assert c.get_neighbor_route_map("PEER_V4", "out") == "TO_PEER"
+    assert c.get_neighbor_route_map("PEER_V6", "in") == "FROM_PEER_V6"
+    assert c.get_neighbor_route_map("10.0.0.1", "in") is None
+    assert not c.stale
+
+def test_load_empty():
+    c = RunningConfig()
+    assert c.get_peer_groups() == []
+    assert not c.get_route_map("FROM_PEER")
+    assert c.checksum() == RunningConfig("!\n").checksum()
+
+def test_apply_prefix_list():
+    c = RunningConfig(config)
+    c.apply("no ip prefix-list PL_1\nip prefix-list PL_1 seq 10 deny 0.0.0.0/0 le 17\nipv6 prefix-list PL_2 seq 10 permit ::/0\n")
+    assert list(c.get_prefix_list("ip", "PL_1").items()) == [(10, "deny 0.0.0.0/0 le 17")]
+    assert list(c.get_prefix_list("ipv6", "PL_2").items()) == [(10, "permit ::/0")]
+    c.apply("no ipv6 prefix-list PL_2 seq 10 permit ::/0")
+    assert ("ipv6", "PL_2") not in c.prefix_lists
+    assert not c.stale
+
+def test_apply_community_list():
+    c = RunningConfig(config)
+    c.apply("no bgp community-list standard CL_1\nbgp community-list standard CL_1 permit 3030:4040")
+    assert c.get_community_list("CL_1") == [("permit", "3030:4040")]
+    assert not c.stale
+
+def test_apply_route_map():
+    c = RunningConfig(config)
+    c.apply("route-map RM_1 permit 10\n match community CL_1\n set tag 100\nexit\nno route-map FROM_PEER permit 100")
+    assert c.get_route_map("RM_1")[10] == {'action': 'permit', 'lines': ['match community CL_1', 'set tag 100']}
+    assert list(c.get_route_map("FROM_PEER").keys()) == [2]
+    c.apply("no route-map FROM_PEER")
+    assert not c.get_route_map("FROM_PEER")
+    assert not c.stale
+
+def test_apply_stale():
+    c = RunningConfig(config)
+    c.apply("route-map FROM_PEER permit 2\n set community 1:1 additive")
+    assert c.stale
+    c = RunningConfig(config)
+    c.apply("router bgp 65100\n neighbor PEER_V4 route-map FROM_PEER_2 in")
+    assert c.stale
+    c = RunningConfig(config)
+    c.apply("ip prefix-list PL_1 permit 20.0.0.0/8")
+    assert c.stale
+
+def test_checksum():
+    c = RunningConfig(config)
+    c.apply("bgp community-list standard CL_2 permit 1:1\nroute-map RM_1 permit 10\n match community CL_2")
+    expected = RunningConfig(config + "bgp community-list standard CL_2 seq 5 permit 1:1\nroute-map RM_1 permit 10\n match community CL_2\nexit\n")
+    assert c.checksum() == expected.checksum()
+    assert c.checksum() != RunningConfig(config).checksum()
@@ -0,0 +1,156 @@
+""" IP address and prefix filters for jinja2 templates, shared by sonic-cfggen
+and bgpcfgd.
+
+Templates apply these filters inside loops over every interface and neighbor,
+so the same strings are parsed over and over during a render. Parsed prefixes
+are kept in a bounded LRU, the netaddr objects in it are shared and must not
+be modified by the callers.
+"""
+
+from collections import OrderedDict
+
+import netaddr
+
+PARSE_ERRORS = (netaddr.AddrFormatError, netaddr.AddrConversionError, netaddr.NotRegisteredError,
+                ValueError, TypeError)
+
+class PrefixCache(object):
+    """ Bounded LRU of netaddr.IPNetwork objects keyed by their string form.
+    Strings which are not a valid address or prefix are cached as well.
+    """
+
+    DEFAULT_SIZE = 8192
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self._lru = OrderedDict()
+        self._size = size
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, value):
+        """ Return the netaddr.IPNetwork of the value, or None if the value is
+        not a valid address or prefix
+        """
+        key = str(value)
+        try:
+            prefix = self._lru.pop(key)
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            try:
+                prefix = netaddr.IPNetwork(key)
+            except PARSE_ERRORS:
+                prefix = None
+            while self._lru and len(self._lru) >= self._size:
+                self._lru.popitem(last=False)
+        if self._size > 0:
+            self._lru[key] = prefix
+        return prefix
+
+    def clear(self):
+        self._lru.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._lru)}
+
+_cache = PrefixCache()
+
+def parse_prefix(value):
+    """ Return the cached netaddr.IPNetwork of the value, or None if the value
+    is empty or not a valid address or prefix
+    """
+    if not value:
+        return None
+    if isinstance(value, netaddr.IPNetwork):
+        return value
+    return _cache.parse(value)
+
+def is_ipv4(value):
+    """ Return True if the value is an ipv4 address or prefix """
+    prefix = parse_prefix(value)
+    return prefix is not None and prefix.version == 4
+
+def is_ipv6(value):
+    """ Return True if the value is an ipv6 address or prefix """
+    prefix = parse_prefix(value)
+    return prefix is not None and prefix.version == 6
+
+def prefix_attr(attr, value):
+    """ Return the string of attribute attr ('ip', 'network', 'prefixlen',
+    'netmask', 'broadcast', ...) of the prefix, or None if the value is not a
+    valid prefix
+    """
+    prefix = parse_prefix(value)
+    if prefix is None:
+        return None
+    return str(getattr(prefix, attr))
+
+def ip_network(value):
+    """ Extract network for network prefix """
+    prefix = parse_prefix(value)
+    if prefix is None:
+        return "Invalid ip address %s" % value
+    return prefix.network
+
+def _host_prefix(ip_address):
+    """ Return ip_address with a /32 or /128 prefix length appended, or None
+    if it is not a valid address
+    """
+    prefix = parse_prefix(ip_address)
+    if prefix is None:
+        return None
+    return "%s/%d" % (ip_address, 32 if prefix.version == 4 else 128)
+
+def pfx_filter(value, on_invalid=None):
+    """INTERFACE Table can have keys in one of the two formats:
+       string or tuple - This filter skips the string keys and only
+       take into account the tuple.
+       For eg - VLAN_INTERFACE|Vlan1000 vs VLAN_INTERFACE|Vlan1000|192.168.0.1/21
+
+       An address without prefix length gets /32 or /128 appended. An invalid
+       one raises ValueError, or is passed to on_invalid and skipped if it is
+       given.
+    """
+    table = OrderedDict()
+
+    if not value:
+        return table
+
+    for key, val in value.items():
+        if not isinstance(key, tuple):
+            continue
+        intf, ip_address = key
+        if '/' not in ip_address:
+            new_ip_address = _host_prefix(ip_address)
+            if new_ip_address is None:
+                if on_invalid is None:
+                    raise ValueError("'%s' is invalid ip address" % ip_address)
+                on_invalid(ip_address)
+                continue
+            table[(intf, new_ip_address)] = val
+        else:
+            table[key] = val
+    return table
+
+def split_prefixes(value, on_invalid=None):
+    """ Classify the (interface, prefix) keys of an INTERFACE-like table in one
+    pass. Return a pair of OrderedDicts with the ipv4 and the ipv6 entries,
+    keyed as by pfx_filter(). Keys with a prefix which does not parse are left
+    out of both.
+
+    For eg - {% set v4, v6 = PORTCHANNEL_INTERFACE|split_prefixes %}
+    """
+    ipv4 = OrderedDict()
+    ipv6 = OrderedDict()
+    for key, val in pfx_filter(value, on_invalid).items():
+        prefix = parse_prefix(key[1])
+        if prefix is None:
+            continue
+        if prefix.version == 4:
+            ipv4[key] = val
+        else:
+            ipv6[key] = val
+    return ipv4, ipv6
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,163 @@
+import glob
+import hashlib
+import os
+
+import jinja2
+
+from collections import OrderedDict
+from redis_bcc import RedisBytecodeCache
+
+class LayeredBytecodeCache(jinja2.BytecodeCache):
+    """ A bytecode cache for jinja2 template that looks up bytecode in an
+    in-process LRU, then in files under cache_dir, then in Redis.
+
+    The file tier works before the database is up and survives reboots and
+    database flushes, Redis is an optional tier shared between containers.
+    Hits of each tier and misses are counted, see stats().
+
+    Writing the bytecode of a template to disk removes its other versions,
+    and the oldest files beyond max_files. SONIC_CFGGEN_JINJA2_CACHE_DIR
+    overrides the default directory, an empty cache_dir disables the file
+    tier.
+    """
+
+    DEFAULT_CACHE_DIR = os.environ.get('SONIC_CFGGEN_JINJA2_CACHE_DIR', '/var/cache/sonic-cfggen/jinja2')
+    DEFAULT_LRU_SIZE = 256
+    DEFAULT_MAX_FILES = 1024
+    TIERS = ['memory', 'disk', 'redis']
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, redis_client=None, lru_size=DEFAULT_LRU_SIZE,
+                 max_files=DEFAULT_MAX_FILES):
+        self._cache_dir = cache_dir
+        self._max_files = max_files
+        self._redis_bcc = RedisBytecodeCache(redis_client) if redis_client is not None else None
+        self._lru = OrderedDict()
+        self._lru_size = lru_size
+        self.hits = dict((tier, 0) for tier in self.TIERS)
+        self.misses = 0
+
+    def get_cache_key(self, name, filename=None):
+        """ Key the bytecode by template path (the slot), then by mtime and
+        jinja2 version (the version of the slot)
+        """
+        slot = [name, filename]
+        version = [jinja2.__version__]
+        if filename is not None:
+            try:
+                version.append(os.path.getmtime(filename))
+            except OSError:
+                pass
+        return '%s-%s' % (hashlib.sha1(repr(slot).encode('utf-8')).hexdigest()[:16],
+                          hashlib.sha1(repr(version).encode('utf-8')).hexdigest())
+
+    def stats(self):
+        return {'hits': dict(self.hits), 'misses': self.misses}
+
+    def reset_stats(self):
+        self.hits = dict((tier, 0) for tier in self.TIERS)
+        self.misses = 0
+
+    def add_stats(self, stats):
+        """ Add the counts of a stats() result, e.g. of a forked process """
+        for tier, hits in stats['hits'].items():
+            self.hits[tier] += hits
+        self.misses += stats['misses']
+
+    def load_bytecode(self, bucket):
+        for tier in self.TIERS:
+            code = self._load(tier, bucket.key)
+            if code is None:
+                continue
+            bucket.bytecode_from_string(code)
+            # The bucket is reset if the bytecode does not match the source
+            if bucket.code is None:
+                continue
+            self.hits[tier] += 1
+            # Copy the bytecode into the faster tiers
+            for faster_tier in self.TIERS[:self.TIERS.index(tier)]:
+                self._dump(faster_tier, bucket.key, code)
+            return
+        self.misses += 1
+
+    def dump_bytecode(self, bucket):
+        code = bucket.bytecode_to_string()
+        for tier in self.TIERS:
+            self._dump(tier, bucket.key, code)
+
+    def _cache_file(self, key):
+        return os.path.join(self._cache_dir, key + '.bcc')
+
+    def _prune(self, cache_file):
+        """ Remove the other versions of the slot of cache_file, then the
+        oldest files beyond max_files
+        """
+        slot_prefix = cache_file.rsplit('-', 1)[0] + '-'
+        files = []
+        for name in glob.glob(os.path.join(self._cache_dir, '*.bcc')):
+            try:
+                if name.startswith(slot_prefix):
+                    if name != cache_file:
+                        os.remove(name)
+                else:
+                    files.append((os.path.getmtime(name), name))
+            except (IOError, OSError):
+                pass
+        files.sort()
+        for _, name in files[:max(len(files) + 1 - self._max_files, 0)]:
+            try:
+                os.remove(name)
+            except (IOError, OSError):
+                pass
+
+    def _load(self, tier, key):
+        if tier == 'memory':
+            code = self._lru.get(key)
+            if code is not None:
+                self._lru[key] = self._lru.pop(key)
+            return code
+        if tier == 'disk':
+            if not self._cache_dir:
+                return None
+            try:
+                with open(self._cache_file(key), 'rb') as f:
+                    return f.read()
+            except (IOError, OSError):
+                return None
+        if self._redis_bcc is None:
+            return None
+        try:
+            return self._redis_bcc.get_bytecode(key)
+        except Exception:
+            return None
+
+    def _dump(self, tier, key, code):
+        if tier == 'memory':
+            self._lru.pop(key, None)
+            self._lru[key] = code
+            while len(self._lru) > self._lru_size:
+                self._lru.popitem(last=False)
+        elif tier == 'disk':
+            if not self._cache_dir:
+                return
+            # Written to a temporary file first, so concurrent readers never
+            # see partial content
+            cache_file = self._cache_file(key)
+            tmp_file = '%s.%d' % (cache_file, os.getpid())
+            try:
+                if not os.path.isdir(self._cache_dir):
+                    os.makedirs(self._cache_dir)
+                with open(tmp_file, 'wb') as f:
+                    f.write(code)
+                os.rename(tmp_file, cache_file)
+            except (IOError, OSError):
+                try:
+                    os.remove(tmp_file)
+                except (IOError, OSError):
+                    pass
+                return
+            self._prune(cache_file)
+        elif self._redis_bcc is not None:
+            try:
+                self._redis_bcc.set_bytecode(key, code)
+            except Exception:
+                pass
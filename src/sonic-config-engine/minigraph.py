@@ -1,11 +1,15 @@
 from __future__ import print_function
 
+import copy
+import glob
+import hashlib
 import ipaddress
 import math
 import os
+import pickle
 import sys
 import json
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 
 from lxml import etree as ET
 from lxml.etree import QName
@@ -50,12 +54,262 @@ dualtor_cable_types = ["active-active", "active-standby"]
 # Default Virtual Network Index (VNI) 
 vni_default = 8000
 
+# Parsed minigraph snapshots, keyed by minigraph content and parse arguments.
+# SONIC_CFGGEN_MINIGRAPH_CACHE_DIR overrides the directory, an empty value
+# disables the snapshots.
+PARSE_CACHE_DIR = os.environ.get('SONIC_CFGGEN_MINIGRAPH_CACHE_DIR', '/var/cache/sonic-cfggen/minigraph')
+PARSE_CACHE_VERSION = 1
+# Number of snapshots kept in PARSE_CACHE_DIR and in memory
+PARSE_CACHE_FILES = 64
+PARSE_CACHE_MEMORY_SIZE = 16
+
+# Size of the blocks a minigraph is streamed in
+MINIGRAPH_READ_SIZE = 1 << 16
+
 ###############################################################################
 #
 # Minigraph parsing functions
 #
 ###############################################################################
 
+_qnames = {}
+
+def qname(namespace, tag):
+    """ Return the '{namespace}tag' element name, built once per name """
+    try:
+        return _qnames[(namespace, tag)]
+    except KeyError:
+        return _qnames.setdefault((namespace, tag), str(QName(namespace, tag)))
+
+class Tag(object):
+    """ Qualified names of the elements read by the section parsers, built
+    once. Names in the a:, b: and i: namespaces of minigraph are prefixed
+    with A_, B_ and I_.
+    """
+    AclInterface = qname(ns, "AclInterface")
+    AclInterfaces = qname(ns, "AclInterfaces")
+    Address = qname(ns, "Address")
+    AddressV6 = qname(ns, "AddressV6")
+    Advertise = qname(ns, "Advertise")
+    AsicName = qname(ns, "AsicName")
+    AssociatedTo = qname(ns, "AssociatedTo")
+    AttachTo = qname(ns, "AttachTo")
+    Bandwidth = qname(ns, "Bandwidth")
+    BGPPeer = qname(ns, "BGPPeer")
+    BGPSession = qname(ns, "BGPSession")
+    ChassisInternal = qname(ns, "ChassisInternal")
+    ClusterName = qname(ns, "ClusterName")
+    CoreId = qname(ns, "CoreId")
+    CorePortId = qname(ns, "CorePortId")
+    DeploymentId = qname(ns, "DeploymentId")
+    Description = qname(ns, "Description")
+    Device = qname(ns, "Device")
+    DeviceInfo = qname(ns, "DeviceInfo")
+    DeviceInterfaceLinks = qname(ns, "DeviceInterfaceLinks")
+    DeviceLinkBase = qname(ns, "DeviceLinkBase")
+    Devices = qname(ns, "Devices")
+    DhcpRelays = qname(ns, "DhcpRelays")
+    Dhcpv6Relays = qname(ns, "Dhcpv6Relays")
+    ElementType = qname(ns, "ElementType")
+    EndDevice = qname(ns, "EndDevice")
+    EndPeer = qname(ns, "EndPeer")
+    EndPort = qname(ns, "EndPort")
+    EndRouter = qname(ns, "EndRouter")
+    EthernetInterfaces = qname(ns, "EthernetInterfaces")
+    Fallback = qname(ns, "Fallback")
+    FlowControl = qname(ns, "FlowControl")
+    HoldTime = qname(ns, "HoldTime")
+    Hostname = qname(ns, "Hostname")
+    HwSku = qname(ns, "HwSku")
+    InAcl = qname(ns, "InAcl")
+    InterfaceName = qname(ns, "InterfaceName")
+    IPInterface = qname(ns, "IPInterface")
+    IPInterfaces = qname(ns, "IPInterfaces")
+    IPNextHop = qname(ns, "IPNextHop")
+    IPNextHops = qname(ns, "IPNextHops")
+    KeepAliveTime = qname(ns, "KeepAliveTime")
+    Link = qname(ns, "Link")
+    LoopbackIPInterfaces = qname(ns, "LoopbackIPInterfaces")
+    MacAddress = qname(ns, "MacAddress")
+    ManagementAddress = qname(ns, "ManagementAddress")
+    ManagementAddressV6 = qname(ns, "ManagementAddressV6")
+    ManagementInterfaces = qname(ns, "ManagementInterfaces")
+    ManagementIPInterfaces = qname(ns, "ManagementIPInterfaces")
+    MgmtVrfConfigs = qname(ns, "MgmtVrfConfigs")
+    mgmtVrfEnabled = qname(ns, "mgmtVrfEnabled")
+    Name = qname(ns, "Name")
+    NextHopSelf = qname(ns, "NextHopSelf")
+    NumVoq = qname(ns, "NumVoq")
+    OutAcl = qname(ns, "OutAcl")
+    PeeringSessions = qname(ns, "PeeringSessions")
+    PortChannel = qname(ns, "PortChannel")
+    PortChannelInterfaces = qname(ns, "PortChannelInterfaces")
+    Prefix = qname(ns, "Prefix")
+    Routers = qname(ns, "Routers")
+    RRClient = qname(ns, "RRClient")
+    Speed = qname(ns, "Speed")
+    StartDevice = qname(ns, "StartDevice")
+    StartPeer = qname(ns, "StartPeer")
+    StartPort = qname(ns, "StartPort")
+    StartRouter = qname(ns, "StartRouter")
+    SubInterface = qname(ns, "SubInterface")
+    SubInterfaces = qname(ns, "SubInterfaces")
+    SubType = qname(ns, "SubType")
+    SwitchId = qname(ns, "SwitchId")
+    SystemPort = qname(ns, "SystemPort")
+    SystemPortId = qname(ns, "SystemPortId")
+    SystemPorts = qname(ns, "SystemPorts")
+    TunnelInterface = qname(ns, "TunnelInterface")
+    TunnelInterfaces = qname(ns, "TunnelInterfaces")
+    Type = qname(ns, "Type")
+    Vlan = qname(ns, "Vlan")
+    VlanID = qname(ns, "VlanID")
+    VlanInterface = qname(ns, "VlanInterface")
+    VlanInterfaces = qname(ns, "VlanInterfaces")
+    VNI = qname(ns, "VNI")
+    VoqInbandInterfaces = qname(ns, "VoqInbandInterfaces")
+
+    A_ASN = qname(ns1, "ASN")
+    A_BGPRouterDeclaration = qname(ns1, "BGPRouterDeclaration")
+    A_DeviceMetadata = qname(ns1, "DeviceMetadata")
+    A_DeviceProperty = qname(ns1, "DeviceProperty")
+    A_EthernetInterface = qname(ns1, "EthernetInterface")
+    A_Hostname = qname(ns1, "Hostname")
+    A_Key = qname(ns1, "Key")
+    A_LinkMetadata = qname(ns1, "LinkMetadata")
+    A_LoopbackIPInterface = qname(ns1, "LoopbackIPInterface")
+    A_ManagementInterface = qname(ns1, "ManagementInterface")
+    A_ManagementIPInterface = qname(ns1, "ManagementIPInterface")
+    A_MgmtVrfGlobal = qname(ns1, "MgmtVrfGlobal")
+    A_Name = qname(ns1, "Name")
+    A_PeerAsn = qname(ns1, "PeerAsn")
+    A_Peers = qname(ns1, "Peers")
+    A_PeersRange = qname(ns1, "PeersRange")
+    A_PrefixStr = qname(ns1, "PrefixStr")
+    A_Properties = qname(ns1, "Properties")
+    A_Value = qname(ns1, "Value")
+    A_VoqInbandInterface = qname(ns1, "VoqInbandInterface")
+
+    B_IPPrefix = qname(ns2, "IPPrefix")
+
+    I_type = qname(ns3, "type")
+
+def element_fields(element):
+    """ Return the children of element keyed by their qualified name, in one
+    pass. The first child of a name wins, as with element.find().
+    """
+    return {child.tag: child for child in reversed(element)}
+
+def element_text(fields, tag):
+    """ Return the text of the child tag in fields, or None if there is none """
+    child = fields.get(tag)
+    return child.text if child is not None else None
+
+def load_minigraph(filename):
+    """ Parse a whole minigraph file, to share it between several parse_xml()
+    calls through their root argument.
+    """
+    return ET.parse(filename).getroot()
+
+def iter_minigraph_sections(filename, tags, root=None):
+    """ Stream the top-level elements of a minigraph file whose tag is one of
+    the given section names, in document order.
+
+    Every other top-level element is freed as soon as it is fully parsed.
+    A yielded section is left to the consumer, which frees it with
+    free_minigraph_section() once it is done with it.
+    If root is given, the sections are taken from this already parsed
+    minigraph instead and left untouched.
+    """
+    tags = set(qname(ns, tag) for tag in tags)
+    if root is not None:
+        for child in root:
+            if child.tag in tags:
+                yield child
+        return
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    depth = 0
+    with open(filename, 'rb') as f:
+        while True:
+            data = f.read(MINIGRAPH_READ_SIZE)
+            if data:
+                parser.feed(data)
+            else:
+                parser.close()
+            (depth, elements) = read_top_level_elements(parser, depth)
+            for elem in elements:
+                if elem.tag in tags:
+                    yield elem
+                else:
+                    free_minigraph_section(elem)
+            if not data:
+                break
+
+def read_top_level_elements(parser, depth):
+    """ Read the pending events of a pull parser and return the new depth and
+    the top-level elements which ended.
+
+    lxml only frees a subtree which no element proxy points into, and the
+    event iterator holds the consumed events until it is exhausted, so the
+    elements must not be freed before all the events are read.
+    """
+    elements = []
+    for event, elem in parser.read_events():
+        if event == 'start':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 1:
+                elements.append(elem)
+    return depth, elements
+
+def free_minigraph_section(elem):
+    """ Free a top-level element read by iter_minigraph_sections() """
+    # Detaching an element moves its whole subtree to a new document, so it
+    # is emptied first
+    elem.clear()
+    elem.getparent().remove(elem)
+
+# Top-level elements holding the minigraph header
+MINIGRAPH_HEADER_TAGS = ["Hostname", "HwSku", "DockerRoutingConfigMode", "MetadataDeclaration"]
+
+def read_minigraph_header(filename, root=None):
+    """ Return the header of a minigraph - hostname, hwsku, docker routing
+    config mode and the local device names - as a dict.
+
+    Every section parser needs the header, but it is usually at the end of
+    the minigraph, so it is read in a pass of its own, which frees every
+    top-level element as soon as it is parsed.
+    """
+    header = dict(hostname=None, hwsku=None, docker_routing_config_mode="separated", local_devices=[])
+    seen = set()
+    for child in iter_minigraph_sections(filename, MINIGRAPH_HEADER_TAGS, root):
+        if child.tag == qname(ns, "HwSku"):
+            header['hwsku'] = child.text
+        elif child.tag == qname(ns, "Hostname"):
+            header['hostname'] = child.text
+        elif child.tag == qname(ns, "DockerRoutingConfigMode"):
+            header['docker_routing_config_mode'] = child.text
+        elif child.tag == qname(ns, "MetadataDeclaration"):
+            header['local_devices'].extend(parse_meta_devices(child))
+        seen.add(child.tag)
+        if root is None:
+            free_minigraph_section(child)
+        if len(seen) == len(MINIGRAPH_HEADER_TAGS):
+            break
+    return header
+
+def iter_minigraph(filename, sections, root=None):
+    """ Stream the given sections of a minigraph, in document order.
+
+    Unless root is given, every section is freed once the consumer asks for
+    the next one, so only one section is resident at a time.
+    """
+    for child in iter_minigraph_sections(filename, sections, root):
+        yield child
+        if root is None:
+            free_minigraph_section(child)
+
 class minigraph_encoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, (
@@ -65,6 +319,20 @@ class minigraph_encoder(json.JSONEncoder):
             return str(obj)
         return json.JSONEncoder.default(self, obj)
 
+class DeviceIndex(object):
+    """ Case insensitive lookup of the devices parsed out of the PngDec section.
+    When names differ only in case the first device wins.
+    """
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.names = {}
+        for name in devices:
+            self.names.setdefault(name.lower(), name)
+
+    def __getitem__(self, name):
+        return self.devices[self.names[name.lower()]]
+
 def get_peer_switch_info(link_metadata, devices):
     peer_switch_table = {}
     peer_switch_ip = None
@@ -85,41 +353,26 @@ def get_peer_switch_info(link_metadata, devices):
 
 
 def parse_device(device):
-    lo_prefix = None
-    lo_prefix_v6 = None
-    mgmt_prefix = None
-    mgmt_prefix_v6 = None
-    d_type = None   # don't shadow type()
-    hwsku = None
-    name = None
-    deployment_id = None
-    cluster = None
-    d_subtype = None
-
-    for node in device:
-        if node.tag == str(QName(ns, "Address")):
-            lo_prefix = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "AddressV6")):
-            lo_prefix_v6 = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "ManagementAddress")):
-            mgmt_prefix = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "ManagementAddressV6")):
-            mgmt_prefix_v6 = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "Hostname")):
-            name = node.text
-        elif node.tag == str(QName(ns, "HwSku")):
-            hwsku = node.text
-        elif node.tag == str(QName(ns, "DeploymentId")):
-            deployment_id = node.text
-        elif node.tag == str(QName(ns, "ElementType")):
-            d_type = node.text
-        elif node.tag == str(QName(ns, "ClusterName")):
-            cluster = node.text
-        elif node.tag == str(QName(ns, "SubType")):
-            d_subtype = node.text
-
-    if d_type is None and str(QName(ns3, "type")) in device.attrib:
-        d_type = device.attrib[str(QName(ns3, "type"))]
+    # A later element of a name overrides an earlier one
+    fields = {node.tag: node for node in device}
+
+    def ip_prefix(tag):
+        node = fields.get(tag)
+        return node.find(Tag.B_IPPrefix).text if node is not None else None
+
+    lo_prefix = ip_prefix(Tag.Address)
+    lo_prefix_v6 = ip_prefix(Tag.AddressV6)
+    mgmt_prefix = ip_prefix(Tag.ManagementAddress)
+    mgmt_prefix_v6 = ip_prefix(Tag.ManagementAddressV6)
+    d_type = element_text(fields, Tag.ElementType)   # don't shadow type()
+    hwsku = element_text(fields, Tag.HwSku)
+    name = element_text(fields, Tag.Hostname)
+    deployment_id = element_text(fields, Tag.DeploymentId)
+    cluster = element_text(fields, Tag.ClusterName)
+    d_subtype = element_text(fields, Tag.SubType)
+
+    if d_type is None and Tag.I_type in device.attrib:
+        d_type = device.attrib[Tag.I_type]
 
     return (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, name, hwsku, d_type, deployment_id, cluster, d_subtype)
 
@@ -204,16 +457,41 @@ def parse_png(png, hname, dpg_ecmp_content = None):
     NEIGH = {}
 
     for child in png:
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, "DeviceLinkBase"))):
-                linktype = link.find(str(QName(ns, "ElementType"))).text
+        if child.tag == Tag.DeviceInterfaceLinks:
+            for link in child.findall(Tag.DeviceLinkBase):
+                fields = element_fields(link)
+                linktype = fields[Tag.ElementType].text
+
+                if Tag.I_type in link.attrib:
+                    link_type = link.attrib[Tag.I_type]
+                    if link_type == 'DeviceSerialLink':
+                        for node in link:
+                            if node.tag == Tag.EndPort:
+                                console_port = node.text.split()[-1]
+                            elif node.tag == Tag.EndDevice:
+                                console_dev = node.text
+                    elif link_type == 'DeviceMgmtLink':
+                        for node in link:
+                            if node.tag == Tag.EndPort:
+                                mgmt_port = node.text.split()[-1]
+                            elif node.tag == Tag.EndDevice:
+                                mgmt_dev = node.text
+
+                if linktype == "LogicalLink":
+                    intf_name = fields[Tag.EndPort].text
+                    start_device = fields[Tag.StartDevice].text
+                    if intf_name in port_alias_map:
+                        intf_name = port_alias_map[intf_name]
+
+                    mux_cable_ports[intf_name] = start_device
+
                 if linktype == "DeviceSerialLink":
-                    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-                    endport = link.find(str(QName(ns, "EndPort"))).text
-                    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-                    startport = link.find(str(QName(ns, "StartPort"))).text
-                    baudrate = link.find(str(QName(ns, "Bandwidth"))).text
-                    flowcontrol = 1 if link.find(str(QName(ns, "FlowControl"))) is not None and link.find(str(QName(ns, "FlowControl"))).text == 'true' else 0
+                    enddevice = fields[Tag.EndDevice].text
+                    endport = fields[Tag.EndPort].text
+                    startdevice = fields[Tag.StartDevice].text
+                    startport = fields[Tag.StartPort].text
+                    baudrate = fields[Tag.Bandwidth].text
+                    flowcontrol = 1 if element_text(fields, Tag.FlowControl) == 'true' else 0
                     if enddevice.lower() == hname.lower() and endport.isdigit():
                         console_ports[endport] = {
                             'remote_device': startdevice,
@@ -229,19 +507,18 @@ def parse_png(png, hname, dpg_ecmp_content = None):
                     continue
 
                 if linktype == "DeviceInterfaceLink":
-                    endport = link.find(str(QName(ns, "EndPort"))).text
-                    startdevice = link.find(str(QName(ns, "StartDevice"))).text
+                    endport = fields[Tag.EndPort].text
+                    startdevice = fields[Tag.StartDevice].text
                     port_device_map[endport] = startdevice
 
                 if linktype != "DeviceInterfaceLink" and linktype != "UnderlayInterfaceLink" and linktype != "DeviceMgmtLink":
                     continue
 
-                enddevice = link.find(str(QName(ns, "EndDevice"))).text
-                endport = link.find(str(QName(ns, "EndPort"))).text
-                startdevice = link.find(str(QName(ns, "StartDevice"))).text
-                startport = link.find(str(QName(ns, "StartPort"))).text
-                bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
-                bandwidth = bandwidth_node.text if bandwidth_node is not None else None
+                enddevice = fields[Tag.EndDevice].text
+                endport = fields[Tag.EndPort].text
+                startdevice = fields[Tag.StartDevice].text
+                startport = fields[Tag.StartPort].text
+                bandwidth = element_text(fields, Tag.Bandwidth)
                 if enddevice.lower() == hname.lower():
                     if endport in port_alias_map:
                         endport = port_alias_map[endport]
@@ -257,8 +534,8 @@ def parse_png(png, hname, dpg_ecmp_content = None):
                     if bandwidth:
                         port_speeds[startport] = bandwidth
 
-        if child.tag == str(QName(ns, "Devices")):
-            for device in child.findall(str(QName(ns, "Device"))):
+        if child.tag == Tag.Devices:
+            for device in child.findall(Tag.Device):
                 (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, name, hwsku, d_type, deployment_id, cluster, d_subtype) = parse_device(device)
                 device_data = {'lo_addr': lo_prefix, 'type': d_type, 'mgmt_addr': mgmt_prefix, 'hwsku': hwsku}
                 if cluster:
@@ -271,34 +548,6 @@ def parse_png(png, hname, dpg_ecmp_content = None):
                     device_data['subtype'] = d_subtype
                 devices[name] = device_data
 
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for if_link in child.findall(str(QName(ns, 'DeviceLinkBase'))):
-                if str(QName(ns3, "type")) in if_link.attrib:
-                    link_type = if_link.attrib[str(QName(ns3, "type"))]
-                    if link_type == 'DeviceSerialLink':
-                        for node in if_link:
-                            if node.tag == str(QName(ns, "EndPort")):
-                                console_port = node.text.split()[-1]
-                            elif node.tag == str(QName(ns, "EndDevice")):
-                                console_dev = node.text
-                    elif link_type == 'DeviceMgmtLink':
-                        for node in if_link:
-                            if node.tag == str(QName(ns, "EndPort")):
-                                mgmt_port = node.text.split()[-1]
-                            elif node.tag == str(QName(ns, "EndDevice")):
-                                mgmt_dev = node.text
-
-
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, 'DeviceLinkBase'))):
-                if link.find(str(QName(ns, "ElementType"))).text == "LogicalLink":
-                    intf_name = link.find(str(QName(ns, "EndPort"))).text
-                    start_device = link.find(str(QName(ns, "StartDevice"))).text
-                    if intf_name in port_alias_map:
-                        intf_name = port_alias_map[intf_name]
-
-                    mux_cable_ports[intf_name] = start_device
-
         if dpg_ecmp_content and (len(dpg_ecmp_content)):
             for version, content in dpg_ecmp_content.items():  # version is ipv4 or ipv6
                 fine_grained_content = formulate_fine_grained_ecmp(version, content, port_device_map, port_alias_map)  # port_alias_map
@@ -314,12 +563,12 @@ def parse_png(png, hname, dpg_ecmp_content = None):
 def parse_asic_external_link(link, asic_name, hostname):
     neighbors = {}
     port_speeds = {}
-    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-    endport = link.find(str(QName(ns, "EndPort"))).text
-    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-    startport = link.find(str(QName(ns, "StartPort"))).text
-    bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
-    bandwidth = bandwidth_node.text if bandwidth_node is not None else None
+    fields = element_fields(link)
+    enddevice = fields[Tag.EndDevice].text
+    endport = fields[Tag.EndPort].text
+    startdevice = fields[Tag.StartDevice].text
+    startport = fields[Tag.StartPort].text
+    bandwidth = element_text(fields, Tag.Bandwidth)
     # if chassis internal is false, the interface name will be
     # interface alias which should be converted to asic port name
     if (enddevice.lower() == hostname.lower()):
@@ -342,12 +591,12 @@ def parse_asic_external_link(link, asic_name, hostname):
 def parse_asic_internal_link(link, asic_name, hostname):
     neighbors = {}
     port_speeds = {}
-    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-    endport = link.find(str(QName(ns, "EndPort"))).text
-    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-    startport = link.find(str(QName(ns, "StartPort"))).text
-    bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
-    bandwidth = bandwidth_node.text if bandwidth_node is not None else None
+    fields = element_fields(link)
+    enddevice = fields[Tag.EndDevice].text
+    endport = fields[Tag.EndPort].text
+    startdevice = fields[Tag.StartDevice].text
+    startport = fields[Tag.StartPort].text
+    bandwidth = element_text(fields, Tag.Bandwidth)
     if ((enddevice.lower() == asic_name.lower()) and
             (startdevice.lower() != hostname.lower())):
         if endport in port_alias_map:
@@ -370,13 +619,13 @@ def parse_asic_png(png, asic_name, hostname):
     devices = {}
     port_speeds = {}
     for child in png:
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, "DeviceLinkBase"))):
+        if child.tag == Tag.DeviceInterfaceLinks:
+            for link in child.findall(Tag.DeviceLinkBase):
                 # Chassis internal node is used in multi-asic device or chassis minigraph
                 # where the minigraph will contain the internal asic connectivity and
                 # external neighbor information. The ChassisInternal node will be used to
                 # determine if the link is internal to the device or chassis.
-                chassis_internal_node = link.find(str(QName(ns, "ChassisInternal")))
+                chassis_internal_node = link.find(Tag.ChassisInternal)
                 chassis_internal = chassis_internal_node.text if chassis_internal_node is not None else "false"
 
                 # If the link is an external link include the external neighbor
@@ -390,8 +639,8 @@ def parse_asic_png(png, asic_name, hostname):
                     neighbors.update(int_neighbors)
                     port_speeds.update(int_port_speeds)
 
-        if child.tag == str(QName(ns, "Devices")):
-            for device in child.findall(str(QName(ns, "Device"))):
+        if child.tag == Tag.Devices:
+            for device in child.findall(Tag.Device):
                 (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, name, hwsku, d_type, deployment_id, cluster, _) = parse_device(device)
                 device_data = {'lo_addr': lo_prefix, 'type': d_type, 'mgmt_addr': mgmt_prefix, 'hwsku': hwsku }
                 if cluster:
@@ -406,11 +655,12 @@ def parse_asic_png(png, asic_name, hostname):
 
 
 def parse_loopback_intf(child):
-    lointfs = child.find(str(QName(ns, "LoopbackIPInterfaces")))
+    lointfs = child.find(Tag.LoopbackIPInterfaces)
     lo_intfs = {}
-    for lointf in lointfs.findall(str(QName(ns1, "LoopbackIPInterface"))):
-        intfname = lointf.find(str(QName(ns, "AttachTo"))).text
-        ipprefix = lointf.find(str(QName(ns1, "PrefixStr"))).text
+    for lointf in lointfs.findall(Tag.A_LoopbackIPInterface):
+        fields = element_fields(lointf)
+        intfname = fields[Tag.AttachTo].text
+        ipprefix = fields[Tag.A_PrefixStr].text
         lo_intfs[(intfname, ipprefix)] = {}
     return lo_intfs
 
@@ -428,91 +678,97 @@ def parse_dpg(dpg, hname):
             There is just one aclintf node in the minigraph
             Get the aclintfs node first.
         """
-        if aclintfs is None and child.find(str(QName(ns, "AclInterfaces"))) is not None:
-            aclintfs = child.find(str(QName(ns, "AclInterfaces")))
+        dpg_fields = element_fields(child)
+        if aclintfs is None and Tag.AclInterfaces in dpg_fields:
+            aclintfs = dpg_fields[Tag.AclInterfaces]
         """
             In Multi-NPU platforms the mgmt intfs are defined only for the host not for individual asic
             There is just one mgmtintf node in the minigraph
             Get the mgmtintfs node first. We need mgmt intf to get mgmt ip in per asic dockers.
         """
-        if mgmtintfs is None and child.find(str(QName(ns, "ManagementIPInterfaces"))) is not None:
-            mgmtintfs = child.find(str(QName(ns, "ManagementIPInterfaces")))
-        hostname = child.find(str(QName(ns, "Hostname")))
+        if mgmtintfs is None and Tag.ManagementIPInterfaces in dpg_fields:
+            mgmtintfs = dpg_fields[Tag.ManagementIPInterfaces]
+        hostname = dpg_fields.get(Tag.Hostname)
         if hostname.text.lower() != hname.lower():
             continue
 
         vni = vni_default
-        vni_element = child.find(str(QName(ns, "VNI")))
+        vni_element = dpg_fields.get(Tag.VNI)
         if vni_element != None:
             if vni_element.text.isdigit():
                 vni = int(vni_element.text)
             else:
                 print("VNI must be an integer (use default VNI %d instead)" % vni_default, file=sys.stderr) 
 
-        ipintfs = child.find(str(QName(ns, "IPInterfaces")))
+        ipintfs = dpg_fields.get(Tag.IPInterfaces)
         intfs = {}
         ip_intfs_map = {}
-        for ipintf in ipintfs.findall(str(QName(ns, "IPInterface"))):
-            intfalias = ipintf.find(str(QName(ns, "AttachTo"))).text
+        for ipintf in ipintfs.findall(Tag.IPInterface):
+            fields = element_fields(ipintf)
+            intfalias = fields[Tag.AttachTo].text
             intfname = port_alias_map.get(intfalias, intfalias)
-            ipprefix = ipintf.find(str(QName(ns, "Prefix"))).text
+            ipprefix = fields[Tag.Prefix].text
             intfs[(intfname, ipprefix)] = {}
             ip_intfs_map[ipprefix] = intfalias
         lo_intfs = parse_loopback_intf(child)
 
-        subintfs = child.find(str(QName(ns, "SubInterfaces")))
+        subintfs = dpg_fields.get(Tag.SubInterfaces)
         if subintfs is not None:
-            for subintf in subintfs.findall(str(QName(ns, "SubInterface"))):
-                intfalias = subintf.find(str(QName(ns, "AttachTo"))).text
+            for subintf in subintfs.findall(Tag.SubInterface):
+                fields = element_fields(subintf)
+                intfalias = fields[Tag.AttachTo].text
                 intfname = port_alias_map.get(intfalias, intfalias)
-                ipprefix = subintf.find(str(QName(ns, "Prefix"))).text
-                subintfvlan = subintf.find(str(QName(ns, "Vlan"))).text
+                ipprefix = fields[Tag.Prefix].text
+                subintfvlan = fields[Tag.Vlan].text
                 subintfname = intfname + VLAN_SUB_INTERFACE_SEPARATOR + subintfvlan
                 intfs[(subintfname, ipprefix)] = {}
 
-        mvrfConfigs = child.find(str(QName(ns, "MgmtVrfConfigs")))
+        mvrfConfigs = dpg_fields.get(Tag.MgmtVrfConfigs)
         mvrf = {}
         if mvrfConfigs != None:
-            mv = mvrfConfigs.find(str(QName(ns1, "MgmtVrfGlobal")))
+            mv = mvrfConfigs.find(Tag.A_MgmtVrfGlobal)
             if mv != None:
-                mvrf_en_flag = mv.find(str(QName(ns, "mgmtVrfEnabled"))).text
+                mvrf_en_flag = mv.find(Tag.mgmtVrfEnabled).text
                 mvrf["vrf_global"] = {"mgmtVrfEnabled": mvrf_en_flag}
 
         mgmt_intf = {}
-        for mgmtintf in mgmtintfs.findall(str(QName(ns1, "ManagementIPInterface"))):
-            intfname = mgmtintf.find(str(QName(ns, "AttachTo"))).text
-            ipprefix = mgmtintf.find(str(QName(ns1, "PrefixStr"))).text
+        for mgmtintf in mgmtintfs.findall(Tag.A_ManagementIPInterface):
+            fields = element_fields(mgmtintf)
+            intfname = fields[Tag.AttachTo].text
+            ipprefix = fields[Tag.A_PrefixStr].text
             mgmtipn = ipaddress.ip_network(UNICODE_TYPE(ipprefix), False)
             gwaddr = ipaddress.ip_address(next(mgmtipn.hosts()))
             mgmt_intf[(intfname, ipprefix)] = {'gwaddr': gwaddr}
 
-        voqinbandintfs = child.find(str(QName(ns, "VoqInbandInterfaces")))
+        voqinbandintfs = dpg_fields.get(Tag.VoqInbandInterfaces)
         voq_inband_intfs = {}
         if voqinbandintfs:
-            for voqintf in voqinbandintfs.findall(str(QName(ns1, "VoqInbandInterface"))):
-                intfname = voqintf.find(str(QName(ns, "Name"))).text
-                intftype = voqintf.find(str(QName(ns, "Type"))).text
-                ipprefix = voqintf.find(str(QName(ns1, "PrefixStr"))).text
+            for voqintf in voqinbandintfs.findall(Tag.A_VoqInbandInterface):
+                fields = element_fields(voqintf)
+                intfname = fields[Tag.Name].text
+                intftype = fields[Tag.Type].text
+                ipprefix = fields[Tag.A_PrefixStr].text
                 if intfname not in voq_inband_intfs:
                    voq_inband_intfs[intfname] = {'inband_type': intftype}
                 voq_inband_intfs["%s|%s" % (intfname, ipprefix)] = {}
 
-        pcintfs = child.find(str(QName(ns, "PortChannelInterfaces")))
+        pcintfs = dpg_fields.get(Tag.PortChannelInterfaces)
         pc_intfs = []
         pcs = {}
         pc_members = {}
         intfs_inpc = [] # List to hold all the LAG member interfaces 
-        for pcintf in pcintfs.findall(str(QName(ns, "PortChannel"))):
-            pcintfname = pcintf.find(str(QName(ns, "Name"))).text
-            pcintfmbr = pcintf.find(str(QName(ns, "AttachTo"))).text
+        for pcintf in pcintfs.findall(Tag.PortChannel):
+            fields = element_fields(pcintf)
+            pcintfname = fields[Tag.Name].text
+            pcintfmbr = fields[Tag.AttachTo].text
             pcmbr_list = pcintfmbr.split(';')
             pc_intfs.append(pcintfname)
             for i, member in enumerate(pcmbr_list):
                 pcmbr_list[i] = port_alias_map.get(member, member)
                 intfs_inpc.append(pcmbr_list[i])
                 pc_members[(pcintfname, pcmbr_list[i])] = {}
-            if pcintf.find(str(QName(ns, "Fallback"))) != None:
-                pcs[pcintfname] = {'members': pcmbr_list, 'fallback': pcintf.find(str(QName(ns, "Fallback"))).text, 'min_links': str(int(math.ceil(len() * 0.75)))}
+            if Tag.Fallback in fields:
+                pcs[pcintfname] = {'members': pcmbr_list, 'fallback': fields[Tag.Fallback].text, 'min_links': str(int(math.ceil(len() * 0.75)))}
             else:
                 pcs[pcintfname] = {'members': pcmbr_list, 'min_links': str(int(math.ceil(len(pcmbr_list) * 0.75)))}
         port_nhipv4_map = {}
@@ -521,22 +777,23 @@ def parse_dpg(dpg, hname):
         nhportlist = []
         dpg_ecmp_content = {}
         static_routes = {}
-        ipnhs = child.find(str(QName(ns, "IPNextHops")))
+        ipnhs = dpg_fields.get(Tag.IPNextHops)
         if ipnhs is not None:
-            for ipnh in ipnhs.findall(str(QName(ns, "IPNextHop"))):
-                if ipnh.find(str(QName(ns, "Type"))).text == 'FineGrainedECMPGroupMember':
-                    ipnhfmbr = ipnh.find(str(QName(ns, "AttachTo"))).text
-                    ipnhaddr = ipnh.find(str(QName(ns, "Address"))).text
+            for ipnh in ipnhs.findall(Tag.IPNextHop):
+                fields = element_fields(ipnh)
+                if fields[Tag.Type].text == 'FineGrainedECMPGroupMember':
+                    ipnhfmbr = fields[Tag.AttachTo].text
+                    ipnhaddr = fields[Tag.Address].text
                     nhportlist.append(ipnhfmbr)
                     if "." in ipnhaddr:
                         port_nhipv4_map[ipnhfmbr] = ipnhaddr
                     elif ":" in ipnhaddr:
                         port_nhipv6_map[ipnhfmbr] = ipnhaddr
-                elif ipnh.find(str(QName(ns, "Type"))).text == 'StaticRoute':
-                    prefix = ipnh.find(str(QName(ns, "AssociatedTo"))).text
-                    ifname = ipnh.find(str(QName(ns, "AttachTo"))).text
-                    nexthop = ipnh.find(str(QName(ns, "Address"))).text
-                    advertise = ipnh.find(str(QName(ns, "Advertise"))).text
+                elif fields[Tag.Type].text == 'StaticRoute':
+                    prefix = fields[Tag.AssociatedTo].text
+                    ifname = fields[Tag.AttachTo].text
+                    nexthop = fields[Tag.Address].text
+                    advertise = fields[Tag.Advertise].text
                     static_routes[prefix] = {'nexthop': nexthop, 'ifname': ifname, 'advertise': advertise}
 
             if port_nhipv4_map and port_nhipv6_map:
@@ -553,30 +810,31 @@ def parse_dpg(dpg, hname):
                 dpg_ecmp_content['ipv4'] = ipv4_content
                 dpg_ecmp_content['ipv6'] = ipv6_content
 
-        vlanintfs = child.find(str(QName(ns, "VlanInterfaces")))
+        vlanintfs = dpg_fields.get(Tag.VlanInterfaces)
         vlans = {}
         vlan_members = {}
         vlan_member_list = {}
         dhcp_relay_table = {}
         # Dict: vlan member (port/PortChannel) -> set of VlanID, in which the member if an untagged vlan member
         untagged_vlan_mbr = defaultdict(set)
-        for vintf in vlanintfs.findall(str(QName(ns, "VlanInterface"))):
-            vlanid = vintf.find(str(QName(ns, "VlanID"))).text
-            vlantype = vintf.find(str(QName(ns, "Type")))
+        vlan_fields = [element_fields(vintf) for vintf in vlanintfs.findall(Tag.VlanInterface)]
+        for fields in vlan_fields:
+            vlanid = fields[Tag.VlanID].text
+            vlantype = fields.get(Tag.Type)
             if vlantype is None:
                 vlantype_name = ""
             else:
                 vlantype_name = vlantype.text
-            vintfmbr = vintf.find(str(QName(ns, "AttachTo"))).text
+            vintfmbr = fields[Tag.AttachTo].text
             vmbr_list = vintfmbr.split(';')
             if vlantype_name != "Tagged":
                 for member in vmbr_list:
                     untagged_vlan_mbr[member].add(vlanid)
-        for vintf in vlanintfs.findall(str(QName(ns, "VlanInterface"))):
-            vintfname = vintf.find(str(QName(ns, "Name"))).text
-            vlanid = vintf.find(str(QName(ns, "VlanID"))).text
-            vintfmbr = vintf.find(str(QName(ns, "AttachTo"))).text
-            vlantype = vintf.find(str(QName(ns, "Type")))
+        for fields in vlan_fields:
+            vintfname = fields[Tag.Name].text
+            vlanid = fields[Tag.VlanID].text
+            vintfmbr = fields[Tag.AttachTo].text
+            vlantype = fields.get(Tag.Type)
             if vlantype is None:
                 vlantype_name = ""
             else:
@@ -597,13 +855,13 @@ def parse_dpg(dpg, hname):
 
             # If this VLAN requires a DHCP relay agent, it will contain a <DhcpRelays> element
             # containing a list of DHCP server IPs
-            vintf_node = vintf.find(str(QName(ns, "DhcpRelays")))
+            vintf_node = fields.get(Tag.DhcpRelays)
             if vintf_node is not None and vintf_node.text is not None:
                 vintfdhcpservers = vintf_node.text
                 vdhcpserver_list = vintfdhcpservers.split(';')
                 vlan_attributes['dhcp_servers'] = vdhcpserver_list
 
-            vintf_node = vintf.find(str(QName(ns, "Dhcpv6Relays")))
+            vintf_node = fields.get(Tag.Dhcpv6Relays)
             if vintf_node is not None and vintf_node.text is not None:
                 vintfdhcpservers = vintf_node.text
                 vdhcpserver_list = vintfdhcpservers.split(';')
@@ -612,7 +870,7 @@ def parse_dpg(dpg, hname):
             sonic_vlan_member_name = "Vlan%s" % (vlanid)
             dhcp_relay_table[sonic_vlan_member_name] = dhcp_attributes
 
-            vlanmac = vintf.find(str(QName(ns, "MacAddress")))
+            vlanmac = fields.get(Tag.MacAddress)
             if vlanmac is not None and vlanmac.text is not None:
                 vlan_attributes['mac'] = vlanmac.text
 
@@ -623,16 +881,17 @@ def parse_dpg(dpg, hname):
             vlan_member_list[sonic_vlan_name] = vmbr_list
 
         acls = {}
-        for aclintf in aclintfs.findall(str(QName(ns, "AclInterface"))):
-            if aclintf.find(str(QName(ns, "InAcl"))) is not None:
-                aclname = aclintf.find(str(QName(ns, "InAcl"))).text.upper().replace(" ", "_").replace("-", "_")
+        for aclintf in aclintfs.findall(Tag.AclInterface):
+            fields = element_fields(aclintf)
+            if Tag.InAcl in fields:
+                aclname = fields[Tag.InAcl].text.upper().replace(" ", "_").replace("-", "_")
                 stage = "ingress"
-            elif aclintf.find(str(QName(ns, "OutAcl"))) is not None:
-                aclname = aclintf.find(str(QName(ns, "OutAcl"))).text.upper().replace(" ", "_").replace("-", "_")
+            elif Tag.OutAcl in fields:
+                aclname = fields[Tag.OutAcl].text.upper().replace(" ", "_").replace("-", "_")
                 stage = "egress"
             else:
                 sys.exit("Error: 'AclInterface' must contain either an 'InAcl' or 'OutAcl' subelement.")
-            aclattach = aclintf.find(str(QName(ns, "AttachTo"))).text.split(';')
+            aclattach = fields[Tag.AttachTo].text.split(';')
             acl_intfs = []
             is_mirror = False
             is_mirror_v6 = False
@@ -703,7 +962,7 @@ def parse_dpg(dpg, hname):
             else:
                 # This ACL has no interfaces to attach to -- consider this a control plane ACL
                 try:
-                    aclservice = aclintf.find(str(QName(ns, "Type"))).text
+                    aclservice = fields[Tag.Type].text
 
                     # If we already have an ACL with this name and this ACL is bound to a different service,
                     # append the service to our list of services
@@ -723,7 +982,7 @@ def parse_dpg(dpg, hname):
                     print("Warning: Ignoring Control Plane ACL %s without type" % aclname, file=sys.stderr)
 
 
-        mg_tunnels = child.find(str(QName(ns, "TunnelInterfaces")))
+        mg_tunnels = dpg_fields.get(Tag.TunnelInterfaces)
         if mg_tunnels is not None:
             table_key_to_mg_key_map = {"encap_ecn_mode": "EcnEncapsulationMode", 
                                        "ecn_mode": "EcnDecapsulationMode", 
@@ -736,7 +995,7 @@ def parse_dpg(dpg, hname):
                                        "encap_tc_to_queue_map": "EncapTcToQueueMap",
                                        "encap_tc_to_dscp_map": "EncapTcToDscpMap"}
 
-            for mg_tunnel in mg_tunnels.findall(str(QName(ns, "TunnelInterface"))):
+            for mg_tunnel in mg_tunnels.findall(Tag.TunnelInterface):
                 tunnel_type = mg_tunnel.attrib["Type"]
                 tunnel_name = mg_tunnel.attrib["Name"]
                 tunnelintfs[tunnel_type][tunnel_name] = {
@@ -762,7 +1021,7 @@ def parse_dpg(dpg, hname):
 
 def parse_host_loopback(dpg, hname):
     for child in dpg:
-        hostname = child.find(str(QName(ns, "Hostname")))
+        hostname = child.find(Tag.Hostname)
         if hostname.text.lower() != hname.lower():
             continue
         lo_intfs = parse_loopback_intf(child)
@@ -777,25 +1036,26 @@ def parse_cpg(cpg, hname, local_devices=[]):
     bgp_peers_with_range = {}
     for child in cpg:
         tag = child.tag
-        if tag == str(QName(ns, "PeeringSessions")):
-            for session in child.findall(str(QName(ns, "BGPSession"))):
-                start_router = session.find(str(QName(ns, "StartRouter"))).text
-                start_peer = session.find(str(QName(ns, "StartPeer"))).text
-                end_router = session.find(str(QName(ns, "EndRouter"))).text
-                end_peer = session.find(str(QName(ns, "EndPeer"))).text
-                rrclient = 1 if session.find(str(QName(ns, "RRClient"))) is not None else 0
-                if session.find(str(QName(ns, "HoldTime"))) is not None:
-                    holdtime = session.find(str(QName(ns, "HoldTime"))).text
+        if tag == Tag.PeeringSessions:
+            for session in child.findall(Tag.BGPSession):
+                fields = element_fields(session)
+                start_router = fields[Tag.StartRouter].text
+                start_peer = fields[Tag.StartPeer].text
+                end_router = fields[Tag.EndRouter].text
+                end_peer = fields[Tag.EndPeer].text
+                rrclient = 1 if Tag.RRClient in fields else 0
+                if Tag.HoldTime in fields:
+                    holdtime = fields[Tag.HoldTime].text
                 else:
                     holdtime = 180
-                if session.find(str(QName(ns, "KeepAliveTime"))) is not None:
-                    keepalive = session.find(str(QName(ns, "KeepAliveTime"))).text
+                if Tag.KeepAliveTime in fields:
+                    keepalive = fields[Tag.KeepAliveTime].text
                 else:
                     keepalive = 60
-                nhopself = 1 if session.find(str(QName(ns, "NextHopSelf"))) is not None else 0
+                nhopself = 1 if Tag.NextHopSelf in fields else 0
 
                 # choose the right table and admin_status for the peer
-                chassis_internal_ibgp = session.find(str(QName(ns, "ChassisInternal")))
+                chassis_internal_ibgp = fields.get(Tag.ChassisInternal)
                 if chassis_internal_ibgp is not None and chassis_internal_ibgp.text == "voq":
                     table = bgp_voq_chassis_sessions
                     admin_status = 'up'
@@ -831,40 +1091,36 @@ def parse_cpg(cpg, hname, local_devices=[]):
                     }
                     if admin_status:
                         table[end_peer.lower()]['admin_status'] = admin_status
-        elif child.tag == str(QName(ns, "Routers")):
-            for router in child.findall(str(QName(ns1, "BGPRouterDeclaration"))):
-                asn = router.find(str(QName(ns1, "ASN"))).text
-                hostname = router.find(str(QName(ns1, "Hostname"))).text
+        elif child.tag == Tag.Routers:
+            sessions_by_name = {}
+            for table in (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions):
+                for bgp_session in table.values():
+                    sessions_by_name.setdefault(bgp_session['name'].lower(), []).append(bgp_session)
+            for router in child.findall(Tag.A_BGPRouterDeclaration):
+                fields = element_fields(router)
+                asn = fields[Tag.A_ASN].text
+                hostname = fields[Tag.A_Hostname].text
                 if hostname.lower() == hname.lower():
                     myasn = asn
-                    peers = router.find(str(QName(ns1, "Peers")))
-                    for bgpPeer in peers.findall(str(QName(ns, "BGPPeer"))):
-                        addr = bgpPeer.find(str(QName(ns, "Address"))).text
-                        if bgpPeer.find(str(QName(ns1, "PeersRange"))) is not None: # FIXME: is better to check for type BGPPeerPassive
-                            name = bgpPeer.find(str(QName(ns1, "Name"))).text
-                            ip_range = bgpPeer.find(str(QName(ns1, "PeersRange"))).text
+                    peers = fields.get(Tag.A_Peers)
+                    for bgpPeer in peers.findall(Tag.BGPPeer):
+                        peer_fields = element_fields(bgpPeer)
+                        addr = peer_fields[Tag.Address].text
+                        if Tag.A_PeersRange in peer_fields: # FIXME: is better to check for type BGPPeerPassive
+                            name = peer_fields[Tag.A_Name].text
+                            ip_range = peer_fields[Tag.A_PeersRange].text
                             ip_range_group = ip_range.split(';') if ip_range and ip_range != "" else []
                             bgp_peers_with_range[name] = {
                                 'name': name,
                                 'ip_range': ip_range_group
                             }
-                            if bgpPeer.find(str(QName(ns, "Address"))) is not None:
-                                bgp_peers_with_range[name]['src_address'] = bgpPeer.find(str(QName(ns, "Address"))).text
-                            if bgpPeer.find(str(QName(ns1, "PeerAsn"))) is not None:
-                                bgp_peers_with_range[name]['peer_asn'] = bgpPeer.find(str(QName(ns1, "PeerAsn"))).text
+                            if Tag.Address in peer_fields:
+                                bgp_peers_with_range[name]['src_address'] = peer_fields[Tag.Address].text
+                            if Tag.A_PeerAsn in peer_fields:
+                                bgp_peers_with_range[name]['peer_asn'] = peer_fields[Tag.A_PeerAsn].text
                 else:
-                    for peer in bgp_sessions:
-                        bgp_session = bgp_sessions[peer]
-                        if hostname.lower() == bgp_session['name'].lower():
-                            bgp_session['asn'] = asn
-                    for peer in bgp_internal_sessions:
-                        bgp_internal_session = bgp_internal_sessions[peer]
-                        if hostname.lower() == bgp_internal_session['name'].lower():
-                            bgp_internal_session['asn'] = asn
-                    for peer in bgp_voq_chassis_sessions:
-                        bgp_session = bgp_voq_chassis_sessions[peer]
-                        if hostname.lower() == bgp_session['name'].lower():
-                            bgp_session['asn'] = asn
+                    for bgp_session in sessions_by_name.get(hostname.lower(), []):
+                        bgp_session['asn'] = asn
 
     bgp_monitors = { key: bgp_sessions[key] for key in bgp_sessions if 'asn' in bgp_sessions[key] and bgp_sessions[key]['name'] == 'BGPMonitor' }
     def filter_bad_asn(table):
@@ -898,13 +1154,15 @@ def parse_meta(meta, hname):
     downstream_redundancy_types = None
     qos_profile = None
 
-    device_metas = meta.find(str(QName(ns, "Devices")))
-    for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-        if device.find(str(QName(ns1, "Name"))).text.lower() == hname.lower():
-            properties = device.find(str(QName(ns1, "Properties")))
-            for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-                name = device_property.find(str(QName(ns1, "Name"))).text
-                value = device_property.find(str(QName(ns1, "Value"))).text
+    device_metas = meta.find(Tag.Devices)
+    for device in device_metas.findall(Tag.A_DeviceMetadata):
+        fields = element_fields(device)
+        if fields[Tag.A_Name].text.lower() == hname.lower():
+            properties = fields.get(Tag.A_Properties)
+            for device_property in properties.findall(Tag.A_DeviceProperty):
+                property_fields = element_fields(device_property)
+                name = property_fields[Tag.A_Name].text
+                value = property_fields[Tag.A_Value].text
                 value_group = value.strip().split(';') if value and value != "" else []
                 if name == "DhcpResources":
                     dhcp_servers = value_group
@@ -950,14 +1208,15 @@ def parse_meta(meta, hname):
 
 
 def parse_linkmeta(meta, hname):
-    link = meta.find(str(QName(ns, "Link")))
+    link = meta.find(Tag.Link)
     linkmetas = {}
-    for linkmeta in link.findall(str(QName(ns1, "LinkMetadata"))):
+    for linkmeta in link.findall(Tag.A_LinkMetadata):
+        fields = element_fields(linkmeta)
         port = None
         fec_disabled = None
 
         # Sample: ARISTA05T1:Ethernet1/33;switch-t0:fortyGigE0/4
-        key = linkmeta.find(str(QName(ns1, "Key"))).text
+        key = fields[Tag.A_Key].text
         endpoints = key.split(';')
         for endpoint in endpoints:
             t = endpoint.split(':')
@@ -975,10 +1234,11 @@ def parse_linkmeta(meta, hname):
         macsec_enabled = False
         tx_power = None
         laser_freq = None
-        properties = linkmeta.find(str(QName(ns1, "Properties")))
-        for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-            name = device_property.find(str(QName(ns1, "Name"))).text
-            value = device_property.find(str(QName(ns1, "Value"))).text
+        properties = fields.get(Tag.A_Properties)
+        for device_property in properties.findall(Tag.A_DeviceProperty):
+            property_fields = element_fields(device_property)
+            name = property_fields[Tag.A_Name].text
+            value = property_fields[Tag.A_Value].text
             if name == "FECDisabled":
                 fec_disabled = value
             elif name in [ "GeminiPeeringLink", "LibraPeeringLink" ]:
@@ -1034,13 +1294,15 @@ def parse_asic_meta(meta, hname):
     max_cores = None
     deployment_id = None
     macsec_profile = {}
-    device_metas = meta.find(str(QName(ns, "Devices")))
-    for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-        if device.find(str(QName(ns1, "Name"))).text.lower() == hname.lower():
-            properties = device.find(str(QName(ns1, "Properties")))
-            for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-                name = device_property.find(str(QName(ns1, "Name"))).text
-                value = device_property.find(str(QName(ns1, "Value"))).text
+    device_metas = meta.find(Tag.Devices)
+    for device in device_metas.findall(Tag.A_DeviceMetadata):
+        fields = element_fields(device)
+        if fields[Tag.A_Name].text.lower() == hname.lower():
+            properties = fields.get(Tag.A_Properties)
+            for device_property in properties.findall(Tag.A_DeviceProperty):
+                property_fields = element_fields(device_property)
+                name = property_fields[Tag.A_Name].text
+                value = property_fields[Tag.A_Value].text
                 if name == "SubRole":
                     sub_role = value
                 elif name == "SwitchId":
@@ -1060,31 +1322,34 @@ def parse_deviceinfo(meta, hwsku):
     port_speeds = {}
     port_descriptions = {}
     sys_ports = {}
-    for device_info in meta.findall(str(QName(ns, "DeviceInfo"))):
-        dev_sku = device_info.find(str(QName(ns, "HwSku"))).text
+    for device_info in meta.findall(Tag.DeviceInfo):
+        fields = element_fields(device_info)
+        dev_sku = fields[Tag.HwSku].text
         if dev_sku == hwsku:
-            interfaces = device_info.find(str(QName(ns, "EthernetInterfaces"))).findall(str(QName(ns1, "EthernetInterface")))
-            interfaces = interfaces + device_info.find(str(QName(ns, "ManagementInterfaces"))).findall(str(QName(ns1, "ManagementInterface")))
+            interfaces = fields.get(Tag.EthernetInterfaces).findall(Tag.A_EthernetInterface)
+            interfaces = interfaces + fields.get(Tag.ManagementInterfaces).findall(Tag.A_ManagementInterface)
             for interface in interfaces:
-                alias = interface.find(str(QName(ns, "InterfaceName"))).text
-                speed = interface.find(str(QName(ns, "Speed"))).text
-                desc  = interface.find(str(QName(ns, "Description")))
+                interface_fields = element_fields(interface)
+                alias = interface_fields[Tag.InterfaceName].text
+                speed = interface_fields[Tag.Speed].text
+                desc  = interface_fields.get(Tag.Description)
                 if desc != None:
                     port_descriptions[port_alias_map.get(alias, alias)] = desc.text
                 port_speeds[port_alias_map.get(alias, alias)] = speed
 
-            sysports = device_info.find(str(QName(ns, "SystemPorts")))
+            sysports = fields.get(Tag.SystemPorts)
             if sysports is not None:
-                for sysport in sysports.findall(str(QName(ns, "SystemPort"))):
-                    portname = sysport.find(str(QName(ns, "Name"))).text
-                    hostname = sysport.find(str(QName(ns, "Hostname")))
-                    asic_name = sysport.find(str(QName(ns, "AsicName")))
-                    system_port_id = sysport.find(str(QName(ns, "SystemPortId"))).text
-                    switch_id = sysport.find(str(QName(ns, "SwitchId"))).text
-                    core_id = sysport.find(str(QName(ns, "CoreId"))).text
-                    core_port_id = sysport.find(str(QName(ns, "CorePortId"))).text
-                    speed = sysport.find(str(QName(ns, "Speed"))).text
-                    num_voq = sysport.find(str(QName(ns, "NumVoq"))).text
+                for sysport in sysports.findall(Tag.SystemPort):
+                    sysport_fields = element_fields(sysport)
+                    portname = sysport_fields[Tag.Name].text
+                    hostname = sysport_fields.get(Tag.Hostname)
+                    asic_name = sysport_fields.get(Tag.AsicName)
+                    system_port_id = sysport_fields[Tag.SystemPortId].text
+                    switch_id = sysport_fields[Tag.SwitchId].text
+                    core_id = sysport_fields[Tag.CoreId].text
+                    core_port_id = sysport_fields[Tag.CorePortId].text
+                    speed = sysport_fields[Tag.Speed].text
+                    num_voq = sysport_fields[Tag.NumVoq].text
                     key = portname
                     if asic_name is not None:
                        key = "%s|%s" % (asic_name.text, key)
@@ -1198,17 +1463,13 @@ def filter_acl_table_bindings(acls, neighbors, port_channels, sub_role, device_t
     if sub_role == BACKEND_ASIC_SUB_ROLE:
         return filter_acls
 
-    front_port_channel_intf = []
+    # Set of Backplane ports
+    prefix = backplane_prefix()
+    backplane_ports = {v for v in port_alias_map.values() if v.startswith(prefix)}
 
-    # List of Backplane ports
-    backplane_port_list = [v for k,v in port_alias_map.items() if v.startswith(backplane_prefix())]
-   
     # Get the front panel port channel.
-    for port_channel_intf in port_channels:
-        backend_port_channel = any(lag_member in backplane_port_list \
-                                   for lag_member in port_channels[port_channel_intf]['members'])
-        if not backend_port_channel:
-            front_port_channel_intf.append(port_channel_intf)
+    front_port_channel_intf = {port_channel_intf for port_channel_intf, port_channel in port_channels.items()
+                               if backplane_ports.isdisjoint(port_channel['members'])}
 
     for acl_table, group_params in acls.items():
         group_type = group_params.get('type', None)
@@ -1228,7 +1489,7 @@ def filter_acl_table_bindings(acls, neighbors, port_channels, sub_role, device_t
         front_panel_ports = []
         for port in group_params.get('ports', []):
             # Filter out backplane ports
-            if port in backplane_port_list:
+            if port in backplane_ports:
                 continue
             # Filter out backplane port channels
             if port in port_channels and port not in front_port_channel_intf:
@@ -1238,7 +1499,7 @@ def filter_acl_table_bindings(acls, neighbors, port_channels, sub_role, device_t
         # Filters out inactive front-panel ports from the binding list for mirror
         # ACL tables. We define an "active" port as one that is a member of a
         # front pannel port channel or one that is connected to a neighboring device via front panel port.
-        active_ports = [port for port in front_panel_ports if port in neighbors.keys() or port in front_port_channel_intf]
+        active_ports = [port for port in front_panel_ports if port in neighbors or port in front_port_channel_intf]
         
         if not active_ports:
             print('Warning: mirror table {} in ACL_TABLE does not have any ports bound to it'.format(acl_table), file=sys.stderr)
@@ -1292,7 +1553,22 @@ def select_mmu_profiles(profile, platform, hwsku):
 # Main functions
 #
 ###############################################################################
-def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None):
+def load_minigraph_port_config(header, platform, port_config_file, asic_name, hwsku_config_file):
+    """ Load the port config of the minigraph hwsku into the port alias maps.
+
+    Returns the hostname, the hwsku, the port config and a copy of the port
+    config, as the parse updates its ports in place.
+    """
+    hostname = header['hostname']
+    hwsku = header['hwsku']
+    port_config = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+    port_config_snapshot = copy.deepcopy(port_config)
+    (_, alias_map, alias_asic_map) = port_config
+    port_alias_map.update(alias_map)
+    port_alias_asic_map.update(alias_asic_map)
+    return hostname, hwsku, port_config, port_config_snapshot
+
+def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None, root=None):
     """ Parse minigraph xml file.
 
     Keyword arguments:
@@ -1301,13 +1577,25 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     port_config_file -- port config file name
     asic_name -- asic name; to parse multi-asic device minigraph to 
     generate asic specific configuration.
+    root -- the minigraph already parsed by load_minigraph(), to avoid
+    reading the file again
      """
 
-    root = ET.parse(filename).getroot()
+    cache_file = get_parse_cache_file(filename, 'xml', platform, port_config_file, asic_name, hwsku_config_file)
+    cached = load_parse_cache(cache_file)
+    if cached is not None:
+        (hwsku, qos_profile, port_config, results) = cached
+        # The port config may come from CONFIG_DB, so the snapshot is only
+        # valid as long as the port config it was built from is unchanged
+        current_port_config = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+        if current_port_config == port_config:
+            port_alias_map.update(port_config[1])
+            port_alias_asic_map.update(port_config[2])
+            select_mmu_profiles(qos_profile, platform, hwsku)
+            return results
 
     u_neighbors = None
     u_devices = None
-    hwsku = None
     bgp_sessions = None
     bgp_monitors = []
     bgp_asn = None
@@ -1330,7 +1618,6 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     sub_role = None
     resource_type = None
     downstream_subrole = None
-    docker_routing_config_mode = "separated"
     port_speeds_default = {}
     port_speed_png = {}
     port_descriptions = {}
@@ -1351,11 +1638,9 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     switch_id = None
     switch_type = None
     max_cores = None
-    hostname = None
     linkmetas = {}
     host_lo_intfs = None
     is_storage_device = False
-    local_devices = []
     kube_data = {}
     static_routes = {}
     system_defaults = {}
@@ -1363,63 +1648,56 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     downstream_redundancy_types = None
     redundancy_type = None
     qos_profile = None
-
-    hwsku_qn = QName(ns, "HwSku")
-    hostname_qn = QName(ns, "Hostname")
-    docker_routing_config_mode_qn = QName(ns, "DockerRoutingConfigMode")
-    for child in root:
-        if child.tag == str(hwsku_qn):
-            hwsku = child.text
-        if child.tag == str(hostname_qn):
-            hostname = child.text
-        if child.tag == str(docker_routing_config_mode_qn):
-            docker_routing_config_mode = child.text
-
-    (ports, alias_map, alias_asic_map) = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
-    port_alias_map.update(alias_map)
-    port_alias_asic_map.update(alias_asic_map)
-
-    # Get the local device node from DeviceMetadata
-    local_devices = parse_asic_meta_get_devices(root)
-
-    for child in root:
+    dpg_soc_intfs = None
+
+    header = read_minigraph_header(filename, root)
+    (hostname, hwsku, port_config, port_config_snapshot) = load_minigraph_port_config(header, platform, port_config_file, asic_name, hwsku_config_file)
+    local_devices = header['local_devices']
+    sections = ["DpgDec", "CpgDec", "PngDec", "UngDec", "MetadataDeclaration", "LinkMetadataDeclaration", "DeviceInfos"]
+    for child in iter_minigraph(filename, sections, root):
+        if dpg_soc_intfs is None and child.tag == qname(ns, "DpgDec"):
+            dpg_soc_intfs = parse_dpg_soc_intfs(child)
         if asic_name is None:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == qname(ns, "DpgDec"):
                 (intfs, lo_intfs, mvrf, mgmt_intf, voq_inband_intfs, vlans, vlan_members, dhcp_relay_table, pcs, pc_members, acls, vni, tunnel_intfs, dpg_ecmp_content, static_routes, tunnel_intfs_qos_remap_config) = parse_dpg(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == qname(ns, "CpgDec"):
                 (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors) = parse_cpg(child, hostname)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == qname(ns, "PngDec"):
                 (neighbors, devices, console_dev, console_port, mgmt_dev, mgmt_port, port_speed_png, console_ports, mux_cable_ports, png_ecmp_content) = parse_png(child, hostname, dpg_ecmp_content)
-            elif child.tag == str(QName(ns, "UngDec")):
+            elif child.tag == qname(ns, "UngDec"):
                 (u_neighbors, u_devices, _, _, _, _, _, _) = parse_png(child, hostname, None)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == qname(ns, "MetadataDeclaration"):
                 (syslog_servers, dhcp_servers, dhcpv6_servers, ntp_servers, tacacs_servers, mgmt_routes, erspan_dst, deployment_id, region, cloudtype, resource_type, downstream_subrole, switch_id, switch_type, max_cores, kube_data, macsec_profile, downstream_redundancy_types, redundancy_type, qos_profile) = parse_meta(child, hostname)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == qname(ns, "LinkMetadataDeclaration"):
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == qname(ns, "DeviceInfos"):
                 (port_speeds_default, port_descriptions, sys_ports) = parse_deviceinfo(child, hwsku)
         else:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == qname(ns, "DpgDec"):
                 (intfs, lo_intfs, mvrf, mgmt_intf, voq_inband_intfs, vlans, vlan_members, dhcp_relay_table, pcs, pc_members, acls, vni, tunnel_intfs, dpg_ecmp_content, static_routes, tunnel_intfs_qos_remap_config) = parse_dpg(child, asic_name)
                 host_lo_intfs = parse_host_loopback(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == qname(ns, "CpgDec"):
                 (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors) = parse_cpg(child, asic_name, local_devices)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == qname(ns, "PngDec"):
                 (neighbors, devices, port_speed_png) = parse_asic_png(child, asic_name, hostname)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == qname(ns, "MetadataDeclaration"):
                 (sub_role, switch_id, switch_type, max_cores, deployment_id, macsec_profile) = parse_asic_meta(child, asic_name)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == qname(ns, "LinkMetadataDeclaration"):
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == qname(ns, "DeviceInfos"):
                 (port_speeds_default, port_descriptions, sys_ports) = parse_deviceinfo(child, hwsku)
 
+    (ports, _, _) = port_config
+    docker_routing_config_mode = header['docker_routing_config_mode']
+
     select_mmu_profiles(qos_profile, platform, hwsku)
     # set the host device type in asic metadata also
-    device_type = [devices[key]['type'] for key in devices if key.lower() == hostname.lower()][0]
+    device_index = DeviceIndex(devices)
+    device_type = device_index[hostname]['type']
     if asic_name is None:
-        current_device = [devices[key] for key in devices if key.lower() == hostname.lower()][0]
+        current_device = device_index[hostname]
     else:
-        current_device = [devices[key] for key in devices if key.lower() == asic_name.lower()][0]
+        current_device = device_index[asic_name]
 
     results = {}
     results['DEVICE_METADATA'] = {'localhost': {
@@ -1437,7 +1715,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     if deployment_id is not None:
         results['DEVICE_METADATA']['localhost']['deployment_id'] = deployment_id
 
-    cluster = [devices[key] for key in devices if key.lower() == hostname.lower()][0].get('cluster', "")
+    cluster = device_index[hostname].get('cluster', "")
     if cluster:
         results['DEVICE_METADATA']['localhost']['cluster'] = cluster
 
@@ -1776,7 +2054,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     # Add src_ip and qos remapping config into TUNNEL table if tunnel_qos_remap is enabled
     results['TUNNEL'] = get_tunnel_entries(tunnel_intfs, tunnel_intfs_qos_remap_config, lo_intfs, system_defaults.get('tunnel_qos_remap', {}), mux_tunnel_name, peer_switch_ip)
 
-    active_active_ports = get_ports_in_active_active(root, devices, neighbors)
+    active_active_ports = get_ports_in_active_active(dpg_soc_intfs or {}, devices, neighbors)
     results['MUX_CABLE'] = get_mux_cable_entries(ports, mux_cable_ports, active_active_ports, neighbors, devices, redundancy_type)
 
     # If connected to a smart cable, get the connection position
@@ -1795,9 +2073,11 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
             del neighbors[nghbr]
     results['DEVICE_NEIGHBOR'] = neighbors
     if asic_name is None:
-        results['DEVICE_NEIGHBOR_METADATA'] = { key:devices[key] for key in devices if key.lower() != hostname.lower() }
+        local_name = hostname.lower()
+        results['DEVICE_NEIGHBOR_METADATA'] = { key:devices[key] for key in devices if key.lower() != local_name }
     else:
-        results['DEVICE_NEIGHBOR_METADATA'] = { key:devices[key] for key in devices if key in {device['name'] for device in neighbors.values()} }
+        neighbor_names = {device['name'] for device in neighbors.values()}
+        results['DEVICE_NEIGHBOR_METADATA'] = { key:devices[key] for key in devices if key in neighbor_names }
     results['SYSLOG_SERVER'] = dict((item, {}) for item in syslog_servers)
     results['DHCP_SERVER'] = dict((item, {}) for item in dhcp_servers)
     results['DHCP_RELAY'] = dhcp_relay_table
@@ -1870,6 +2150,8 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     if current_device['type'] in dhcp_server_enabled_device_types:
         results['DEVICE_METADATA']['localhost']['dhcp_server'] = 'enabled'
 
+    store_parse_cache(cache_file, (hwsku, qos_profile, port_config_snapshot, results))
+
     return results
 
 def get_tunnel_entries(tunnel_intfs, tunnel_intfs_qos_remap_config, lo_intfs, tunnel_qos_remap, mux_tunnel_name, peer_switch_ip):
@@ -1910,32 +2192,37 @@ def get_tunnel_entries(tunnel_intfs, tunnel_intfs_qos_remap_config, lo_intfs, tu
     return tunnels
 
 
-def get_ports_in_active_active(root, devices, neighbors):
+def parse_dpg_soc_intfs(dpg):
+    """Parse out the SoC loopback addresses of the devices in DpgDec."""
+    dpg_soc_intfs = {}
+    for child in dpg:
+        hostname = child.find(qname(ns, "Hostname"))
+        if hostname is None or child.find(qname(ns, "LoopbackIPInterfaces")) is None:
+            continue
+        hostname = hostname.text.lower()
+        lo_intfs = parse_loopback_intf(child)
+        soc_intfs = {}
+        for intfname, ipprefix in lo_intfs.keys():
+            intfname_lower = intfname.lower()
+            if hostname + "soc" == intfname_lower:
+                ipprefix = str(ipaddress.ip_network(UNICODE_TYPE(ipprefix.split("/")[0])))
+                if "." in ipprefix:
+                    soc_intfs["soc_ipv4"] = ipprefix
+                elif ":" in ipprefix:
+                    soc_intfs["soc_ipv6"] = ipprefix
+        if soc_intfs:
+            dpg_soc_intfs[hostname] = soc_intfs
+    return dpg_soc_intfs
+
+
+def get_ports_in_active_active(dpg_soc_intfs, devices, neighbors):
     """Parse out ports in active-active cable type."""
     servers = {hostname.lower(): device_data for hostname, device_data in devices.items() if device_data["type"] == "Server"}
     ports_in_active_active = {}
-    dpg_section = root.find(str(QName(ns, "DpgDec")))
     neighbor_to_port_mapping = {neighbor["name"].lower(): port for port, neighbor in neighbors.items()}
-    if dpg_section is not None:
-        for child in dpg_section:
-            hostname = child.find(str(QName(ns, "Hostname")))
-            if hostname is None:
-                continue
-            hostname = hostname.text.lower()
-            if hostname not in servers:
-                continue
-            lo_intfs = parse_loopback_intf(child)
-            soc_intfs = {}
-            for intfname, ipprefix in lo_intfs.keys():
-                intfname_lower = intfname.lower()
-                if hostname + "soc" == intfname_lower:
-                    ipprefix = str(ipaddress.ip_network(UNICODE_TYPE(ipprefix.split("/")[0])))
-                    if "." in ipprefix:
-                        soc_intfs["soc_ipv4"] = ipprefix
-                    elif ":" in ipprefix:
-                        soc_intfs["soc_ipv6"] = ipprefix
-            if hostname in neighbor_to_port_mapping and soc_intfs:
-                ports_in_active_active[neighbor_to_port_mapping[hostname]] = soc_intfs
+    for hostname, soc_intfs in dpg_soc_intfs.items():
+        if hostname in servers and hostname in neighbor_to_port_mapping:
+            ports_in_active_active[neighbor_to_port_mapping[hostname]] = soc_intfs
     return ports_in_active_active
 
 
@@ -2008,36 +2295,190 @@ def parse_device_desc_xml(filename):
 
     return results
 
+def parse_asic_metas(filename):
+    """ Parse the asic metadata of every device in the minigraph.
+
+    Returns None if the minigraph has no MetadataDeclaration, otherwise a
+    dict of lower-cased device name to the parse_asic_meta() result.
+    """
+    cache_file = get_parse_cache_file(filename, 'asic_meta')
+    metas = load_parse_cache(cache_file)
+    if metas is not None:
+        return metas['metas']
+
+    metas = {'metas': None}
+    for child in iter_minigraph_sections(filename, ["MetadataDeclaration"]):
+        if child.tag == qname(ns, "MetadataDeclaration"):
+            metas['metas'] = {}
+            for name in parse_meta_devices(child):
+                if name not in metas['metas']:
+                    metas['metas'][name] = parse_asic_meta(child, name)
+            break
+
+    store_parse_cache(cache_file, metas)
+    return metas['metas']
+
+def get_asic_meta(filename, asic_name):
+    metas = parse_asic_metas(filename)
+    if metas is None:
+        return None
+    return metas.get(asic_name.lower(), (None, None, None, None, None, {}))
+
 def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
-    for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
-            sub_role, _, _, _, _, _= parse_asic_meta(child, asic_name)
-            return sub_role
+    meta = get_asic_meta(filename, asic_name)
+    if meta is None:
+        return None
+    sub_role, _, _, _, _, _ = meta
+    return sub_role
 
 def parse_asic_switch_type(filename, asic_name):
     if os.path.isfile(filename):
-        root = ET.parse(filename).getroot()
-        for child in root:
-            if child.tag == str(QName(ns, "MetadataDeclaration")):
-                _, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
-                return switch_type
+        meta = get_asic_meta(filename, asic_name)
+        if meta is not None:
+            _, _, switch_type, _, _, _ = meta
+            return switch_type
     return None
 
+def parse_meta_devices(meta):
+    local_devices = []
+    device_metas = meta.find(qname(ns, "Devices"))
+    for device in device_metas.findall(qname(ns1, "DeviceMetadata")):
+        name = device.find(qname(ns1, "Name")).text.lower()
+        local_devices.append(name)
+    return local_devices
+
 def parse_asic_meta_get_devices(root):
     local_devices = []
 
     for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
-            device_metas = child.find(str(QName(ns, "Devices")))
-            for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-                name = device.find(str(QName(ns1, "Name"))).text.lower()
-                local_devices.append(name)
+        if child.tag == qname(ns, "MetadataDeclaration"):
+            local_devices.extend(parse_meta_devices(child))
 
     return local_devices
 
+###############################################################################
+#
+# Parse cache functions
+#
+###############################################################################
+
+_file_digests = {}  # absolute path -> (size, mtime, sha256)
+_parse_cache = OrderedDict()  # snapshot file -> pickled snapshot, least recently used first
+
+def get_file_digest(filename):
+    """ Return the sha256 of the file content, memoized by path, size and mtime """
+    st = os.stat(filename)
+    path = os.path.abspath(filename)
+    cached = _file_digests.get(path)
+    if cached is None or cached[:2] != (st.st_size, st.st_mtime):
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        cached = (st.st_size, st.st_mtime, digest.hexdigest())
+        _file_digests[path] = cached
+    return cached[2]
+
+def get_parse_cache_file(filename, kind, *args):
+    """ Return the snapshot file name of a minigraph parse, or None if the
+    snapshots are disabled or the minigraph or one of the files it is parsed
+    with can not be read.
+
+    The name is made of the kind, a hash of the parse arguments (the slot) and
+    a hash of the parser, the python major version, whose pickles the other
+    can not load, and the file contents (the version). Storing a snapshot
+    replaces the other versions of its slot.
+    """
+    if not PARSE_CACHE_DIR:
+        return None
+    slot = [kind]
+    try:
+        version = [PARSE_CACHE_VERSION, sys.version_info[0], os.path.getmtime(__file__), get_file_digest(filename)]
+        for arg in args:
+            slot.append(arg)
+            if arg is not None and os.path.isfile(arg):
+                version.append(get_file_digest(arg))
+    except (IOError, OSError):
+        return None
+    slot_name = hashlib.sha256(repr(slot).encode()).hexdigest()[:16]
+    version_name = hashlib.sha256(repr(version).encode()).hexdigest()
+    return os.path.join(PARSE_CACHE_DIR, '%s-%s-%s.pickle' % (kind, slot_name, version_name))
+
+def remember_parse_cache(cache_file, data):
+    _parse_cache.pop(cache_file, None)
+    _parse_cache[cache_file] = data
+    while len(_parse_cache) > PARSE_CACHE_MEMORY_SIZE:
+        _parse_cache.popitem(last=False)
+
+def load_parse_cache(cache_file):
+    """ Return a private copy of a parse snapshot, or None on a cache miss """
+    if cache_file is None:
+        return None
+    data = _parse_cache.get(cache_file)
+    if data is None:
+        try:
+            with open(cache_file, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+    remember_parse_cache(cache_file, data)
+    try:
+        return pickle.loads(data)
+    except Exception:
+        _parse_cache.pop(cache_file, None)
+        return None
+
+def prune_parse_cache(cache_file):
+    """ Remove the other versions of the slot of cache_file, then the oldest
+    snapshots beyond PARSE_CACHE_FILES.
+    """
+    cache_dir = os.path.dirname(cache_file)
+    slot_prefix = cache_file.rsplit('-', 1)[0] + '-'
+    for name in list(_parse_cache):
+        if name.startswith(slot_prefix) and name != cache_file:
+            del _parse_cache[name]
+    snapshots = []
+    for name in glob.glob(os.path.join(cache_dir, '*.pickle')):
+        try:
+            if name.startswith(slot_prefix):
+                if name != cache_file:
+                    os.remove(name)
+            else:
+                snapshots.append((os.path.getmtime(name), name))
+        except (IOError, OSError):
+            pass
+    snapshots.sort()
+    for _, name in snapshots[:max(len(snapshots) + 1 - PARSE_CACHE_FILES, 0)]:
+        try:
+            os.remove(name)
+        except (IOError, OSError):
+            pass
+
+def store_parse_cache(cache_file, obj):
+    if cache_file is None:
+        return
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    remember_parse_cache(cache_file, data)
+    # The snapshot is written to a temporary file first, so concurrent
+    # readers never see partial content
+    cache_dir = os.path.dirname(cache_file)
+    tmp_file = '%s.%d' % (cache_file, os.getpid())
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.rename(tmp_file, cache_file)
+    except (IOError, OSError):
+        try:
+            os.remove(tmp_file)
+        except (IOError, OSError):
+            pass
+        return
+    prune_parse_cache(cache_file)
+
 port_alias_map = {}
 port_alias_asic_map = {}
 
@@ -1,5 +1,6 @@
 try:
     import ast
+    import hashlib
     import json
     import os
     import re
@@ -42,6 +43,14 @@ OPTIONAL_HWSKU_ATTRIBUTES = ["fec", "autoneg"]
 BRKOUT_PATTERN = r'(\d{1,6})x(\d{1,6}G?)(\[(\d{1,6}G?,?)*\])?(\((\d{1,6})\))?'
 BRKOUT_PATTERN_GROUPS = 6
 
+# Compiled breakout mode tables of platform.json files.
+# SONIC_CFGGEN_PORTCONFIG_CACHE_DIR overrides the directory, an empty value
+# disables storing the tables.
+BRKOUT_TABLE_CACHE_DIR = os.environ.get('SONIC_CFGGEN_PORTCONFIG_CACHE_DIR', '/var/cache/sonic-cfggen/portconfig')
+BRKOUT_TABLE_VERSION = 2
+# Errors of a breakout mode recorded in the compiled table
+BRKOUT_TABLE_ERRORS = (RuntimeError, KeyError, ValueError, IndexError)
+
 #
 # Helper Functions
 #
@@ -68,6 +77,38 @@ def readJson(filename):
         print("error occurred while parsing json: {}".format(sys.exc_info()[1]))
         return None
 
+def _file_version(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size, st.st_ino)
+
+# Parsed files, keyed by path and loader, with the mtime, size and inode
+# they were loaded at
+_file_cache = {}
+
+def load_cached(filename, loader):
+    """
+    Return loader(filename), reusing the result of a previous call as long
+    as the file has not changed. The result is shared between the callers
+    and must not be modified.
+    """
+    version = _file_version(filename)
+    if version is None:
+        return loader(filename)
+    key = (filename, loader)
+    cached = _file_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    result = loader(filename)
+    if result is not None:
+        _file_cache[key] = (version, result)
+    return result
+
+def clear_cache():
+    _file_cache.clear()
+
 def db_connect_configdb(namespace=None):
     """
     Connect to configdb
@@ -254,33 +295,8 @@ class BreakoutCfg(object):
         if not self._breakout_capabilities:
             raise RuntimeError("Unsupported breakout mode {}!".format(bmode))
 
-    def _re_group_to_entry(self, group):
-        if len(group) != BRKOUT_PATTERN_GROUPS:
-            raise RuntimeError("Unsupported breakout mode format!")
-
-        num_ports, default_speed, supported_speed, _, num_assigned_lanes, _ = group
-        if not num_assigned_lanes:
-            num_assigned_lanes = len(self._lanes)
-
-        return BreakoutCfg.BreakoutModeEntry(num_ports, default_speed, supported_speed, num_assigned_lanes)
-
     def _str_to_entries(self, bmode):
-        """
-        Example of match_list for some breakout_mode using regex
-            Breakout Mode -------> Match_list
-            -----------------------------
-            2x25G(2)+1x50G(2) ---> [('2', '25G', None, '(2)', '2'), ('1', '50G', None, '(2)', '2')]
-            1x50G(2)+2x25G(2) ---> [('1', '50G', None, '(2)', '2'), ('2', '25G', None, '(2)', '2')]
-            1x100G[40G] ---------> [('1', '100G', '[40G]', None, None)]
-            2x50G ---------------> [('2', '50G', None, None, None)]
-        """
-
-        try:
-            groups_list = [re.match(BRKOUT_PATTERN, i).groups() for i in bmode.split("+")]
-        except Exception:
-            raise RuntimeError('Breakout mode "{}" validation failed!'.format(bmode))
-
-        return [self._re_group_to_entry(group) for group in groups_list]
+        return parse_breakout_mode_entries(bmode, len(self._lanes))
 
     def get_config(self):
         # Ensure that we have corret number of configured lanes
@@ -317,24 +333,182 @@ class BreakoutCfg(object):
         return ports
 
 
+# Parsed breakout modes, keyed by mode string and number of lanes
+_breakout_entries = {}
+
+def parse_breakout_mode_entries(bmode, num_lanes):
+    """
+    Example of match_list for some breakout_mode using regex
+        Breakout Mode -------> Match_list
+        -----------------------------
+        2x25G(2)+1x50G(2) ---> [('2', '25G', None, '(2)', '2'), ('1', '50G', None, '(2)', '2')]
+        1x50G(2)+2x25G(2) ---> [('1', '50G', None, '(2)', '2'), ('2', '25G', None, '(2)', '2')]
+        1x100G[40G] ---------> [('1', '100G', '[40G]', None, None)]
+        2x50G ---------------> [('2', '50G', None, None, None)]
+
+    The BreakoutModeEntry list of a mode string is parsed once and shared,
+    it must not be modified.
+    """
+    key = (bmode, num_lanes)
+    entries = _breakout_entries.get(key)
+    if entries is not None:
+        return entries
+
+    try:
+        groups_list = [re.match(BRKOUT_PATTERN, i).groups() for i in bmode.split("+")]
+    except Exception:
+        raise RuntimeError('Breakout mode "{}" validation failed!'.format(bmode))
+
+    entries = []
+    for group in groups_list:
+        if len(group) != BRKOUT_PATTERN_GROUPS:
+            raise RuntimeError("Unsupported breakout mode format!")
+
+        num_ports, default_speed, supported_speed, _, num_assigned_lanes, _ = group
+        if not num_assigned_lanes:
+            num_assigned_lanes = num_lanes
+
+        entries.append(BreakoutCfg.BreakoutModeEntry(num_ports, default_speed, supported_speed, num_assigned_lanes))
+    _breakout_entries[key] = entries
+    return entries
+
+def compile_breakout_table(port_dict):
+    """
+    Return the child ports of every interface of platform.json in each of
+    its supported breakout modes, as {interface: {mode: {'ports': ports}}}.
+    A mode which is not valid for the port maps to
+    {'error': message, 'type': exception type name, 'args': exception args},
+    see breakout_table_error().
+    """
+    table = {}
+    for interface, properties in port_dict[INTF_KEY].items():
+        modes = table[interface] = {}
+        for bmode in properties.get('breakout_modes', {}):
+            try:
+                modes[bmode] = {'ports': BreakoutCfg(interface, bmode, properties).get_config()}
+            except BRKOUT_TABLE_ERRORS as e:
+                modes[bmode] = {
+                    'error': str(e),
+                    'type': type(e).__name__,
+                    'args': [arg if isinstance(arg, (int, float, str)) else str(arg) for arg in e.args]
+                }
+    return table
+
+def breakout_table_error(compiled):
+    """ Return the exception of a mode which failed to compile, of the type
+    the compilation raised
+    """
+    error_types = dict((error_type.__name__, error_type) for error_type in BRKOUT_TABLE_ERRORS)
+    error_type = error_types.get(compiled.get('type'), RuntimeError)
+    return error_type(*compiled.get('args', [compiled['error']]))
+
+def _breakout_table_file(platform_json_file, cache_dir):
+    name = hashlib.sha1(os.path.abspath(platform_json_file).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, name + '.json')
+
+def load_breakout_table(platform_json_file, port_dict, cache_dir=None):
+    """
+    Return the compiled breakout table of platform.json. The table is
+    stored in cache_dir, keyed by the path of platform.json and rebuilt
+    when the file or this module changes.
+    """
+    if cache_dir is None:
+        cache_dir = BRKOUT_TABLE_CACHE_DIR
+    if not cache_dir:
+        return compile_breakout_table(port_dict)
+    version = _file_version(platform_json_file)
+    source = [BRKOUT_TABLE_VERSION, list(_file_version(__file__) or ()),
+              os.path.abspath(platform_json_file)] + list(version or ())
+    table_file = _breakout_table_file(platform_json_file, cache_dir)
+    try:
+        with open(table_file) as fp:
+            if sys.version_info.major == 2:
+                stored = json.load(fp, object_hook=py2JsonStrHook)
+            else:
+                stored = json.load(fp)
+        if version is not None and stored['source'] == source:
+            return stored['interfaces']
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+
+    table = compile_breakout_table(port_dict)
+    if version is None:
+        return table
+
+    # Written to a temporary file first, so concurrent readers never see
+    # partial content
+    tmp_file = '%s.%d' % (table_file, os.getpid())
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        with open(tmp_file, 'w') as fp:
+            json.dump({'source': source, 'interfaces': table}, fp, separators=(',', ':'))
+        os.rename(tmp_file, table_file)
+    except (IOError, OSError):
+        try:
+            os.remove(tmp_file)
+        except (IOError, OSError):
+            pass
+    return table
+
+class PlatformJsonIndex(object):
+    """
+    platform.json parsed once, with the child ports of every interface and
+    breakout mode. Loaded through load_cached(), so all the lookups in a
+    process share one parse of the file.
+
+    The child ports of the modes listed in platform.json come from the
+    compiled breakout table, see load_breakout_table(). Other spellings of
+    a supported mode, e.g. 4x10G[25G] for 4x25G[10G], are computed on first
+    use.
+    """
+
+    def __init__(self, platform_json_file):
+        self.platform_json_file = platform_json_file
+        self.port_dict = readJson(platform_json_file)
+        self._breakout_table = None
+        self._child_ports = {}
+
+    @property
+    def breakout_table(self):
+        if self._breakout_table is None:
+            self._breakout_table = load_breakout_table(self.platform_json_file, self.port_dict)
+        return self._breakout_table
+
+    def get_child_ports(self, interface, breakout_mode):
+        key = (interface, breakout_mode)
+        ports = self._child_ports.get(key)
+        if ports is None:
+            compiled = self.breakout_table.get(interface, {}).get(breakout_mode)
+            if compiled is None:
+                mode_handler = BreakoutCfg(interface, breakout_mode, self.port_dict[INTF_KEY][interface])
+                ports = mode_handler.get_config()
+            elif 'error' in compiled:
+                raise breakout_table_error(compiled)
+            else:
+                ports = compiled['ports']
+            self._child_ports[key] = ports
+        # The callers extend the port entries
+        return dict((name, dict(port)) for name, port in ports.items())
+
+def get_platform_json_index(platform_json_file):
+    return load_cached(platform_json_file, PlatformJsonIndex)
+
 """
 Given a port and breakout mode, this method returns
 the list of child ports using platform_json file
 """
 def get_child_ports(interface, breakout_mode, platform_json_file):
-    port_dict = readJson(platform_json_file)
-
-    mode_handler = BreakoutCfg(interface, breakout_mode, port_dict[INTF_KEY][interface])
-
-    return mode_handler.get_config()
+    return get_platform_json_index(platform_json_file).get_child_ports(interface, breakout_mode)
 
 def parse_platform_json_file(hwsku_json_file, platform_json_file):
     ports = {}
     port_alias_map = {}
     port_alias_asic_map = {}
 
-    port_dict = readJson(platform_json_file)
-    hwsku_dict = readJson(hwsku_json_file)
+    platform_index = get_platform_json_index(platform_json_file)
+    port_dict = platform_index.port_dict
+    hwsku_dict = load_cached(hwsku_json_file, readJson)
 
     if port_dict is None:
         raise Exception("port_dict is none")
@@ -351,7 +525,7 @@ def parse_platform_json_file(hwsku_json_file, platform_json_file):
         # take default_brkout_mode from hwsku.json
         brkout_mode = hwsku_dict[INTF_KEY][intf][BRKOUT_MODE]
 
-        child_ports = get_child_ports(intf, brkout_mode, platform_json_file)
+        child_ports = platform_index.get_child_ports(intf, brkout_mode)
 
         # take optional fields from hwsku.json
         for key, item in hwsku_dict[INTF_KEY][intf].items():
@@ -384,7 +558,7 @@ def get_breakout_mode(hwsku=None, platform=None, port_config_file=None):
 
 def parse_breakout_mode(hwsku_json_file):
     brkout_table = {}
-    hwsku_dict = readJson(hwsku_json_file)
+    hwsku_dict = load_cached(hwsku_json_file, readJson)
     if not hwsku_dict:
         raise Exception("hwsku_dict is empty")
     if INTF_KEY not in  hwsku_dict:
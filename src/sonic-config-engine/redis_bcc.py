@@ -14,16 +14,24 @@ class RedisBytecodeCache(jinja2.BytecodeCache):
         except Exception:
             self._client = None
 
-    def load_bytecode(self, bucket):
+    def get_bytecode(self, key):
         if self._client is None:
-            return
-        code = self._client.get(self._client.LOGLEVEL_DB, self.REDIS_HASH, bucket.key)
-        if code is not None:
-            bucket.bytecode_from_string(b64decode(code.encode()))
+            return None
+        code = self._client.get(self._client.LOGLEVEL_DB, self.REDIS_HASH, key)
+        if code is None:
+            return None
+        return b64decode(code.encode())
 
-    def dump_bytecode(self, bucket):
+    def set_bytecode(self, key, code):
         if self._client is None:
             return
         self._client.set(self._client.LOGLEVEL_DB, self.REDIS_HASH,
-                         bucket.key, b64encode(bucket.bytecode_to_string()).decode())
+                         key, b64encode(code).decode())
 
+    def load_bytecode(self, bucket):
+        code = self.get_bytecode(bucket.key)
+        if code is not None:
+            bucket.bytecode_from_string(code)
+
+    def dump_bytecode(self, bucket):
+        self.set_bytecode(bucket.key, bucket.bytecode_to_string())
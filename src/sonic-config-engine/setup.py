@@ -40,6 +40,8 @@ else:
 # Common modules for python2 and python3
 py_modules = [
     'config_samples',
+    'ip_filters',
+    'layered_bcc',
     'minigraph',
     'openconfig_acl',
     'portconfig',
@@ -61,6 +63,7 @@ setup(
     py_modules = py_modules,
     scripts = [
         'sonic-cfggen',
+        'sonic-cfggen-client',
     ],
     install_requires = dependencies,
     data_files = [
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the sonic-cfggen data layer: deep_update() merges
+and FormatConverter key serialization, on a synthetic CONFIG_DB.
+
+Usage:
+    python3 tests/benchmark_cfggen_data.py [--keys 100000] [--script path/to/sonic-cfggen]
+"""
+
+import argparse
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import time
+
+MODULES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+
+
+def load_cfggen(script):
+    sys.path.insert(0, MODULES_PATH)
+    loader = importlib.machinery.SourceFileLoader('sonic_cfggen', script)
+    spec = importlib.util.spec_from_loader('sonic_cfggen', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+def generate_config(num_keys):
+    """ Return a deserialized CONFIG_DB with about num_keys entries, shaped
+    like large ACL_RULE, ROUTE and INTERFACE tables
+    """
+    data = {'DEVICE_METADATA': {'localhost': {'hostname': 'switch', 'hwsku': 'hwsku'}}}
+    tables = ['ACL_RULE', 'STATIC_ROUTE', 'INTERFACE', 'PORT']
+    for index in range(num_keys):
+        table = tables[index % len(tables)]
+        if table == 'PORT':
+            key = 'Ethernet%d' % index
+        elif table == 'INTERFACE':
+            key = ('Ethernet%d' % index, '10.%d.%d.%d/31' % (index >> 16 & 255, index >> 8 & 255, index & 255))
+        else:
+            key = ('TABLE%d' % (index % 64), 'RULE_%d' % index)
+        data.setdefault(table, {})[key] = {
+            'PRIORITY': str(index % 10000),
+            'PACKET_ACTION': 'FORWARD',
+            'SRC_IP': '10.0.0.%d/32' % (index % 256),
+        }
+    return data
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        args = func.setup() if hasattr(func, 'setup') else ()
+        start = time.time()
+        func(*args)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--script', default=os.path.join(MODULES_PATH, 'sonic-cfggen'))
+    args = parser.parse_args()
+
+    cfggen = load_cfggen(args.script)
+    data = generate_config(args.keys)
+    serialized = cfggen.FormatConverter.to_serialized(copy.deepcopy(data))
+
+    def merge_into_empty(src):
+        cfggen.deep_update({}, src)
+    merge_into_empty.setup = lambda: (data,)
+
+    def merge_into_existing(dst):
+        cfggen.deep_update(dst, data)
+    merge_into_existing.setup = lambda: (copy.deepcopy(data),)
+
+    def serialize(src):
+        cfggen.FormatConverter.to_serialized(src)
+    serialize.setup = lambda: (copy.deepcopy(data),)
+
+    def deserialize(src):
+        cfggen.FormatConverter.to_deserialized(src)
+    deserialize.setup = lambda: (copy.deepcopy(serialized),)
+
+    print('Synthetic CONFIG_DB: %d keys' % args.keys)
+    for name, func in [('deep_update into empty', merge_into_empty),
+                       ('deep_update into existing', merge_into_existing),
+                       ('to_serialized', serialize),
+                       ('to_deserialized', deserialize)]:
+        seconds = measure(func, args.repeat)
+        print('%-26s %8.3f s %12.0f keys/s' % (name, seconds, args.keys / seconds))
+
+
+if __name__ == '__main__':
+    main()
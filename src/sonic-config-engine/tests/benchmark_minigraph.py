@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Memory and runtime benchmark of minigraph parsing on a synthetic multi-ASIC
+minigraph, comparing the streaming section reader with the minigraph.py of
+a baseline git revision, e.g. one before the streaming reader was added,
+which keeps the whole DOM resident.
+
+The benchmark fails if the memory growth of the streaming parse is more
+than --max-growth-ratio times the one of the baseline.
+
+Usage:
+    python3 tests/benchmark_minigraph.py REV [--ports 512] [--asics 8] [--header-first]
+        [--max-growth-ratio 0.75] [--profile]
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+
+HOSTNAME = 'synthetic-lc01'
+HWSKU = 'synthetic-hwsku'
+XMLNS = ('xmlns="Microsoft.Search.Autopilot.Evolution" '
+         'xmlns:i="http://www.w3.org/2001/XMLSchema-instance"')
+XMLNS_A = 'xmlns:a="http://schemas.datacontract.org/2004/07/Microsoft.Search.Autopilot.Evolution"'
+XMLNS_B = 'xmlns:b="Microsoft.Search.Autopilot.NetMux"'
+
+
+def port_name(port):
+    return 'Ethernet%d' % (port * 4)
+
+
+def port_alias(port):
+    return 'Ethernet1/%d' % (port + 1)
+
+
+def asic_port_name(port, ports_per_asic):
+    return 'Eth%d-ASIC%d' % (port % ports_per_asic, port // ports_per_asic)
+
+
+def neighbor_name(port):
+    return 'ARISTA%04dT3' % port
+
+
+def peer_addrs(port):
+    v4 = '10.%d.%d.%d' % (port // 32768, (port // 128) % 256, (port % 128) * 2)
+    v4_peer = v4[:v4.rfind('.') + 1] + str((port % 128) * 2 + 1)
+    return v4, v4_peer, 'FC00::%x' % (port * 4 + 1), 'FC00::%x' % (port * 4 + 2)
+
+
+def device_xml(name, d_type, hwsku, lo_addr):
+    return ('<Device i:type="%s"><ElementType>%s</ElementType>'
+            '<Address %s><b:IPPrefix>%s</b:IPPrefix></Address>'
+            '<ManagementAddress %s><b:IPPrefix>0.0.0.0/0</b:IPPrefix></ManagementAddress>'
+            '<Hostname>%s</Hostname><HwSku>%s</HwSku></Device>'
+            % (d_type, d_type, XMLNS_B, lo_addr, XMLNS_B, name, hwsku))
+
+
+def property_xml(name, value):
+    return ('<a:DeviceProperty><a:Name>%s</a:Name><a:Reference i:nil="true"/>'
+            '<a:Value>%s</a:Value></a:DeviceProperty>' % (name, value))
+
+
+def loopback_xml(attach_to, prefix):
+    return ('<a:LoopbackIPInterface><Name>HostIP</Name><AttachTo>%s</AttachTo>'
+            '<a:Prefix %s><b:IPPrefix>%s</b:IPPrefix></a:Prefix><a:PrefixStr>%s</a:PrefixStr>'
+            '</a:LoopbackIPInterface>' % (attach_to, XMLNS_B, prefix, prefix))
+
+
+def dpg_xml(out, hostname, ports, alias, with_host_intfs):
+    out.write('<DeviceDataPlaneInfo><IPSecTunnels/>')
+    out.write('<LoopbackIPInterfaces %s>' % XMLNS_A)
+    out.write(loopback_xml('Loopback0', '10.1.0.%d/32' % (len(hostname) % 250)))
+    out.write('</LoopbackIPInterfaces>')
+    out.write('<ManagementIPInterfaces %s>' % XMLNS_A)
+    if with_host_intfs:
+        out.write('<a:ManagementIPInterface><Name>HostIP</Name><AttachTo>eth0</AttachTo>'
+                  '<a:Prefix %s><b:IPPrefix>10.3.147.150/23</b:IPPrefix></a:Prefix>'
+                  '<a:PrefixStr>10.3.147.150/23</a:PrefixStr></a:ManagementIPInterface>' % XMLNS_B)
+    out.write('</ManagementIPInterfaces>')
+    out.write('<Hostname>%s</Hostname>' % hostname)
+    out.write('<PortChannelInterfaces/><VlanInterfaces/><IPInterfaces>')
+    for port in ports:
+        v4, _, v6, _ = peer_addrs(port)
+        for prefix in (v4 + '/31', v6 + '/126'):
+            out.write('<IPInterface><Name i:nil="true"/><AttachTo>%s</AttachTo><Prefix>%s</Prefix></IPInterface>'
+                      % (alias(port), prefix))
+    out.write('</IPInterfaces><DataAcls/><AclInterfaces>')
+    if with_host_intfs:
+        out.write('<AclInterface><InAcl>SNMP_ACL</InAcl><AttachTo>SNMP</AttachTo><Type>SNMP</Type></AclInterface>')
+        out.write('<AclInterface><AttachTo>ERSPAN</AttachTo><InAcl>Everflow</InAcl><Type>Everflow</Type></AclInterface>')
+        out.write('<AclInterface><AttachTo>%s</AttachTo><InAcl>DataAcl</InAcl><Type>DataPlane</Type></AclInterface>'
+                  % ';'.join(alias(port) for port in ports))
+    out.write('</AclInterfaces></DeviceDataPlaneInfo>')
+
+
+def metadata_xml(out, num_asics):
+    out.write('<MetadataDeclaration><Devices %s>' % XMLNS_A)
+    out.write('<a:DeviceMetadata><a:Name>%s</a:Name><a:Properties>%s%s</a:Properties></a:DeviceMetadata>'
+              % (HOSTNAME, property_xml('DeploymentId', '1'), property_xml('NtpResources', '10.0.0.1;10.0.0.2')))
+    for asic in range(num_asics):
+        out.write('<a:DeviceMetadata><a:Name>ASIC%d</a:Name><a:Properties>%s</a:Properties></a:DeviceMetadata>'
+                  % (asic, property_xml('SubRole', 'FrontEnd')))
+    out.write('</Devices><Properties %s/></MetadataDeclaration>' % XMLNS_A)
+
+
+def generate_minigraph(path, num_ports, num_asics, header_first=False):
+    """ Write a synthetic multi-ASIC minigraph and its port config files.
+    The hostname, the hwsku and the metadata are at the end of the minigraph,
+    as in real ones, unless header_first is set.
+    """
+    ports_per_asic = num_ports // num_asics
+    asic_alias = lambda port: asic_port_name(port, ports_per_asic)
+    with open(path, 'w') as out:
+        out.write('<DeviceMiniGraph %s>' % XMLNS)
+        if header_first:
+            out.write('<Hostname>%s</Hostname><HwSku>%s</HwSku>' % (HOSTNAME, HWSKU))
+            metadata_xml(out, num_asics)
+
+        out.write('<CpgDec><PeeringSessions>')
+        for port in range(num_ports):
+            v4, v4_peer, v6, v6_peer = peer_addrs(port)
+            for router in (HOSTNAME, 'ASIC%d' % (port // ports_per_asic)):
+                for local, peer in ((v4, v4_peer), (v6, v6_peer)):
+                    out.write('<BGPSession><StartRouter>%s</StartRouter><StartPeer>%s</StartPeer>'
+                              '<EndRouter>%s</EndRouter><EndPeer>%s</EndPeer><Multihop>1</Multihop>'
+                              '<HoldTime>10</HoldTime><KeepAliveTime>3</KeepAliveTime></BGPSession>'
+                              % (router, local, neighbor_name(port), peer))
+        out.write('</PeeringSessions><Routers %s>' % XMLNS_A)
+        for name, asn in [(HOSTNAME, 65100)] + [('ASIC%d' % asic, 65100) for asic in range(num_asics)]:
+            out.write('<a:BGPRouterDeclaration><a:ASN>%d</a:ASN><a:Hostname>%s</a:Hostname>'
+                      '<a:Peers/><a:RouteMaps/></a:BGPRouterDeclaration>' % (asn, name))
+        for port in range(num_ports):
+            out.write('<a:BGPRouterDeclaration><a:ASN>%d</a:ASN><a:Hostname>%s</a:Hostname>'
+                      '<a:RouteMaps/></a:BGPRouterDeclaration>' % (64600 + port, neighbor_name(port)))
+        out.write('</Routers></CpgDec>')
+
+        out.write('<DpgDec>')
+        dpg_xml(out, HOSTNAME, range(num_ports), port_alias, True)
+        for asic in range(num_asics):
+            dpg_xml(out, 'ASIC%d' % asic, range(asic * ports_per_asic, (asic + 1) * ports_per_asic), asic_alias, False)
+        out.write('</DpgDec>')
+
+        out.write('<PngDec><DeviceInterfaceLinks>')
+        for port in range(num_ports):
+            out.write('<DeviceLinkBase><ElementType>DeviceInterfaceLink</ElementType><Bandwidth>100000</Bandwidth>'
+                      '<ChassisInternal>false</ChassisInternal><EndDevice>%s</EndDevice><EndPort>Ethernet1</EndPort>'
+                      '<StartDevice>%s</StartDevice><StartPort>%s</StartPort></DeviceLinkBase>'
+                      % (neighbor_name(port), HOSTNAME, port_alias(port)))
+        out.write('</DeviceInterfaceLinks><Devices>')
+        out.write(device_xml(HOSTNAME, 'SpineRouter', HWSKU, '10.1.0.32/32'))
+        for asic in range(num_asics):
+            out.write(device_xml('ASIC%d' % asic, 'Asic', HWSKU, '10.1.1.%d/32' % asic))
+        for port in range(num_ports):
+            out.write(device_xml(neighbor_name(port), 'CoreRouter', 'Arista-VM', '10.2.%d.%d/32' % (port // 256, port % 256)))
+        out.write('</Devices></PngDec>')
+
+        out.write('<DeviceInfos><DeviceInfo><EthernetInterfaces %s>' % XMLNS_A)
+        for port in range(num_ports):
+            out.write('<a:EthernetInterface><ElementType>DeviceInterface</ElementType><Index>1</Index>'
+                      '<InterfaceName>%s</InterfaceName><PortName>0</PortName><Speed>100000</Speed>'
+                      '</a:EthernetInterface>' % port_alias(port))
+        out.write('</EthernetInterfaces><HwSku>%s</HwSku><ManagementInterfaces %s/></DeviceInfo></DeviceInfos>'
+                  % (HWSKU, XMLNS_A))
+
+        if not header_first:
+            metadata_xml(out, num_asics)
+
+        out.write('<LinkMetadataDeclaration><Link %s>' % XMLNS_A)
+        for port in range(num_ports):
+            out.write('<a:LinkMetadata><a:Name i:nil="true"/><a:Properties>%s</a:Properties>'
+                      '<a:Key>%s:%s;%s:Ethernet1</a:Key></a:LinkMetadata>'
+                      % (property_xml('AutoNegotiation', 'True'), HOSTNAME, port_alias(port), neighbor_name(port)))
+        out.write('</Link></LinkMetadataDeclaration>')
+
+        if not header_first:
+            out.write('<Hostname>%s</Hostname><HwSku>%s</HwSku>' % (HOSTNAME, HWSKU))
+        out.write('</DeviceMiniGraph>')
+
+    port_configs = {}
+    for asic in [None] + list(range(num_asics)):
+        ports = range(num_ports) if asic is None else range(asic * ports_per_asic, (asic + 1) * ports_per_asic)
+        port_config = '%s.%s.ini' % (path, 'host' if asic is None else 'asic%d' % asic)
+        with open(port_config, 'w') as out:
+            out.write('# name lanes alias index asic_port_name role\n')
+            for port in ports:
+                out.write('%s %s %s %d %s Ext\n' % (port_name(port), ','.join(str(port * 4 + lane) for lane in range(4)),
+                                                  port_alias(port), port, asic_alias(port)))
+        port_configs[asic] = port_config
+    return port_configs
+
+
+def export_baseline(revision, path):
+    """ Write the minigraph.py of a git revision into the directory path """
+    source = subprocess.check_output(['git', 'show', '%s:./minigraph.py' % revision], cwd=MODULES_PATH)
+    with open(os.path.join(path, 'minigraph.py'), 'wb') as out:
+        out.write(source)
+
+
+def run_parse(module_path, minigraph_file, port_configs):
+    """ Parse the minigraph for the host and every asic, in this process, with
+    the minigraph module found in module_path
+    """
+    sys.path.insert(0, MODULES_PATH)
+    sys.path.insert(0, module_path)
+    import minigraph
+
+    # Measure the parse itself, not the snapshot cache of later revisions
+    minigraph.get_parse_cache_file = lambda *args: None
+
+    base_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    for asic, port_config in sorted(port_configs.items(), key=lambda item: -1 if item[0] is None else item[0]):
+        asic_name = None if asic is None else 'asic%d' % asic
+        minigraph.port_alias_map.clear()
+        minigraph.port_alias_asic_map.clear()
+        minigraph.parse_xml(minigraph_file, port_config_file=port_config, asic_name=asic_name)
+    return {
+        'seconds': time.time() - start,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'rss_growth_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss_kb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', nargs='?', help='git revision of the baseline minigraph.py')
+    parser.add_argument('--ports', type=int, default=512)
+    parser.add_argument('--asics', type=int, default=8)
+    parser.add_argument('--header-first', action='store_true',
+                        help='write the hostname, hwsku and metadata before the other sections')
+    parser.add_argument('--max-growth-ratio', type=float, default=0.75,
+                        help='largest memory growth of the streaming parse allowed, relative to the baseline')
+    parser.add_argument('--profile', action='store_true',
+                        help='print the functions taking the most time in the streaming parse')
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--minigraph', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        port_configs = json.loads(os.environ['BENCHMARK_PORT_CONFIGS'])
+        port_configs = dict((None if k == 'null' else int(k), v) for k, v in port_configs.items())
+        if args.profile:
+            profile = cProfile.Profile()
+            result = profile.runcall(run_parse, args.run, args.minigraph, port_configs)
+            pstats.Stats(profile, stream=sys.stderr).sort_stats('tottime').print_stats(15)
+        else:
+            result = run_parse(args.run, args.minigraph, port_configs)
+        print(json.dumps(result))
+        return
+
+    if args.baseline is None:
+        parser.error('the baseline revision is required')
+
+    tmp_dir = tempfile.mkdtemp()
+    growth = {}
+    try:
+        baseline_path = os.path.join(tmp_dir, 'baseline')
+        os.mkdir(baseline_path)
+        export_baseline(args.baseline, baseline_path)
+        minigraph_file = os.path.join(tmp_dir, 'minigraph.xml')
+        port_configs = generate_minigraph(minigraph_file, args.ports, args.asics, args.header_first)
+        print('Synthetic minigraph: %d ports, %d asics, %.1f MB, header %s, baseline %s' %
+              (args.ports, args.asics, os.path.getsize(minigraph_file) / 1e6,
+               'first' if args.header_first else 'last', args.baseline))
+        env = dict(os.environ, BENCHMARK_PORT_CONFIGS=json.dumps(
+            dict(('null' if k is None else str(k), v) for k, v in port_configs.items())))
+        for mode, module_path in [('dom', baseline_path), ('stream', MODULES_PATH)]:
+            output = subprocess.check_output([sys.executable, os.path.realpath(__file__),
+                                              '--run', module_path, '--minigraph', minigraph_file],
+                                             env=env, stderr=subprocess.DEVNULL)
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            print('%-6s %8.2f s %10.1f MB max RSS %10.1f MB growth while parsing' %
+                  (mode, result['seconds'], result['max_rss_kb'] / 1024.0, result['rss_growth_kb'] / 1024.0))
+            growth[mode] = result['rss_growth_kb']
+        if args.profile:
+            subprocess.check_call([sys.executable, os.path.realpath(__file__), '--run', MODULES_PATH, '--profile',
+                                   '--minigraph', minigraph_file], env=env, stdout=subprocess.DEVNULL)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    assert growth['stream'] <= args.max_growth_ratio * growth['dom'], \
+        'streaming parse grew %.1f MB, more than %.2f times the %.1f MB of the baseline' % \
+        (growth['stream'] / 1024.0, args.max_growth_ratio, growth['dom'] / 1024.0)
+
+
+if __name__ == '__main__':
+    main()
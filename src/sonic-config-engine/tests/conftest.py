@@ -0,0 +1,15 @@
+import os
+import shutil
+import tempfile
+
+# Keep the minigraph parse snapshots, template bytecode and breakout tables of
+# the whole suite, including the sonic-cfggen subprocesses, out of the host's
+# /var/cache
+_cache_dir = tempfile.mkdtemp()
+os.environ['SONIC_CFGGEN_MINIGRAPH_CACHE_DIR'] = os.path.join(_cache_dir, 'minigraph')
+os.environ['SONIC_CFGGEN_JINJA2_CACHE_DIR'] = os.path.join(_cache_dir, 'jinja2')
+os.environ['SONIC_CFGGEN_PORTCONFIG_CACHE_DIR'] = os.path.join(_cache_dir, 'portconfig')
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_cache_dir, ignore_errors=True)
@@ -1,6 +1,7 @@
 import json
 import subprocess
 import os
+import yaml
 
 import tests.common_utils as utils
 
@@ -122,6 +123,13 @@ class TestCfgGen(TestCase):
         output = self.run_script(argument)
         self.assertTrue(len(output.strip()) > 0)
 
+    def test_print_data_compact(self):
+        argument = '-m "' + self.sample_graph + '" -p "' + self.port_config + '" --print-data'
+        output = self.run_script(argument)
+        compact_output = self.run_script(argument + ' --compact')
+        self.assertEqual(compact_output.strip().count('\n'), 0)
+        self.assertEqual(json.loads(compact_output), json.loads(output))
+
     def test_jinja_expression(self, graph=None, port_config=None, expected_router_type='LeafRouter'):
         if graph is None:
             graph = self.sample_graph
@@ -136,6 +144,18 @@ class TestCfgGen(TestCase):
         output = self.run_script(argument)
         self.assertEqual(output.strip(), 'value1')
 
+    def test_additional_json_data_var_lookup(self):
+        data = '-a \'{"k1":{"k11":{"k111":"v111"},"k12":["v121","v122"]}}\' '
+        self.assertEqual(self.run_script(data + '-v "k1.k11.k111"').strip(), 'v111')
+        self.assertEqual(self.run_script(data + '-v "k1[\'k11\'][\'k111\']"').strip(), 'v111')
+        self.assertEqual(self.run_script(data + '-v "k1.k11"').strip(), "{'k111': 'v111'}")
+        self.assertEqual(self.run_script(data + '-v "k1.k12"').strip(), "['v121', 'v122']")
+        self.assertEqual(self.run_script(data + '-v "k1.k11.k112"').strip(), '')
+        # Expressions which are not a lookup are rendered by jinja2
+        self.assertEqual(self.run_script(data + '-v "k1.k11.k111|upper"').strip(), 'V111')
+        self.assertEqual(self.run_script(data + '-v "k1.k12|length"').strip(), '2')
+        self.assertEqual(self.run_script(data + '-v "k1.keys()|list|first"').strip(), 'k11')
+
     def test_additional_json_data_level1_key(self):
         argument = '-a \'{"k1":{"k11":"v11","k12":"v12"}, "k2":{"k22":"v22"}}\' --var-json k1'
         output = self.run_script(argument)
@@ -184,6 +204,11 @@ class TestCfgGen(TestCase):
         output = self.run_script(argument)
         self.assertEqual(output.strip(), 'value1\nvalue2')
 
+    def test_cache_stats(self):
+        argument = '-y ' + os.path.join(self.test_dir, 'test.yml') + ' -t ' + os.path.join(self.test_dir, 'test.j2') + ' --cache-stats'
+        output = self.run_script(argument, check_stderr=True)
+        self.assertRegex(output, r'Template bytecode cache: \d+ memory hits, \d+ disk hits, \d+ redis hits, \d+ misses')
+
     def test_template_batch_mode(self):
         argument = '-y ' + os.path.join(self.test_dir, 'test.yml')
         argument += ' -a \'{"key1":"value"}\''
@@ -208,6 +233,27 @@ class TestCfgGen(TestCase):
         for key, value in data.items():
             self.assertEqual(output_data[key.replace("key", "jk")], value)
 
+    def test_render_manifest(self):
+        manifest_file = os.path.join(self.test_dir, 'manifest.yaml')
+        with open(manifest_file, 'w') as f:
+            yaml.dump([
+                {'template': os.path.join(self.test_dir, 'sample-template-1.json.j2'), 'dest': 'config-db'},
+                {'template': os.path.join(self.test_dir, 'test.j2'), 'dest': self.output_file},
+                {'template': os.path.join(self.test_dir, 'test2.j2'), 'dest': self.output2_file},
+            ], f)
+        try:
+            argument = '-y ' + os.path.join(self.test_dir, 'test.yml')
+            argument += ' -a \'{"key1":"value", "key1_1":"value1_1"}\''
+            argument += ' --render-manifest ' + manifest_file + ' --print-data'
+            output = json.loads(self.run_script(argument))
+        finally:
+            os.remove(manifest_file)
+        self.assertEqual(output['jk1_1'], 'value1_1')
+        with open(self.output_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value1\nvalue2')
+        with open(self.output2_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value')
+
     # FIXME: This test depends heavily on the ordering of the interfaces and
     # it is not at all intuitive what that ordering should be. Could make it
     # more robust by adding better parsing logic.
@@ -0,0 +1,254 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+import jinja2
+
+from tests.benchmark_cfggen_data import load_cfggen
+from unittest import TestCase, mock
+
+SCRIPT_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'sonic-cfggen')
+
+CONFIG_DB = {
+    'DEVICE_METADATA': {'localhost': {'hostname': 'switch', 'hwsku': 'hwsku'}},
+    'PORT': {
+        'Ethernet0': {'speed': '100000', 'lanes': '0,1,2,3'},
+        'Ethernet4': {'speed': '40000', 'lanes': '4,5,6,7'},
+    },
+    'VLAN_MEMBER': {
+        ('Vlan1000', 'Ethernet4'): {'tagging_mode': 'untagged'},
+    },
+}
+
+
+class FakeConfigDB(object):
+    """ ConfigDBPipeConnector over CONFIG_DB, which records the reads """
+
+    def __init__(self, reads, **kwargs):
+        self.reads = reads
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    def get_config(self):
+        self.reads.append(('get_config',))
+        return dict((table, dict(entries)) for table, entries in CONFIG_DB.items())
+
+    def get_table(self, table):
+        self.reads.append(('get_table', table))
+        return dict(CONFIG_DB.get(table, {}))
+
+    def get_entry(self, table, key):
+        self.reads.append(('get_entry', table, key))
+        return dict(CONFIG_DB.get(table, {}).get(key, {}))
+
+    def mod_config(self, data):
+        self.reads.append(('mod_config', data))
+
+
+class TestCfgGenDbRead(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cfggen = load_cfggen(SCRIPT_FILE)
+
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.template_dir)
+
+    def write_template(self, name, content):
+        with open(os.path.join(self.template_dir, name), 'w') as template:
+            template.write(content)
+        return os.path.join(self.template_dir, name)
+
+    def get_env(self):
+        return jinja2.Environment(loader=jinja2.FileSystemLoader(self.template_dir))
+
+    def get_args(self, **kwargs):
+        args = dict(tables=None, print_data=False, write_to_db=False, preset=None,
+                    var_json=None, var=None, template=[])
+        args.update(kwargs)
+        return argparse.Namespace(**args)
+
+    def run_cfggen(self, argv):
+        reads = []
+        output = io.StringIO()
+        with mock.patch.object(self.cfggen, 'ConfigDBPipeConnector', lambda **kwargs: FakeConfigDB(reads, **kwargs)), \
+                contextlib.redirect_stdout(output):
+            self.cfggen.main(argv)
+        return output.getvalue(), reads
+
+    def test_find_template_variables(self):
+        self.write_template('macros.j2', '{% macro speed(name) %}{{ PORT[name].speed }}{% endmacro %}')
+        self.write_template('vlan.j2', '{% for member in VLAN_MEMBER %}{{ member }}{% endfor %}')
+        self.write_template('main.j2', '{% import "macros.j2" as macros %}{% include "vlan.j2" %}'
+                                       '{{ DEVICE_METADATA.localhost.hostname }}{% set local = 1 %}{{ local }}')
+        variables = self.cfggen.find_template_variables(self.get_env(), ['main.j2'])
+        self.assertEqual(variables, set(['PORT', 'VLAN_MEMBER', 'DEVICE_METADATA']))
+
+        variables = self.cfggen.find_template_variables(jinja2.Environment(), [], ['{{ PORT.Ethernet0.speed }}'])
+        self.assertEqual(variables, set(['PORT']))
+
+    def test_find_template_variables_dynamic_include(self):
+        self.write_template('main.j2', '{% include DEVICE_METADATA.localhost.hwsku + ".j2" %}')
+        self.assertIsNone(self.cfggen.find_template_variables(self.get_env(), ['main.j2']))
+
+    def test_get_required_tables(self):
+        template = self.write_template('main.j2', '{% include "ports.j2" %}{{ hostname }}{{ LOOPBACK_INTERFACE }}')
+        self.write_template('ports.j2', '{{ PORT }}')
+        args = self.get_args(template=[(template, None)])
+        self.assertEqual(self.cfggen.get_required_tables(args, self.get_env(), []), ['LOOPBACK_INTERFACE', 'PORT'])
+        # Templates of a render manifest are analysed the same way
+        args = self.get_args()
+        self.assertEqual(self.cfggen.get_required_tables(args, self.get_env(), [(template, None)]), ['LOOPBACK_INTERFACE', 'PORT'])
+
+        args = self.get_args(var='PORT | length > VLAN | length')
+        self.assertEqual(self.cfggen.get_required_tables(args, None, []), ['PORT', 'VLAN'])
+        args = self.get_args(var='PORT.Ethernet0.speed')
+        self.assertEqual(self.cfggen.get_required_tables(args, None, [], ['PORT', 'Ethernet0', 'speed']), ['PORT'])
+        self.assertEqual(self.cfggen.get_required_tables(args, None, [], ['hostname']), [])
+
+        args = self.get_args(var_json='VLAN')
+        self.assertEqual(self.cfggen.get_required_tables(args, None, []), ['VLAN'])
+        args = self.get_args(tables=['PORT', 'VLAN'], var='DEVICE_METADATA')
+        self.assertEqual(self.cfggen.get_required_tables(args, None, []), ['PORT', 'VLAN'])
+
+    def test_get_required_tables_all(self):
+        for kwargs in [dict(print_data=True), dict(write_to_db=True), dict(preset='t1')]:
+            self.assertIsNone(self.cfggen.get_required_tables(self.get_args(**kwargs), None, []))
+
+        template = self.write_template('dynamic.j2', '{% include name %}')
+        args = self.get_args(template=[(template, None)])
+        self.assertIsNone(self.cfggen.get_required_tables(args, self.get_env(), []))
+
+        # The rendering reports the syntax error
+        template = self.write_template('broken.j2', '{% for port in PORT %}')
+        args = self.get_args(template=[(template, None)])
+        self.assertIsNone(self.cfggen.get_required_tables(args, self.get_env(), []))
+        args = self.get_args(var='PORT[')
+        self.assertIsNone(self.cfggen.get_required_tables(args, None, []))
+
+    def test_get_config_entry(self):
+        reads = []
+        configdb = FakeConfigDB(reads)
+        self.assertEqual(self.cfggen.get_config_entry(configdb, 'PORT', 'Ethernet0'),
+                         {'PORT': {'Ethernet0': CONFIG_DB['PORT']['Ethernet0']}})
+        self.assertEqual(reads, [('get_entry', 'PORT', 'Ethernet0')])
+
+        # A missing entry reads the table, for the lookup to fail as before
+        del reads[:]
+        self.assertEqual(self.cfggen.get_config_entry(configdb, 'PORT', 'Ethernet8'), {'PORT': CONFIG_DB['PORT']})
+        self.assertEqual(reads, [('get_entry', 'PORT', 'Ethernet8'), ('get_table', 'PORT')])
+        self.assertEqual(self.cfggen.get_config_entry(configdb, 'VLAN', 'Vlan1000'), {})
+
+    def test_from_db_var_entry(self):
+        output, reads = self.run_cfggen(['-d', '-v', 'PORT.Ethernet0.speed'])
+        self.assertEqual(output.strip(), '100000')
+        self.assertEqual(reads, [('get_entry', 'PORT', 'Ethernet0')])
+
+        output, reads = self.run_cfggen(['-d', '-v', "PORT['Ethernet8']"])
+        self.assertEqual(output.strip(), '')
+        self.assertEqual(reads, [('get_entry', 'PORT', 'Ethernet8'), ('get_table', 'PORT')])
+
+        output, reads = self.run_cfggen(['-d', '-v', 'PORT'])
+        self.assertEqual(reads, [('get_table', 'PORT')])
+
+    def test_from_db_var_json_key(self):
+        output, reads = self.run_cfggen(['-d', '--var-json', 'PORT', '-K', 'Ethernet4'])
+        self.assertIn('"40000"', output)
+        self.assertEqual(reads, [('get_entry', 'PORT', 'Ethernet4')])
+
+        # -K matches a part of the keys with several parts
+        output, reads = self.run_cfggen(['-d', '--var-json', 'VLAN_MEMBER', '-K', 'Vlan1000'])
+        self.assertIn('"Vlan1000|Ethernet4"', output)
+        self.assertEqual(reads, [('get_entry', 'VLAN_MEMBER', 'Vlan1000'), ('get_table', 'VLAN_MEMBER')])
+
+    def test_from_db_tables(self):
+        output, reads = self.run_cfggen(['-d', '--tables', 'PORT,DEVICE_METADATA', '-v', 'PORT.Ethernet0.speed'])
+        self.assertEqual(output.strip(), '100000')
+        self.assertEqual(reads, [('get_table', 'PORT'), ('get_table', 'DEVICE_METADATA')])
+
+    def test_from_db_all(self):
+        output, reads = self.run_cfggen(['-d', '--print-data'])
+        self.assertIn('"Vlan1000|Ethernet4"', output)
+        self.assertEqual(reads, [('get_config',)])
+
+
+class TestCfgGenDbDelta(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cfggen = load_cfggen(SCRIPT_FILE)
+
+    def get_delta(self, data):
+        return self.cfggen.get_config_delta(CONFIG_DB, data)
+
+    def test_entries(self):
+        delta, stats = self.get_delta({'PORT': {
+            'Ethernet0': {'speed': '100000', 'lanes': '0,1,2,3'},
+            'Ethernet4': {'speed': '100000', 'lanes': '4,5,6,7', 'mtu': '9100'},
+            'Ethernet8': {'speed': '40000'},
+        }})
+        self.assertEqual(delta, {'PORT': {
+            'Ethernet4': {'speed': '100000', 'mtu': '9100'},
+            'Ethernet8': {'speed': '40000'},
+        }})
+        self.assertEqual(stats, {'added': 1, 'modified': 1, 'fields': 3, 'deleted': 0, 'tables_deleted': 0, 'unchanged': 1})
+
+        delta, stats = self.get_delta({'PORT': {'Ethernet0': {'speed': '100000'}}, 'DEVICE_METADATA': {}})
+        self.assertEqual(delta, {})
+        self.assertEqual(stats['unchanged'], 1)
+
+    def test_deletes(self):
+        delta, stats = self.get_delta({'PORT': {'Ethernet0': None, 'Ethernet8': None}, 'VLAN_MEMBER': None, 'VLAN': None})
+        self.assertEqual(delta, {'PORT': {'Ethernet0': None}, 'VLAN_MEMBER': None})
+        self.assertEqual(stats, {'added': 0, 'modified': 0, 'fields': 0, 'deleted': 1, 'tables_deleted': 1, 'unchanged': 0})
+
+        # Deleting an entry of a missing table writes nothing
+        delta, stats = self.get_delta({'VLAN': {'Vlan1000': None}})
+        self.assertEqual(delta, {})
+        self.assertEqual(stats['deleted'], 0)
+
+    def test_list_fields(self):
+        # Lists are stored joined by ',', whichever side they come from
+        delta, stats = self.get_delta({'PORT': {
+            'Ethernet0': {'lanes': ['0', '1', '2', '3']},
+            'Ethernet4': {'lanes': ['4', '5']},
+        }})
+        self.assertEqual(delta, {'PORT': {'Ethernet4': {'lanes': ['4', '5']}}})
+        self.assertEqual(stats['modified'], 1)
+        self.assertEqual(stats['unchanged'], 1)
+
+        current = {'ACL_TABLE': {'DATAACL': {'ports@': ['Ethernet0', 'Ethernet4'], 'stage': 'ingress'}}}
+        delta, _ = self.cfggen.get_config_delta(current, {'ACL_TABLE': {'DATAACL': {'ports@': 'Ethernet0,Ethernet4', 'stage': 1}}})
+        self.assertEqual(delta, {'ACL_TABLE': {'DATAACL': {'stage': 1}}})
+
+    def test_keys(self):
+        delta, stats = self.get_delta({'VLAN_MEMBER': {'Vlan1000|Ethernet4': {'tagging_mode': 'untagged'}}})
+        self.assertEqual(delta, {})
+        self.assertEqual(stats['unchanged'], 1)
+
+        current = {'VLAN_MEMBER': {'Vlan1000|Ethernet4': {'tagging_mode': 'untagged'}}}
+        delta, stats = self.cfggen.get_config_delta(current, {'VLAN_MEMBER': {
+            ('Vlan1000', 'Ethernet4'): {'tagging_mode': 'tagged'},
+            ('Vlan1000', 'Ethernet0'): None,
+        }})
+        self.assertEqual(delta, {'VLAN_MEMBER': {('Vlan1000', 'Ethernet4'): {'tagging_mode': 'tagged'}}})
+        self.assertEqual(stats['modified'], 1)
+        self.assertEqual(stats['deleted'], 0)
+
+    def test_write_to_db_diff(self):
+        reads = []
+        stderr = io.StringIO()
+        data = '{"PORT": {"Ethernet0": {"speed": "100000"}, "Ethernet4": {"speed": "100000"}}}'
+        with mock.patch.object(self.cfggen, 'ConfigDBPipeConnector', lambda **kwargs: FakeConfigDB(reads, **kwargs)), \
+                contextlib.redirect_stderr(stderr):
+            self.cfggen.main(['-a', data, '--write-to-db', '--diff'])
+        self.assertEqual(reads, [('get_config',), ('mod_config', {'PORT': {'Ethernet4': {'speed': '100000'}}})])
+        self.assertEqual(stderr.getvalue(), 'CONFIG_DB delta: 0 entries added, 1 modified, 0 deleted, '
+                                            '0 tables deleted, 1 fields written, 1 entries unchanged\n')
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+
+import tests.common_utils as utils
+
+from unittest import TestCase
+
+# Modules which only some options of sonic-cfggen need, and which are slow to
+# import
+OPTIONAL_MODULES = ['minigraph', 'portconfig', 'lxml', 'natsort', 'config_samples', 'sonic_py_common',
+                    'sonic_yang_cfg_generator', 'sonic_yang', 'yaml', 'jinja2', 'netaddr', 'multiprocessing']
+
+class TestCfgGenImportTime(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.script_file = os.path.join(self.test_dir, '..', 'sonic-cfggen')
+        self.sample_graph = os.path.join(self.test_dir, 'simple-sample-graph.xml')
+        self.data = json.dumps({'DEVICE_METADATA': {'localhost': {'hostname': 'switch-t0', 'hwsku': 'Force10-S6000'}}})
+
+    def import_times(self, args):
+        """ Return the names of the modules imported by the interpreter, and
+        their total import time in us
+        """
+        p = subprocess.Popen([utils.PYTHON_INTERPRETTER, '-X', 'importtime'] + args,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        _, stderr = p.communicate()
+        self.assertEqual(p.returncode, 0, stderr)
+        modules = set()
+        total = 0
+        for line in stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, name = line.split('|')
+            if not cumulative.strip().isdigit():
+                continue
+            modules.add(name.strip())
+            # Nested imports are included in the time of their parent
+            if not name.startswith('  '):
+                total += int(cumulative)
+        return modules, total
+
+    def run_script(self, argument):
+        return self.import_times([self.script_file] + argument)
+
+    def assert_not_imported(self, imported, modules):
+        self.assertEqual(sorted(name for name in imported if name.split('.')[0] in modules), [])
+
+    def test_import_time_budget(self):
+        # A common invocation must cost less than the minigraph import which
+        # sonic-cfggen used to pay whatever the options
+        _, budget = self.import_times(['-c', 'import minigraph'])
+        for argument in [
+            ['-a', self.data, '--print-data'],
+            ['-a', self.data, '--var-json', 'DEVICE_METADATA'],
+            ['-a', self.data, '--var-json', 'DEVICE_METADATA', '-K', 'localhost'],
+            ['-a', self.data, '-v', 'DEVICE_METADATA.localhost.hostname'],
+            ['-a', self.data, '-v', "DEVICE_METADATA['localhost']['hwsku']"],
+        ]:
+            imported, total = self.run_script(argument)
+            self.assert_not_imported(imported, OPTIONAL_MODULES)
+            self.assertLess(total, budget, argument)
+
+    def test_var_expression(self):
+        # Only the expressions which are not a variable lookup need jinja2
+        imported, _ = self.run_script(['-a', self.data, '-v', 'DEVICE_METADATA.localhost.hostname|upper'])
+        self.assertIn('jinja2', imported)
+        self.assert_not_imported(imported, set(OPTIONAL_MODULES) - set(['jinja2']))
+
+    def test_minigraph(self):
+        imported, _ = self.run_script(['-m', self.sample_graph, '-v', 'DEVICE_METADATA.localhost.hostname'])
+        self.assertIn('minigraph', imported)
+        self.assert_not_imported(imported, ['sonic_yang_cfg_generator', 'sonic_yang', 'multiprocessing'])
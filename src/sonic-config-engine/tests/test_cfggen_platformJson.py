@@ -1,13 +1,17 @@
 import ast
 import json
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
 
 import tests.common_utils as utils
 
 from unittest import TestCase
-from portconfig import get_port_config, INTF_KEY
+import portconfig
+
+from portconfig import get_port_config, get_child_ports, load_breakout_table, readJson, BreakoutCfg, INTF_KEY
 
 if sys.version_info.major == 3:
     from unittest import mock
@@ -25,6 +29,7 @@ class TestCfgGenPlatformJson(TestCase):
         self.platform_sample_graph = os.path.join(self.test_dir, 'platform-sample-graph.xml')
         self.platform_json = os.path.join(self.test_dir, 'sample_platform.json')
         self.hwsku_json = os.path.join(self.test_dir, 'sample_hwsku.json')
+        portconfig.clear_cache()
 
     def run_script(self, argument, check_stderr=False):
         print('\n    Running sonic-cfggen ' + argument)
@@ -116,3 +121,73 @@ class TestCfgGenPlatformJson(TestCase):
         (ports, _, _) = get_port_config(port_config_file=self.platform_json)
         self.assertNotEqual(ports, None)
         self.assertEqual(ports, {})
+
+    def test_platform_json_parsed_once(self):
+        with mock.patch('portconfig.readJson', mock.MagicMock(wraps=portconfig.readJson)) as read_json:
+            (ports, _, _) = get_port_config(port_config_file=self.platform_json, hwsku_config_file=self.hwsku_json)
+            self.assertEqual(read_json.call_count, 2)
+            self.assertEqual(get_port_config(port_config_file=self.platform_json, hwsku_config_file=self.hwsku_json)[0], ports)
+            child_ports = get_child_ports('Ethernet0', '4x25G[10G]', self.platform_json)
+            self.assertEqual(read_json.call_count, 2)
+
+        self.assertEqual(sorted(child_ports), ['Ethernet0', 'Ethernet1', 'Ethernet2', 'Ethernet3'])
+        # Modifying the result does not alter the cached child ports
+        child_ports['Ethernet0']['fec'] = 'rs'
+        self.assertNotIn('fec', get_child_ports('Ethernet0', '4x25G[10G]', self.platform_json)['Ethernet0'])
+
+    def test_breakout_table(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            port_dict = readJson(self.platform_json)
+            table = load_breakout_table(self.platform_json, port_dict, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            for intf, properties in port_dict[INTF_KEY].items():
+                for bmode in properties['breakout_modes']:
+                    ports = BreakoutCfg(intf, bmode, properties).get_config()
+                    self.assertEqual(table[intf][bmode], {'ports': ports})
+
+            # The stored table is used as long as platform.json is unchanged
+            with mock.patch('portconfig.compile_breakout_table') as compile_table:
+                self.assertEqual(load_breakout_table(self.platform_json, port_dict, cache_dir), table)
+                self.assertFalse(compile_table.called)
+
+            # A change of portconfig.py rebuilds the table
+            with mock.patch('portconfig.__file__', self.platform_json), \
+                    mock.patch('portconfig.compile_breakout_table', return_value=table) as compile_table:
+                self.assertEqual(load_breakout_table(self.platform_json, port_dict, cache_dir), table)
+                self.assertTrue(compile_table.called)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_breakout_table_errors(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            platform_json = os.path.join(cache_dir, 'platform.json')
+            with open(platform_json, 'w') as f:
+                json.dump({INTF_KEY: {
+                    # Fewer aliases than ports
+                    'Ethernet0': {'lanes': '0,1', 'index': '1,1', 'breakout_modes': {'2x50G': ['Eth1/1']}},
+                    # No index
+                    'Ethernet2': {'lanes': '2,3', 'breakout_modes': {'1x100G': ['Eth2/1']}},
+                }}, f)
+            port_dict = readJson(platform_json)
+            table = load_breakout_table(platform_json, port_dict, os.path.join(cache_dir, 'portconfig'))
+            self.assertEqual(table['Ethernet0']['2x50G']['type'], 'IndexError')
+            self.assertEqual(table['Ethernet2']['1x100G']['type'], 'KeyError')
+
+            # The errors keep their type through the stored table
+            self.assertEqual(load_breakout_table(platform_json, port_dict, os.path.join(cache_dir, 'portconfig')), table)
+            with self.assertRaises(IndexError):
+                get_child_ports('Ethernet0', '2x50G', platform_json)
+            with self.assertRaises(KeyError) as context:
+                get_child_ports('Ethernet2', '1x100G', platform_json)
+            self.assertEqual(context.exception.args, ('index',))
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_breakout_mode_spelling(self):
+        # Another spelling of a supported mode is not in the compiled table
+        child_ports = get_child_ports('Ethernet0', '4x10G[25G]', self.platform_json)
+        self.assertEqual(child_ports['Ethernet1'], {'alias': 'Eth1/2', 'lanes': '1', 'speed': '10000', 'index': '1'})
+        with self.assertRaises(RuntimeError):
+            get_child_ports('Ethernet0', '8x10G', self.platform_json)
@@ -0,0 +1,62 @@
+import os
+import pytest
+import subprocess
+import tempfile
+import time
+
+import tests.common_utils as utils
+
+
+#TODO: Remove this fixuture once SONiC moves to python3.x
+@pytest.fixture(scope="class")
+def is_test_supported():
+    if not utils.PY3x:
+        pytest.skip('module not support in python2')
+    else:
+        pass
+
+
+@pytest.mark.usefixtures("is_test_supported")
+class TestCfgGenServer(object):
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.script_file = os.path.join(self.test_dir, '..', 'sonic-cfggen')
+        self.client_file = os.path.join(self.test_dir, '..', 'sonic-cfggen-client')
+        self.sample_port_data = os.path.join(self.test_dir, 'sample-port-data.json')
+        self.template = os.path.join(self.test_dir, 'sample-template-1.json.j2')
+        self.socket_path = os.path.join(tempfile.mkdtemp(), 'sonic-cfggen.sock')
+        self.env = dict(os.environ, SONIC_CFGGEN_SOCKET=self.socket_path)
+        self.server = subprocess.Popen([utils.PYTHON_INTERPRETTER, self.script_file, '--serve', '--socket', self.socket_path])
+        for _ in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.1)
+        yield
+        self.server.kill()
+        self.server.wait()
+
+    def run_both(self, argv):
+        expected = subprocess.run([utils.PYTHON_INTERPRETTER, self.script_file] + argv,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output = subprocess.run([utils.PYTHON_INTERPRETTER, self.client_file] + argv,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self.env)
+        assert output.returncode == expected.returncode
+        assert output.stdout == expected.stdout
+        return output
+
+    def test_render_template(self):
+        self.run_both(['-j', self.sample_port_data, '-t', self.template])
+
+    def test_var(self):
+        self.run_both(['-a', '{"key1": {"key2": "value"}}', '-v', 'key1.key2'])
+
+    def test_repeated_requests(self):
+        for value in ['value1', 'value2']:
+            output = self.run_both(['-a', '{"key": "%s"}' % value, '-v', 'key'])
+            assert output.stdout.decode().strip() == value
+
+    def test_bad_arguments(self):
+        output = self.run_both(['--no-such-option'])
+        assert output.returncode == 2
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+import ip_filters
+
+from ip_filters import PrefixCache
+from unittest import TestCase
+
+
+class TestIpFilters(TestCase):
+
+    def test_prefix_cache(self):
+        cache = PrefixCache(size=2)
+        self.assertEqual(str(cache.parse('10.0.0.1/31')), '10.0.0.1/31')
+        self.assertIs(cache.parse('10.0.0.1/31'), cache.parse('10.0.0.1/31'))
+        self.assertIsNone(cache.parse('10.0.0.1/33'))
+        self.assertIsNone(cache.parse('10.0.0.1/33'))
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 2, 'size': 2})
+
+        cache.parse('fc00::1/126')
+        self.assertEqual(cache.stats()['size'], 2)
+        # The least recently used entry was evicted
+        cache.parse('10.0.0.1/31')
+        self.assertEqual(cache.stats()['misses'], 4)
+
+    def test_filters(self):
+        self.assertTrue(ip_filters.is_ipv4('10.0.0.1'))
+        self.assertFalse(ip_filters.is_ipv4('fc00::1/64'))
+        self.assertTrue(ip_filters.is_ipv6('fc00::1/64'))
+        self.assertFalse(ip_filters.is_ipv6(None))
+        self.assertFalse(ip_filters.is_ipv4('Ethernet0'))
+        self.assertEqual(ip_filters.prefix_attr('network', '10.0.0.1/24'), '10.0.0.0')
+        self.assertEqual(ip_filters.prefix_attr('prefixlen', 'fc00::1/64'), '64')
+        self.assertIsNone(ip_filters.prefix_attr('ip', 'invalid'))
+        self.assertEqual(str(ip_filters.ip_network('10.0.0.1/24')), '10.0.0.0')
+        self.assertEqual(ip_filters.ip_network('invalid'), 'Invalid ip address invalid')
+
+    def test_pfx_filter(self):
+        table = OrderedDict([
+            ('Ethernet0', {}),
+            (('Ethernet0', '10.0.0.1'), {}),
+            (('Ethernet0', 'fc00::1'), {}),
+            (('Ethernet4', '10.0.0.3/31'), {'scope': 'global'}),
+        ])
+        self.assertEqual(list(ip_filters.pfx_filter(table).items()), [
+            (('Ethernet0', '10.0.0.1/32'), {}),
+            (('Ethernet0', 'fc00::1/128'), {}),
+            (('Ethernet4', '10.0.0.3/31'), {'scope': 'global'}),
+        ])
+
+        table[('Ethernet8', 'invalid')] = {}
+        with self.assertRaises(ValueError):
+            ip_filters.pfx_filter(table)
+        invalid = []
+        self.assertEqual(len(ip_filters.pfx_filter(table, invalid.append)), 3)
+        self.assertEqual(invalid, ['invalid'])
+
+    def test_split_prefixes(self):
+        table = {
+            'PortChannel01': {},
+            ('PortChannel01', '10.0.0.56/31'): {},
+            ('PortChannel01', 'fc00::71/126'): {},
+            ('PortChannel02', '10.0.0.58'): {},
+        }
+        ipv4, ipv6 = ip_filters.split_prefixes(table)
+        self.assertEqual(sorted(ipv4), [('PortChannel01', '10.0.0.56/31'), ('PortChannel02', '10.0.0.58/32')])
+        self.assertEqual(list(ipv6), [('PortChannel01', 'fc00::71/126')])
+        self.assertEqual(ip_filters.split_prefixes(None), (OrderedDict(), OrderedDict()))
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+
+import jinja2
+
+from layered_bcc import LayeredBytecodeCache
+from unittest import TestCase
+
+
+class TestLayeredBytecodeCache(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.template = 'sample-template-1.json.j2'
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def render(self, bcc):
+        env = jinja2.Environment(loader=jinja2.FileSystemLoader(self.test_dir), bytecode_cache=bcc)
+        return env.get_template(self.template).render({})
+
+    def test_tiers(self):
+        bcc = LayeredBytecodeCache(cache_dir=self.cache_dir)
+        output = self.render(bcc)
+        self.assertEqual(bcc.stats(), {'hits': {'memory': 0, 'disk': 0, 'redis': 0}, 'misses': 1})
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        self.assertEqual(self.render(bcc), output)
+        self.assertEqual(bcc.stats(), {'hits': {'memory': 1, 'disk': 0, 'redis': 0}, 'misses': 1})
+
+        # A new process only finds the bytecode on disk
+        bcc = LayeredBytecodeCache(cache_dir=self.cache_dir)
+        self.assertEqual(self.render(bcc), output)
+        self.assertEqual(bcc.stats(), {'hits': {'memory': 0, 'disk': 1, 'redis': 0}, 'misses': 0})
+
+    def test_lru_size(self):
+        bcc = LayeredBytecodeCache(cache_dir=self.cache_dir, lru_size=0)
+        self.render(bcc)
+        self.render(bcc)
+        self.assertEqual(bcc.stats(), {'hits': {'memory': 0, 'disk': 1, 'redis': 0}, 'misses': 1})
+
+    def test_unwritable_cache_dir(self):
+        cache_file = os.path.join(self.cache_dir, 'file')
+        open(cache_file, 'w').close()
+        bcc = LayeredBytecodeCache(cache_dir=cache_file)
+        output = self.render(bcc)
+        self.assertEqual(self.render(bcc), output)
+        self.assertEqual(bcc.stats(), {'hits': {'memory': 1, 'disk': 0, 'redis': 0}, 'misses': 1})
+
+    def test_prune(self):
+        template_dir = tempfile.mkdtemp()
+        try:
+            self.test_dir = template_dir
+            for name in ['a.j2', 'b.j2']:
+                with open(os.path.join(template_dir, name), 'w') as f:
+                    f.write(name)
+            self.template = 'a.j2'
+            bcc = LayeredBytecodeCache(cache_dir=self.cache_dir)
+            self.render(bcc)
+            cache_files = os.listdir(self.cache_dir)
+            self.assertEqual(len(cache_files), 1)
+
+            # A new version of the template replaces its bytecode file
+            template_file = os.path.join(template_dir, self.template)
+            mtime = os.path.getmtime(template_file) + 1
+            os.utime(template_file, (mtime, mtime))
+            self.render(LayeredBytecodeCache(cache_dir=self.cache_dir))
+            self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+            self.assertNotEqual(os.listdir(self.cache_dir), cache_files)
+
+            # The oldest files beyond max_files are removed
+            self.template = 'b.j2'
+            self.render(LayeredBytecodeCache(cache_dir=self.cache_dir, max_files=1))
+            self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        finally:
+            shutil.rmtree(template_dir)
+
+    def test_no_cache_dir(self):
+        bcc = LayeredBytecodeCache(cache_dir='')
+        output = self.render(bcc)
+        self.assertEqual(self.render(bcc), output)
+        self.assertEqual(bcc.stats(), {'hits': {'memory': 1, 'disk': 0, 'redis': 0}, 'misses': 1})
+        self.assertEqual(os.listdir(self.cache_dir), [])
@@ -1,7 +1,9 @@
 import json
 import os
+import shutil
 import subprocess
 import ipaddress
+import tempfile
 
 import tests.common_utils as utils
 import minigraph
@@ -483,3 +485,103 @@ class TestCfgGenCaseInsensitive(TestCase):
         self.assertEqual(len(mgmt_intf.keys()), 1)
         self.assertTrue(('eth0', 'FC00:1::32/64') in mgmt_intf.keys())
         self.assertTrue(ipaddress.ip_address(u'fc00:1::1') == mgmt_intf[('eth0', 'FC00:1::32/64')]['gwaddr'])
+
+    def test_parse_xml_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        saved_cache_dir = minigraph.PARSE_CACHE_DIR
+        minigraph.PARSE_CACHE_DIR = cache_dir
+        try:
+            result = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # A snapshot loaded from disk gives the same result
+            minigraph._parse_cache.clear()
+            cached_result = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
+            self.assertEqual(result, cached_result)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # A different parse argument does not reuse the snapshot
+            minigraph.parse_xml(self.sample_graph, platform='x86_64-sample-platform', port_config_file=self.port_config)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+        finally:
+            minigraph.PARSE_CACHE_DIR = saved_cache_dir
+            shutil.rmtree(cache_dir)
+
+    def test_parse_xml_cache_prune(self):
+        cache_dir = tempfile.mkdtemp()
+        graph = os.path.join(cache_dir, 'minigraph.xml')
+        shutil.copy(self.sample_graph, graph)
+        saved_cache = (minigraph.PARSE_CACHE_DIR, minigraph.PARSE_CACHE_FILES, minigraph.PARSE_CACHE_MEMORY_SIZE)
+        minigraph.PARSE_CACHE_DIR = os.path.join(cache_dir, 'minigraph')
+        minigraph.PARSE_CACHE_MEMORY_SIZE = 1
+        try:
+            minigraph.parse_xml(graph, port_config_file=self.port_config)
+            snapshots = os.listdir(minigraph.PARSE_CACHE_DIR)
+            self.assertEqual(len(snapshots), 1)
+
+            # A new minigraph content replaces the snapshot of the same arguments
+            with open(graph, 'a') as f:
+                f.write('<!-- updated -->\n')
+            minigraph.parse_xml(graph, port_config_file=self.port_config)
+            self.assertEqual(len(os.listdir(minigraph.PARSE_CACHE_DIR)), 1)
+            self.assertNotEqual(os.listdir(minigraph.PARSE_CACHE_DIR), snapshots)
+
+            # The oldest snapshots beyond PARSE_CACHE_FILES are removed
+            minigraph.PARSE_CACHE_FILES = 1
+            minigraph.parse_xml(graph, platform='x86_64-sample-platform', port_config_file=self.port_config)
+            self.assertEqual(len(os.listdir(minigraph.PARSE_CACHE_DIR)), 1)
+            self.assertEqual(len(minigraph._parse_cache), 1)
+
+            # An empty PARSE_CACHE_DIR disables the snapshots
+            shutil.rmtree(minigraph.PARSE_CACHE_DIR)
+            minigraph._parse_cache.clear()
+            minigraph.PARSE_CACHE_DIR = ''
+            minigraph.parse_xml(graph, port_config_file=self.port_config)
+            self.assertEqual(os.listdir(cache_dir), ['minigraph.xml'])
+            self.assertEqual(len(minigraph._parse_cache), 0)
+        finally:
+            (minigraph.PARSE_CACHE_DIR, minigraph.PARSE_CACHE_FILES, minigraph.PARSE_CACHE_MEMORY_SIZE) = saved_cache
+            shutil.rmtree(cache_dir)
+
+    def test_iter_minigraph_bounded(self):
+        # The header is at the end of the sample minigraph
+        saved_read_size = minigraph.MINIGRAPH_READ_SIZE
+        minigraph.MINIGRAPH_READ_SIZE = 256
+        try:
+            header = minigraph.read_minigraph_header(self.sample_graph)
+            self.assertEqual(header['hostname'], 'switch-t0')
+            self.assertEqual(header['hwsku'], 'Force10-S6000')
+            self.assertEqual(header['local_devices'], ['switch-t0'])
+
+            sections = ["DpgDec", "CpgDec", "PngDec", "MetadataDeclaration", "DeviceInfos"]
+            read = []
+            for section in minigraph.iter_minigraph(self.sample_graph, sections):
+                # The sections read before were freed, and the only other
+                # top-level element held is the one being parsed
+                self.assertTrue(all(previous.getparent() is None for previous in read))
+                self.assertEqual(list(section.getparent())[:1], [section])
+                self.assertLessEqual(len(section.getparent()), 2)
+                read.append(section)
+            self.assertEqual([minigraph.QName(section).localname for section in read],
+                             ["CpgDec", "DpgDec", "PngDec", "MetadataDeclaration", "DeviceInfos"])
+        finally:
+            minigraph.MINIGRAPH_READ_SIZE = saved_read_size
+
+    def test_element_fields(self):
+        link = minigraph.ET.fromstring(
+            '<DeviceLinkBase xmlns="%s"><EndPort>Ethernet1</EndPort><EndPort>Ethernet2</EndPort>'
+            '<StartDevice>switch-t1</StartDevice></DeviceLinkBase>' % minigraph.ns)
+        fields = minigraph.element_fields(link)
+        # The first child of a name wins, as with find()
+        self.assertEqual(fields[minigraph.Tag.EndPort].text, 'Ethernet1')
+        self.assertEqual(minigraph.element_text(fields, minigraph.Tag.StartDevice), 'switch-t1')
+        self.assertIsNone(minigraph.element_text(fields, minigraph.Tag.Bandwidth))
+
+    def test_device_index(self):
+        devices = {'Switch-T0': {'type': 'ToRRouter'}, 'switch-t0': {'type': 'Server'}, 'ARISTA01T1': {'type': 'LeafRouter'}}
+        index = minigraph.DeviceIndex(devices)
+        # The first device of names differing only in case wins
+        self.assertEqual(index['SWITCH-T0']['type'], 'ToRRouter')
+        self.assertIs(index['arista01t1'], devices['ARISTA01T1'])
+        with self.assertRaises(KeyError):
+            index['ARISTA02T1']
@@ -1,14 +1,20 @@
+import argparse
+import contextlib
 import filecmp
+import io
 import json
 import os
 import shutil
 import subprocess
+import sys
 import unittest
 import yaml
 
 import tests.common_utils as utils
+import minigraph
 
-from unittest import TestCase
+from tests.benchmark_cfggen_data import load_cfggen
+from unittest import TestCase, mock
 
 
 SKU = 'multi-npu-01'
@@ -449,5 +455,57 @@ class TestMultiNpuCfgGen(TestCase):
     def test_bgpd_frr_backendasic(self):
         self.assertTrue(*self.run_frr_asic_case('bgpd/bgpd.conf.j2', 'bgpd_frr_backend_asic.conf', "asic3", self.port_config[3]))
 
+    def test_parse_xml_shared_root(self):
+        root = minigraph.load_minigraph(self.sample_graph)
+        saved_cache_dir = minigraph.PARSE_CACHE_DIR
+        # Disable the snapshots, so both parses read the minigraph
+        minigraph.PARSE_CACHE_DIR = ''
+        try:
+            for asic in range(NUM_ASIC):
+                results = []
+                for shared_root in [None, root]:
+                    results.append(minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config[asic],
+                                                       asic_name="asic{}".format(asic), root=shared_root))
+                self.assertEqual(results[0], results[1])
+        finally:
+            minigraph.PARSE_CACHE_DIR = saved_cache_dir
+
+    def test_all_namespaces_requires_write_to_db(self):
+        argument = "-m {} --all-namespaces --print-data".format(self.sample_graph)
+        with self.assertRaises(subprocess.CalledProcessError):
+            subprocess.check_output(self.script_file + ' ' + argument, stderr=subprocess.STDOUT, shell=True)
+
+    def run_all_namespaces(self, failed):
+        cfggen = load_cfggen(os.path.join(self.test_dir, '..', 'sonic-cfggen'))
+
+        def generate(args, server=None, minigraph_root=None):
+            # Runs in the forked process of the namespace
+            if minigraph_root is None:
+                sys.exit(2)
+            sys.exit(1 if (args.namespace or 'host') in failed else 0)
+
+        args = argparse.Namespace(minigraph=self.sample_graph, namespace=None)
+        stderr = io.StringIO()
+        code = 0
+        with mock.patch.object(cfggen, 'generate', generate), \
+                mock.patch('sonic_py_common.multi_asic.get_num_asics', return_value=NUM_ASIC), \
+                contextlib.redirect_stderr(stderr):
+            try:
+                cfggen.generate_all_namespaces(args)
+            except SystemExit as e:
+                code = e.code
+        return code, stderr.getvalue()
+
+    @unittest.skipUnless(utils.PY3x, 'multiprocessing contexts need python3')
+    def test_all_namespaces(self):
+        self.assertEqual(self.run_all_namespaces([]), (0, ''))
+
+    @unittest.skipUnless(utils.PY3x, 'multiprocessing contexts need python3')
+    def test_all_namespaces_failed(self):
+        self.assertEqual(self.run_all_namespaces(['host', 'asic2']),
+                         (1, 'Failed to generate config for namespace(s): host, asic2\n'))
+        self.assertEqual(self.run_all_namespaces(['asic{}'.format(NUM_ASIC - 1)]),
+                         (1, 'Failed to generate config for namespace(s): asic{}\n'.format(NUM_ASIC - 1)))
+
     def tearDown(self):
         os.environ["CFGGEN_UNIT_TESTING"] = ""
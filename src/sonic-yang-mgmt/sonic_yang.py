@@ -3,7 +3,7 @@ import syslog
 
 from json import dump
 from glob import glob
-from sonic_yang_ext import SonicYangExtMixin, SonicYangException
+from sonic_yang_ext import SonicYangExtMixin, SonicYangException, SCHEMA_CACHE_DIR
 
 """
 Yang schema and data tree python APIs based on libyang python
@@ -12,8 +12,11 @@ i.e. it is mixin not parent class.
 """
 class SonicYang(SonicYangExtMixin):
 
-    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0):
+    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0,
+                 schema_cache_dir=SCHEMA_CACHE_DIR, xlate_workers=1):
         self.yang_dir = yang_dir
+        # directory of the preprocessed schema cache, None disables it
+        self.schema_cache_dir = schema_cache_dir
         self.ctx = None
         self.module = None
         self.root = None
@@ -44,6 +47,12 @@ class SonicYang(SonicYangExtMixin):
         # below dict will store preProcessed yang objects, which may be needed by
         # all yang modules, such as grouping.
         self.preProcessedYang = dict()
+        # leaf dicts of the yang lists and containers, see _createLeafDict
+        self.leafDicts = dict()
+        # tables a must or when condition may refer to, see _findConditionTables
+        self.conditionTables = None
+        # number of processes translating the tables, see _mapXlateChunks
+        self.xlateWorkers = xlate_workers
         # element path for CONFIG DB. An example for this list could be:
         # ['PORT', 'Ethernet0', 'speed']
         self.elementPath = []
@@ -3,7 +3,14 @@
 
 from __future__ import print_function
 import yang as ly
+import hashlib
+import multiprocessing
+import os
+import pickle
+import re
+import sys
 import syslog
+import tempfile
 from json import dump, dumps, loads
 from xmltodict import parse
 from glob import glob
@@ -33,6 +40,30 @@ LEAF_LIST_WITH_STRING_VALUE_DICT = {
     ('PORT', 'adv_interface_types'): ',',
 }
 
+# Directory of the preprocessed schema of yang model directories, i.e. yJson,
+# preProcessedYang and confDbYangMap, keyed by a hash of the yang models.
+SCHEMA_CACHE_DIR = '/var/cache/sonic-yang-mgmt'
+# Bump when the layout of the cached schema changes
+SCHEMA_CACHE_VERSION = 1
+
+# Tables with more entries are split in chunks of this size when they are
+# translated by a pool of workers
+XLATE_CHUNK_SIZE = 5000
+
+# Preprocessed schema of the yang model directories loaded in this process,
+# shared by all SonicYang instances. The schema must not be modified.
+_schemaCache = dict()
+
+# (function, arguments) of the chunks translated by _xlateWorker
+_xlateChunks = None
+
+def _xlateWorker(index):
+    func, args = _xlateChunks[index]
+    return func(*args)
+
+def _uintValue(val):
+    return int(str(val), 10)
+
 """
 This is the Exception thrown out of all public function of this class.
 """
@@ -58,16 +89,27 @@ class SonicYangExtMixin:
                 else:
                     raise(Exception("Could not load module {}".format(file)))
 
+            schemaKey = self._schemaCacheKey(self.yangFiles)
+
             # keep only modules name in self.yangFiles
             self.yangFiles = [f.split('/')[-1] for f in self.yangFiles]
             self.yangFiles = [f.split('.')[0] for f in self.yangFiles]
             self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
             self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
 
-            # load json for each yang model
-            self._loadJsonYangModel()
-            # create a map from config DB table to yang container
-            self._createDBTableToModuleMap()
+            schema = _schemaCache.get(schemaKey) or self._readSchemaCache(schemaKey)
+            if schema is None:
+                # load json for each yang model
+                self._loadJsonYangModel()
+                # create a map from config DB table to yang container
+                self._createDBTableToModuleMap()
+                schema = (self.yJson, self.preProcessedYang, self.confDbYangMap)
+                self._writeSchemaCache(schemaKey, schema)
+            else:
+                self.yJson, self.preProcessedYang, self.confDbYangMap = schema
+            _schemaCache[schemaKey] = schema
+            self.leafDicts = dict()
+            self.conditionTables = None
         except Exception as e:
             self.sysLog(msg="Yang Models Load failed:{}".format(str(e)), \
                 debug=syslog.LOG_ERR, doPrint=True)
@@ -75,6 +117,75 @@ class SonicYangExtMixin:
 
         return True
 
+    def _schemaCacheKey(self, yangFiles):
+        '''
+            Hash the names and content of the yang model files.
+
+            Parameters:
+                yangFiles (list): paths of the yang model files.
+
+            Returns:
+                 (str): hex digest identifying the preprocessed schema.
+        '''
+        # pickles of python3 can not be read by python2
+        digest = hashlib.sha1("{}:{}".format(SCHEMA_CACHE_VERSION, sys.version_info[0]).encode())
+        for file in sorted(yangFiles):
+            digest.update(os.path.basename(file).encode())
+            with open(file, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def _readSchemaCache(self, schemaKey):
+        '''
+            Read the preprocessed schema stored by _writeSchemaCache().
+
+            Parameters:
+                schemaKey (str): hash of the yang model files.
+
+            Returns:
+                 (tuple): yJson, preProcessedYang and confDbYangMap, or None
+                    if there is no usable cache.
+        '''
+        if not self.schema_cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.schema_cache_dir, schemaKey), 'rb') as f:
+                schema = pickle.load(f)
+        except Exception:
+            return None
+        self.sysLog(msg="Preprocessed schema {} is read from cache".format(schemaKey))
+        return schema
+
+    def _writeSchemaCache(self, schemaKey, schema):
+        '''
+            Store the preprocessed schema in schema_cache_dir. The cache is only
+            an optimization, failures are logged and ignored.
+
+            Parameters:
+                schemaKey (str): hash of the yang model files.
+                schema (tuple): yJson, preProcessedYang and confDbYangMap.
+
+            Returns:
+                void
+        '''
+        if not self.schema_cache_dir:
+            return
+        try:
+            if not os.path.isdir(self.schema_cache_dir):
+                os.makedirs(self.schema_cache_dir)
+            fd, tmp = tempfile.mkstemp(dir=self.schema_cache_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(schema, f, pickle.HIGHEST_PROTOCOL)
+                os.rename(tmp, os.path.join(self.schema_cache_dir, schemaKey))
+            except Exception:
+                os.remove(tmp)
+                raise
+        except Exception as e:
+            self.sysLog(msg="Preprocessed schema cache write failed:{}".format(str(e)), \
+                debug=syslog.LOG_WARNING)
+        return
+
     """
     load JSON schema format from yang models
     """
@@ -276,6 +387,9 @@ class SonicYangExtMixin:
         # fill default values
         def _fillSteps(leaf):
             leaf['__isleafList'] = isleafList
+            # config DB strings are converted to int for uint types
+            leafType = leaf.get('type')
+            leaf['__isUint'] = isinstance(leafType, dict) and 'uint' in leafType.get('@name', '')
             leafDict[leaf['@name']] = leaf
             return
 
@@ -368,8 +482,12 @@ class SonicYangExtMixin:
 
             Returns:
                  leafDict (dict): dict with leaf(s) information for List\Container
-                    corresponding to config DB table.
+                    corresponding to config DB table. The dict is created once
+                    per model and must not be modified.
         '''
+        leafDict = self.leafDicts.get((table, id(model)))
+        if leafDict is not None:
+            return leafDict
         leafDict = dict()
         #Iterate over leaf, choices and leaf-list.
         self._fillLeafDict(model.get('leaf'), leafDict)
@@ -389,6 +507,7 @@ class SonicYangExtMixin:
         if model.get('uses') is not None:
             self._fillLeafDictUses(model.get('uses'), table, leafDict)
 
+        self.leafDicts[(table, id(model))] = leafDict
         return leafDict
 
     """
@@ -398,27 +517,13 @@ class SonicYangExtMixin:
     """
     def _findYangTypedValue(self, key, value, leafDict):
 
-        # convert config DB string to yang Type
-        def _yangConvert(val):
-            # Convert everything to string
-            val = str(val)
-            # find type of this key from yang leaf
-            type = leafDict[key]['type']['@name']
-
-            if 'uint' in type:
-                vValue = int(val, 10)
-            # TODO: find type of leafref from schema node
-            elif 'leafref' in type:
-                vValue = val
-            #TODO: find type in sonic-head, as of now, all are enumeration
-            elif 'stypes:' in type:
-                vValue = val
-            else:
-                vValue = val
-            return vValue
+        # convert config DB string to yang Type, everything but uint is a
+        # string. TODO: find type of leafref from schema node
+        leaf = leafDict[key]
+        _yangConvert = _uintValue if leaf['__isUint'] else str
 
         # if it is a leaf-list do it for each element
-        if leafDict[key]['__isleafList']:
+        if leaf['__isleafList']:
             vValue = list()
             if isinstance(value, str) and (self.elementPath[0], self.elementPath[-1]) in LEAF_LIST_WITH_STRING_VALUE_DICT:
                 # For field defined as leaf-list but has string value in CONFIG DB, need do special handling here. For exampe:
@@ -505,8 +610,9 @@ class SonicYangExtMixin:
         for pkey in primaryKeys:
             try:
                 vKey = None
-                self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}".\
-                    format(pkey))
+                if self.DEBUG:
+                    self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}".\
+                        format(pkey))
                 # Find and extracts key from each dict in config
                 keyDict = self._extractKey(pkey, listKeys)
 
@@ -514,8 +620,9 @@ class SonicYangExtMixin:
                    inner_yang_list = list()
                    for vKey in config[pkey]:
                       inner_keyDict = dict()
-                      self.sysLog(syslog.LOG_DEBUG, "xlateList Key {} vkey {} Val {} vval {}".\
-                          format(inner_listKey, str(vKey), inner_listVal, str(config[pkey][vKey])))
+                      if self.DEBUG:
+                          self.sysLog(syslog.LOG_DEBUG, "xlateList Key {} vkey {} Val {} vval {}".\
+                              format(inner_listKey, str(vKey), inner_listVal, str(config[pkey][vKey])))
                       inner_keyDict[inner_listKey] = str(vKey)
                       inner_keyDict[inner_listVal] = str(config[pkey][vKey])
                       inner_yang_list.append(inner_keyDict)
@@ -565,14 +672,16 @@ class SonicYangExtMixin:
             try:
                 self.elementPath.append(pkey)
                 vKey = None
-                self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}".\
-                    format(pkey))
+                if self.DEBUG:
+                    self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}".\
+                        format(pkey))
                 # Find and extracts key from each dict in config
                 keyDict = self._extractKey(pkey, listKeys)
                 # fill rest of the values in keyDict
                 for vKey in config[pkey]:
                     self.elementPath.append(vKey)
-                    self.sysLog(syslog.LOG_DEBUG, "xlateList vkey {}".format(vKey))
+                    if self.DEBUG:
+                        self.sysLog(syslog.LOG_DEBUG, "xlateList vkey {}".format(vKey))
                     try:
                         keyDict[vKey] = self._findYangTypedValue(vKey, \
                                             config[pkey][vKey], leafDict)
@@ -697,25 +806,115 @@ class SonicYangExtMixin:
 
         return
 
+    """
+    Run func(table, data) on each table, and return the (table, results) list
+    in the order of tables. With self.xlateWorkers > 1 and more than
+    XLATE_CHUNK_SIZE entries in total, split(table, data, size) cuts the
+    tables in chunks, which are run by a pool of processes. results then has
+    one item per chunk.
+    """
+    def _mapXlateChunks(self, func, split, tables):
+
+        global _xlateChunks
+
+        parallel = self.xlateWorkers > 1 and len(tables) > 0 and \
+            sum(len(data) for _, data in tables) > XLATE_CHUNK_SIZE
+        chunks = list()
+        for table, data in tables:
+            parts = split(table, data, XLATE_CHUNK_SIZE) if parallel else [data]
+            chunks.extend((func, (table, part)) for part in parts)
+
+        if parallel:
+            # the workers are forked, the chunks are not pickled
+            _xlateChunks = chunks
+            try:
+                pool = multiprocessing.get_context('fork').Pool(min(self.xlateWorkers, len(chunks)))
+                try:
+                    results = pool.map(_xlateWorker, range(len(chunks)), chunksize=1)
+                finally:
+                    pool.terminate()
+            finally:
+                _xlateChunks = None
+        else:
+            results = [func(*args) for _, args in chunks]
+
+        # group the results by table
+        tableResults = list()
+        for (_, (table, _)), result in zip(chunks, results):
+            if len(tableResults) and tableResults[-1][0] == table:
+                tableResults[-1][1].append(result)
+            else:
+                tableResults.append((table, [result]))
+        return tableResults
+
+    """
+    Split a table of config DB in chunks of size entries
+    """
+    def _splitConfigTable(self, table, config, size):
+
+        if len(config) <= size:
+            return [config]
+        keys = list(config.keys())
+        return [dict((key, config[key]) for key in keys[i:i+size]) \
+            for i in range(0, len(keys), size)]
+
+    """
+    Split a yang container of a table in chunks of size list entries, leaves
+    and inner containers are kept in the first chunk
+    """
+    def _splitYangTable(self, table, yang, size):
+
+        chunks = [dict()]
+        for name, value in yang.items():
+            if isinstance(value, list) and len(value) > size and \
+                isinstance(value[0], dict):
+                for i in range(0, len(value), size):
+                    if i // size >= len(chunks):
+                        chunks.append(dict())
+                    chunks[i // size][name] = value[i:i+size]
+            else:
+                chunks[0][name] = value
+        return chunks
+
+    """
+    Xlate a table of config DB, return its yang container
+    """
+    def _xlateTable(self, table, config):
+
+        cmap = self.confDbYangMap[table]
+        yang = dict()
+        self.elementPath = [table]
+        try:
+            self._xlateContainer(cmap['container'], yang, config, table)
+        finally:
+            self.elementPath = []
+
+        return yang
+
     """
     xlate ConfigDB json to Yang json
     """
     def _xlateConfigDBtoYang(self, jIn, yangJ):
 
+        tables = [(table, jIn[table]) for table in jIn.keys()]
         # find top level container for each table, and run the xlate_container.
-        for table in jIn.keys():
+        for table, results in self._mapXlateChunks(self._xlateTable, \
+            self._splitConfigTable, tables):
             cmap = self.confDbYangMap[table]
             # create top level containers
             key = cmap['module']+":"+cmap['topLevelContainer']
             subkey = cmap['topLevelContainer']+":"+cmap['container']['@name']
             # Add new top level container for first table in this container
             yangJ[key] = dict() if yangJ.get(key) is None else yangJ[key]
-            yangJ[key][subkey] = dict()
+            yangJ[key][subkey] = yang = results[0]
             self.sysLog(msg="xlateConfigDBtoYang {}:{}".format(key, subkey))
-            self.elementPath.append(table)
-            self._xlateContainer(cmap['container'], yangJ[key][subkey], \
-                                jIn[table], table)
-            self.elementPath = []
+            # merge the chunks, the lists of each chunk follow each other
+            for result in results[1:]:
+                for name, value in result.items():
+                    if isinstance(value, list) and isinstance(yang.get(name), list):
+                        yang[name].extend(value)
+                    else:
+                        yang[name] = value
 
         return
 
@@ -854,14 +1053,16 @@ class SonicYangExtMixin:
             for entry in yang:
                 # create key of config DB table
                 pkey, pkeydict = self._createKey(entry, listKeys)
-                self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}".format(pkey))
+                if self.DEBUG:
+                    self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}".format(pkey))
                 config[pkey]= dict()
                 # fill rest of the entries
                 inner_list = entry[inner_clist['@name']]
                 for index in range(len(inner_list)):
-                    self.sysLog(syslog.LOG_DEBUG, "revXlateList fkey:{} fval {}".\
-                         format(str(inner_list[index][inner_listKey]),\
-                             str(inner_list[index][inner_listVal])))
+                    if self.DEBUG:
+                        self.sysLog(syslog.LOG_DEBUG, "revXlateList fkey:{} fval {}".\
+                             format(str(inner_list[index][inner_listKey]),\
+                                 str(inner_list[index][inner_listVal])))
                     config[pkey][str(inner_list[index][inner_listKey])] = str(inner_list[index][inner_listVal])
         return
 
@@ -887,7 +1088,8 @@ class SonicYangExtMixin:
             for entry in yang:
                 # create key of config DB table
                 pkey, pkeydict = self._createKey(entry, listKeys)
-                self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}".format(pkey))
+                if self.DEBUG:
+                    self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}".format(pkey))
                 self.elementPath.append(pkey)
                 config[pkey]= dict()
                 # fill rest of the entries
@@ -971,6 +1173,7 @@ class SonicYangExtMixin:
         cDbJson = self.revXlateJson
 
         # find table in config DB, use name as a KEY
+        tables = list()
         for module_top in yangJ.keys():
             # module _top will be of from module:top
             for container in yangJ[module_top].keys():
@@ -981,18 +1184,32 @@ class SonicYangExtMixin:
                 if len(names) > 2:
                     raise SonicYangException("Invalid Yang data file structure")
                 table = names[0] if len(names) == 1 else names[1]
-                #print("revXlate " + table)
-                cmap = self.confDbYangMap[table]
-                cDbJson[table] = dict()
-                #print(key + "--" + subkey)
-                self.sysLog(msg="revXlateYangtoConfigDB {}".format(table))
-                self.elementPath.append(table)
-                self._revXlateContainer(cmap['container'], yangJ[module_top][container], \
-                    cDbJson[table], table)
-                self.elementPath = []
+                tables.append((table, yangJ[module_top][container]))
+
+        for table, results in self._mapXlateChunks(self._revXlateTable, \
+            self._splitYangTable, tables):
+            self.sysLog(msg="revXlateYangtoConfigDB {}".format(table))
+            cDbJson[table] = results[0]
+            for result in results[1:]:
+                cDbJson[table].update(result)
 
         return
 
+    """
+    Rev xlate a yang container of a table, return the table of config DB
+    """
+    def _revXlateTable(self, table, yang):
+
+        cmap = self.confDbYangMap[table]
+        config = dict()
+        self.elementPath = [table]
+        try:
+            self._revXlateContainer(cmap['container'], yang, config, table)
+        finally:
+            self.elementPath = []
+
+        return config
+
     """
     Reverse Translate tp config DB
     """
@@ -1028,6 +1245,26 @@ class SonicYangExtMixin:
 
         return None
 
+    """
+    Find a container in YANG Container
+    c = container
+    l = container name
+    return: container if found else None
+    """
+    def _findYangContainer(self, container, containerName):
+
+        ccontainer = container.get('container')
+        if isinstance(ccontainer, dict):
+            if ccontainer['@name'] == containerName:
+                return ccontainer
+
+        elif isinstance(ccontainer, list):
+            for c in ccontainer:
+                if c['@name'] == containerName:
+                    return c
+
+        return None
+
     """
     Find xpath of the PORT Leaf in PORT container/list. Xpath of Leaf is needed,
     because only leaf can have leafrefs depend on them. (Public)
@@ -1123,6 +1360,256 @@ class SonicYangExtMixin:
 
        return True
 
+    """
+    load_data_delta: apply a Config DB delta to the loaded data tree and
+    validate it, without translating and parsing the whole config again.
+    (Public)
+    input:    configdbDelta - {table: {key: entry}}, an entry replaces the
+              current one, None deletes an entry or a whole table.
+    returns:  True - success   SonicYangException - the delta is not valid,
+              the data tree then holds the config before the delta.
+    """
+    def loadDataDelta(self, configdbDelta):
+
+        if self.root is None:
+            raise SonicYangException("Data Loading Failed\nloadData() must be called first")
+
+        # libyang only checks the must and when conditions of the changed
+        # nodes again, the whole config is loaded when a condition of a
+        # loaded node may refer to a changed table
+        if self.conditionTables is None:
+            self.conditionTables = self._findConditionTables()
+        for table in configdbDelta:
+            if any(holder in self.jIn for holder in self.conditionTables.get(table, set())):
+                return self._loadDataDeltaFull(configdbDelta)
+
+        try:
+            # leafs with a leafref to the deleted leafs, with the xpath and
+            # value of the leaf they refer to
+            dependents = dict()
+            for table, entries in configdbDelta.items():
+                if table not in self.confDbYangMap:
+                    continue
+                current = self.jIn.get(table, dict())
+                keys = list(current.keys()) if entries is None else list(entries.keys())
+                for key in keys:
+                    if key in current:
+                        xpath, leafs, keyLeafs = self._xlateEntryXpaths(table, key, current[key])
+                        for leafXpath, value in leafs + keyLeafs:
+                            if value is not None and not isinstance(value, list):
+                                for dependent in self.find_data_dependencies(leafXpath):
+                                    dependents[dependent] = (leafXpath, str(value))
+                        self.deleteNode(xpath)
+                    entry = None if entries is None else entries[key]
+                    if entry is not None:
+                        xpath, leafs, keyLeafs = self._xlateEntryXpaths(table, key, entry)
+                        for leafXpath, value in leafs:
+                            if isinstance(value, list):
+                                for v in value:
+                                    self._add_data_node(leafXpath, v)
+                            else:
+                                self._add_data_node(leafXpath, value)
+
+            # the remaining dependents must still find the leaf they refer to
+            for dependent, (leafXpath, value) in dependents.items():
+                if self._find_data_node(dependent) is None or \
+                    self._find_data_node_value(dependent) != value:
+                    continue
+                if self._find_data_node(leafXpath) is None or \
+                    self._find_data_node_value(leafXpath) != value:
+                    raise Exception("{} refers to deleted {}".format(dependent, leafXpath))
+            # libyang keeps validity flags in the data nodes, only the changed
+            # nodes are checked again
+            self._validate_data(self.root, self.ctx)
+
+        except Exception as e:
+            self._reloadDataAfterDelta(self.jIn, self.tablesWithOutYang, e)
+
+        # keep self.jIn and self.tablesWithOutYang as loadData() of the
+        # config with the delta would
+        for table, entries in configdbDelta.items():
+            config = self.jIn if table in self.confDbYangMap else self.tablesWithOutYang
+            self._applyTableDelta(config, table, entries)
+
+        return True
+
+    """
+    Apply a Config DB delta by loading and validating the whole config with
+    the delta
+    """
+    def _loadDataDeltaFull(self, configdbDelta):
+
+        jIn, tablesWithOutYang = self.jIn, self.tablesWithOutYang
+        config = dict((table, dict(entries)) for table, entries in \
+            list(jIn.items()) + list(tablesWithOutYang.items()))
+        for table, entries in configdbDelta.items():
+            self._applyTableDelta(config, table, entries)
+        try:
+            self.loadData(config)
+            self._validate_data(self.root, self.ctx)
+        except Exception as e:
+            self._reloadDataAfterDelta(jIn, tablesWithOutYang, e)
+
+        return True
+
+    """
+    Rebuild the data tree from the config before a delta which failed with
+    error, and raise SonicYangException
+    """
+    def _reloadDataAfterDelta(self, jIn, tablesWithOutYang, error):
+
+        self.sysLog(msg="Data Delta Loading Failed:{}".format(str(error)), \
+            debug=syslog.LOG_ERR, doPrint=True)
+        try:
+            self.loadData(jIn)
+        finally:
+            self.tablesWithOutYang = tablesWithOutYang
+        raise SonicYangException("Data Delta Loading Failed\n{}".format(str(error)))
+
+    """
+    Apply the entries of a Config DB delta for table to config
+    """
+    def _applyTableDelta(self, config, table, entries):
+
+        if entries is None:
+            config.pop(table, None)
+            return
+        config[table] = config.get(table, dict())
+        for key, entry in entries.items():
+            if entry is None:
+                config[table].pop(key, None)
+            else:
+                config[table][key] = entry
+        if len(config[table]) == 0:
+            del config[table]
+
+        return
+
+    """
+    Map the config DB tables a must or when condition may refer to, to the
+    tables holding the condition. A table is referred to when a condition
+    names it, and by its own conditions which leave their node. Conditions
+    outside the tables, in groupings, are held by every table of their
+    module, or by every table for the modules without one.
+    """
+    def _findConditionTables(self):
+
+        moduleTables = dict()
+        for table, cmap in self.confDbYangMap.items():
+            if 'topLevelContainer' in cmap:
+                moduleTables.setdefault(cmap['module'], dict())[table] = cmap['container']
+        tables = set(table for mTables in moduleTables.values() for table in mTables)
+
+        conditionTables = dict()
+        def addConditions(conditions, holders):
+            for condition in conditions:
+                referred = set(name for name in \
+                    re.findall(r'[A-Za-z_][A-Za-z0-9_.-]*', condition) if name in tables)
+                # relative paths going up and absolute paths leave the node
+                if '..' in condition or condition.lstrip('(').startswith('/'):
+                    referred.update(holders)
+                for table in referred:
+                    conditionTables.setdefault(table, set()).update(holders)
+
+        for j in self.yJson:
+            mTables = moduleTables.get(j['module']['@name'], dict())
+            conditions = list()
+            self._findConditions(j['module'], conditions)
+            for table, container in mTables.items():
+                tableConditions = list()
+                self._findConditions(container, tableConditions)
+                addConditions(tableConditions, [table])
+                for condition in tableConditions:
+                    conditions.remove(condition)
+            addConditions(conditions, list(mTables) or list(tables))
+
+        return conditionTables
+
+    """
+    Append the conditions of the must and when statements in yang JSON to
+    conditions
+    """
+    def _findConditions(self, yang, conditions):
+
+        if isinstance(yang, list):
+            for y in yang:
+                self._findConditions(y, conditions)
+        elif isinstance(yang, dict):
+            for name, value in yang.items():
+                if name in ('must', 'when'):
+                    for statement in (value if isinstance(value, list) else [value]):
+                        conditions.append(statement['@condition'])
+                else:
+                    self._findConditions(value, conditions)
+
+        return
+
+    """
+    Xlate one entry of a config DB table. Return the xpath of its node in the
+    data tree, the (xpath, value) of the nodes to create it and the (xpath,
+    value) of the keys of its lists. Value is None for list entries, which are
+    created from the keys in their xpath, and a list for leaf-lists.
+    """
+    def _xlateEntryXpaths(self, table, key, entry):
+
+        yangJ = dict()
+        self._xlateConfigDBtoYang({table: {key: entry}}, yangJ)
+        module, topc, container = self._getModuleTLCcontainer(table)
+        yangTable = yangJ[module+":"+topc][topc+":"+table]
+        xpath = "/" + module + ":" + topc + "/" + table
+
+        leafs = list()
+        keyLeafs = list()
+        self._fillEntryXpaths(xpath, container, yangTable, leafs, keyLeafs)
+        if len(leafs) == 0:
+            raise Exception("No data for {} in {}".format(key, table))
+        # the first node holds the whole entry
+        return self._entryXpath(xpath, leafs[0][0]), leafs, keyLeafs
+
+    """
+    Return the xpath of the child of parentXpath, which holds xpath
+    """
+    def _entryXpath(self, parentXpath, xpath):
+
+        child = xpath[len(parentXpath)+1:]
+        # list keys may contain '/', skip the predicates
+        depth = 0
+        for i, c in enumerate(child):
+            if c == '[':
+                depth += 1
+            elif c == ']':
+                depth -= 1
+            elif c == '/' and depth == 0:
+                return parentXpath + "/" + child[:i]
+        return xpath
+
+    """
+    Fill leafs with (xpath, value) of the nodes in yang JSON, and keyLeafs with
+    the ones of list keys. model is the YANG container or list of yang.
+    """
+    def _fillEntryXpaths(self, xpath, model, yang, leafs, keyLeafs):
+
+        for name, value in yang.items():
+            if isinstance(value, list) and len(value) and isinstance(value[0], dict):
+                clist = self._findYangList(model, name)
+                listKeys = clist['key']['@value'].split()
+                for entry in value:
+                    entryXpath = self._findXpathList(xpath, clist, \
+                        [str(entry[k]) for k in listKeys])
+                    leafs.append((entryXpath, None))
+                    for k in listKeys:
+                        keyLeafs.append((entryXpath + "/" + k, entry[k]))
+                    self._fillEntryXpaths(entryXpath, clist, \
+                        dict((k, v) for k, v in entry.items() if k not in listKeys), \
+                        leafs, keyLeafs)
+            elif isinstance(value, dict):
+                self._fillEntryXpaths(xpath + "/" + name, \
+                    self._findYangContainer(model, name), value, leafs, keyLeafs)
+            else:
+                leafs.append((xpath + "/" + name, value))
+
+        return
+
     """
     Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
     """
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the config DB <-> yang JSON translation of SonicYang,
+on a synthetic config with a large ACL_RULE table and many ports.
+
+Usage:
+    python3 tests/benchmark_xlate.py [--rules 50000] [--ports 1000] [--workers 4]
+        [--yang-dir /usr/local/yang-models] [--module-path path/to/sonic-yang-mgmt]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+MODULES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+
+
+def generate_config(num_rules, num_ports):
+    config = {
+        'PORT': {},
+        'ACL_TABLE': {},
+        'ACL_RULE': {},
+    }
+    for index in range(num_ports):
+        config['PORT']['Ethernet%d' % index] = {
+            'alias': 'etp%d' % index,
+            'lanes': str(index),
+            'speed': '100000',
+            'mtu': '9100',
+            'admin_status': 'up',
+            'index': str(index),
+        }
+    for index in range(64):
+        config['ACL_TABLE']['TABLE%d' % index] = {
+            'type': 'L3',
+            'stage': 'ingress',
+            'policy_desc': 'TABLE%d' % index,
+            'ports': ['Ethernet%d' % port for port in range(index % num_ports, num_ports, 64)],
+        }
+    for index in range(num_rules):
+        config['ACL_RULE']['TABLE%d|RULE_%d' % (index % 64, index)] = {
+            'PRIORITY': str(index % 10000),
+            'PACKET_ACTION': 'FORWARD',
+            'SRC_IP': '10.%d.%d.%d/32' % (index >> 16 & 255, index >> 8 & 255, index & 255),
+            'IP_PROTOCOL': '6',
+            'L4_DST_PORT': str(index % 65536),
+        }
+    return config
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rules', type=int, default=50000)
+    parser.add_argument('--ports', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--yang-dir', default='/usr/local/yang-models')
+    parser.add_argument('--module-path', default=MODULES_PATH)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.module_path)
+    import sonic_yang
+
+    kwargs = {'print_log_enabled': False}
+    if args.workers > 1:
+        kwargs['xlate_workers'] = args.workers
+    syc = sonic_yang.SonicYang(args.yang_dir, **kwargs)
+    start = time.time()
+    syc.loadYangModel()
+    print('loadYangModel %8.3f s' % (time.time() - start))
+
+    config = generate_config(args.rules, args.ports)
+    entries = sum(len(table) for table in config.values())
+
+    def xlate():
+        syc.jIn = copy.copy(config)
+        syc.xlateJson = dict()
+        syc.tablesWithOutYang = dict()
+        syc._cropConfigDB()
+        syc._xlateConfigDB()
+
+    xlate()
+    yang = syc.xlateJson
+
+    def rev_xlate():
+        syc.XlateYangToConfigDB(yang)
+
+    print('Synthetic config DB: %d ACL_RULE, %d PORT, %d workers' % (args.rules, args.ports, args.workers))
+    for name, func in [('xlate', xlate), ('reverse xlate', rev_xlate)]:
+        seconds = measure(func, args.repeat)
+        print('%-14s %8.3f s %12.0f entries/s' % (name, seconds, entries / seconds))
+
+
+if __name__ == '__main__':
+    main()
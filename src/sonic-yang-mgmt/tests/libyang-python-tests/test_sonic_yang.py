@@ -2,6 +2,7 @@ import sys
 import os
 import pytest
 import sonic_yang as sy
+import sonic_yang_ext
 import json
 import glob
 import logging
@@ -379,5 +380,103 @@ class Test_SonicYang(object):
 
         return
 
+    def test_load_data_delta(self, sonic_yang_data):
+        # in this test, a delta applied to the loaded data tree must give the
+        # same config as loading the whole config with the delta
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+        syc.loadData(jIn)
+
+        port = dict(syc.jIn['PORT']['Ethernet0'], mtu='1500')
+        syc.loadDataDelta({'PORT': {'Ethernet0': port},
+                           'VLAN_MEMBER': {'Vlan111|Ethernet1': None},
+                           'UNKNOWN_TABLE': {'key': {'field': 'value'}}})
+        assert syc.jIn['PORT']['Ethernet0']['mtu'] == '1500'
+        assert 'Vlan111|Ethernet1' not in syc.jIn['VLAN_MEMBER']
+        assert syc.tablesWithOutYang['UNKNOWN_TABLE'] == {'key': {'field': 'value'}}
+        assert syc.getData() == syc.jIn
+
+        # Ethernet0 is still a VLAN member, the data tree is left unchanged
+        with pytest.raises(sy.SonicYangException):
+            syc.loadDataDelta({'PORT': {'Ethernet0': None}})
+        assert 'Ethernet0' in syc.getData()['PORT']
+
+        return
+
+    def test_load_data_delta_must(self, sonic_yang_data):
+        # in this test, a delta must be accepted or rejected by loadDataDelta()
+        # as by loadData() and validate_data_tree() of the config with the
+        # delta, also when it breaks a must condition of an unchanged node in
+        # another table
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+
+        def load(config):
+            try:
+                syc.loadData(config)
+                syc.validate_data_tree()
+            except sy.SonicYangException:
+                return None
+            return syc.getData()
+
+        # the asn of the BGP_INTERNAL_NEIGHBOR entries must be the bgp_asn of
+        # DEVICE_METADATA
+        metadata = dict(jIn['DEVICE_METADATA']['localhost'], bgp_asn='65100')
+        deltas = [({'DEVICE_METADATA': {'localhost': metadata}}, False),
+                  ({'DEVICE_METADATA': {'localhost': metadata},
+                    'BGP_INTERNAL_NEIGHBOR': None, 'BGP_VOQ_CHASSIS_NEIGHBOR': None}, True),
+                  ({'VLAN_MEMBER': {'Vlan111|Ethernet1': None}}, True)]
+        for delta, valid in deltas:
+            config = json.loads(json.dumps(jIn))
+            for table, entries in delta.items():
+                syc._applyTableDelta(config, table, entries)
+            expected = load(config)
+            assert (expected is not None) == valid
+
+            assert load(json.loads(json.dumps(jIn))) is not None
+            before = syc.getData()
+            try:
+                syc.loadDataDelta(delta)
+            except sy.SonicYangException:
+                assert expected is None
+                assert syc.getData() == before
+            else:
+                assert syc.getData() == expected
+
+        return
+
+    def test_schema_cache(self, sonic_yang_data, tmpdir):
+        # in this test, the preprocessed schema written to the cache dir must
+        # give the same translation as the schema built from the yang models
+        test_file = sonic_yang_data['test_file']
+        cache_dir = str(tmpdir)
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+
+        sonic_yang_ext._schemaCache.clear()
+        syc = sy.SonicYang(sonic_yang_data['yang_dir'], schema_cache_dir=cache_dir)
+        syc.loadYangModel()
+        assert len(os.listdir(cache_dir)) == 1
+
+        # a new process only finds the schema in the cache dir
+        sonic_yang_ext._schemaCache.clear()
+        cached = sy.SonicYang(sonic_yang_data['yang_dir'], schema_cache_dir=cache_dir)
+        cached.loadYangModel()
+        assert cached.confDbYangMap == syc.confDbYangMap
+        assert cached.preProcessedYang == syc.preProcessedYang
+
+        syc.loadData(jIn)
+        cached.loadData(jIn)
+        assert cached.xlateJson == syc.xlateJson
+
+        # instances of the same process share the schema
+        shared = sy.SonicYang(sonic_yang_data['yang_dir'], schema_cache_dir=None)
+        shared.loadYangModel()
+        assert shared.confDbYangMap is cached.confDbYangMap
+
+        return
+
     def teardown_class(self):
         pass